@@ -1,13 +1,21 @@
 from splink.internals.blocking_rule_library import (
     And,
+    BandRule,
     CustomRule,
+    MinHashLSHRule,
     Not,
+    SortedNeighbourhoodRule,
+    TokenRule,
     block_on,
 )
 
 __all__ = [
     "CustomRule",
     "And",
+    "BandRule",
+    "MinHashLSHRule",
     "Not",
+    "SortedNeighbourhoodRule",
+    "TokenRule",
     "block_on",
 ]
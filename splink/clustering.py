@@ -1,3 +1,11 @@
-from .internals.clustering import cluster_pairwise_predictions_at_threshold
+from .internals.clustering import (
+    cluster_pairwise_predictions_at_threshold,
+    compute_cluster_dendrogram,
+    update_clusters_from_edge_deltas,
+)
 
-__all__ = ["cluster_pairwise_predictions_at_threshold"]
+__all__ = [
+    "cluster_pairwise_predictions_at_threshold",
+    "compute_cluster_dendrogram",
+    "update_clusters_from_edge_deltas",
+]
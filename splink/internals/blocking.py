@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import hashlib
+import json
 import logging
 from typing import TYPE_CHECKING, Any, List, Literal, Optional
 
@@ -14,10 +16,10 @@ from splink.internals.dialects import SplinkDialect
 from splink.internals.exceptions import SplinkException
 from splink.internals.input_column import InputColumn
 from splink.internals.misc import ensure_is_list
+from splink.internals.parse_sql import get_columns_used_from_sql
 from splink.internals.pipeline import CTEPipeline
 from splink.internals.splink_dataframe import SplinkDataFrame
 from splink.internals.unique_id_concat import _composite_unique_id_from_nodes_sql
-from splink.internals.vertically_concatenate import vertically_concatenate_sql
 
 logger = logging.getLogger(__name__)
 
@@ -31,6 +33,8 @@ backend_link_type_options = Literal[
     "link_only", "link_and_dedupe", "dedupe_only", "two_dataset_link_only", "self_link"
 ]
 
+pair_deduplication_options = Literal["exclusion", "aggregation"]
+
 
 def blocking_rule_to_obj(br: BlockingRule | dict[str, Any] | str) -> BlockingRule:
     if isinstance(br, BlockingRule):
@@ -42,7 +46,13 @@ def blocking_rule_to_obj(br: BlockingRule | dict[str, Any] | str) -> BlockingRul
         sql_dialect_str = br.get("sql_dialect", None)
 
         salting_partitions = br.get("salting_partitions", None)
+        salting_block_size_threshold = br.get("salting_block_size_threshold", None)
         arrays_to_explode = br.get("arrays_to_explode", None)
+        sort_key = br.get("sort_key", None)
+        minhash_column = br.get("minhash_column", None)
+        token_column = br.get("token_column", None)
+        max_array_element_frequency = br.get("max_array_element_frequency", None)
+        band_expression = br.get("band_expression", None)
 
         if arrays_to_explode is not None and salting_partitions is not None:
             raise ValueError(
@@ -50,14 +60,94 @@ def blocking_rule_to_obj(br: BlockingRule | dict[str, Any] | str) -> BlockingRul
                 " both salted and exploding"
             )
 
+        if band_expression is not None:
+            if arrays_to_explode is not None or salting_partitions is not None:
+                raise ValueError(
+                    "Splink does not support band blocking rules "
+                    "that are salted or exploding"
+                )
+            return BandBlockingRule(
+                blocking_rule,
+                sql_dialect_str,
+                band_expression,
+                br.get("band_width", None),
+            )
+
+        if token_column is not None:
+            if arrays_to_explode is not None or salting_partitions is not None:
+                raise ValueError(
+                    "Splink does not support token blocking rules "
+                    "that are salted or exploding"
+                )
+            token_options = {
+                k: br[k] for k in ["max_token_frequency", "tokenise"] if k in br
+            }
+            return TokenBlockingRule(
+                blocking_rule, sql_dialect_str, token_column, **token_options
+            )
+
+        if minhash_column is not None:
+            if arrays_to_explode is not None or salting_partitions is not None:
+                raise ValueError(
+                    "Splink does not support MinHash LSH blocking rules "
+                    "that are salted or exploding"
+                )
+            lsh_options = {
+                k: br[k]
+                for k in ["num_bands", "rows_per_band", "shingle_type", "shingle_size"]
+                if k in br
+            }
+            return MinHashLSHBlockingRule(
+                blocking_rule, sql_dialect_str, minhash_column, **lsh_options
+            )
+
+        if sort_key is not None:
+            if arrays_to_explode is not None or salting_partitions is not None:
+                raise ValueError(
+                    "Splink does not support sorted neighbourhood blocking rules "
+                    "that are salted or exploding"
+                )
+            window_size = br.get("window_size", None)
+            if window_size is None:
+                raise ValueError(
+                    "window_size must be provided for a sorted neighbourhood "
+                    "blocking rule"
+                )
+            return SortedNeighbourhoodBlockingRule(
+                blocking_rule, sql_dialect_str, sort_key, window_size
+            )
+
+        if salting_block_size_threshold is not None:
+            if salting_partitions is None:
+                raise ValueError(
+                    "salting_partitions must be provided alongside "
+                    "salting_block_size_threshold, to set the maximum number of "
+                    "partitions any single blocking key can be split into"
+                )
+            return AdaptiveSaltedBlockingRule(
+                blocking_rule,
+                sql_dialect_str,
+                salting_partitions,
+                salting_block_size_threshold,
+            )
+
         if salting_partitions is not None:
             return SaltedBlockingRule(
                 blocking_rule, sql_dialect_str, salting_partitions
             )
 
+        if max_array_element_frequency is not None and arrays_to_explode is None:
+            raise ValueError(
+                "max_array_element_frequency can only be used alongside "
+                "arrays_to_explode"
+            )
+
         if arrays_to_explode is not None:
             return ExplodingBlockingRule(
-                blocking_rule, sql_dialect_str, arrays_to_explode
+                blocking_rule,
+                sql_dialect_str,
+                arrays_to_explode,
+                max_array_element_frequency,
             )
 
         return BlockingRule(blocking_rule, sql_dialect_str)
@@ -78,6 +168,19 @@ def combine_unique_id_input_columns(
     return unique_id_input_columns
 
 
+def _join_key_sqls(
+    unique_id_input_columns: List[InputColumn], use_row_id: bool
+) -> tuple[str, str]:
+    """The expressions identifying the left and right records of a pair - either
+    the integer row id of __splink__df_concat, or the composite unique id"""
+    if use_row_id:
+        return "l.__splink_row_id", "r.__splink_row_id"
+    return (
+        _composite_unique_id_from_nodes_sql(unique_id_input_columns, "l"),
+        _composite_unique_id_from_nodes_sql(unique_id_input_columns, "r"),
+    )
+
+
 class BlockingRule:
     def __init__(
         self,
@@ -153,14 +256,21 @@ class BlockingRule:
         input_tablename_l: str,
         input_tablename_r: str,
         where_condition: str,
+        use_row_id: bool = False,
+        exclude_preceding_rules: bool = True,
     ) -> str:
         if source_dataset_input_column:
             unique_id_columns = [source_dataset_input_column, unique_id_input_column]
         else:
             unique_id_columns = [unique_id_input_column]
 
-        uid_l_expr = _composite_unique_id_from_nodes_sql(unique_id_columns, "l")
-        uid_r_expr = _composite_unique_id_from_nodes_sql(unique_id_columns, "r")
+        uid_l_expr, uid_r_expr = _join_key_sqls(unique_id_columns, use_row_id)
+
+        exclude_sql = ""
+        if exclude_preceding_rules:
+            exclude_sql = self.exclude_pairs_generated_by_all_preceding_rules_sql(
+                source_dataset_input_column, unique_id_input_column
+            )
 
         sql = f"""
             select
@@ -172,10 +282,7 @@ class BlockingRule:
             on
             ({self.blocking_rule_sql})
             {where_condition}
-            {self.exclude_pairs_generated_by_all_preceding_rules_sql(
-                source_dataset_input_column,
-                unique_id_input_column)
-            }
+            {exclude_sql}
             """
         return sql
 
@@ -301,19 +408,22 @@ class SaltedBlockingRule(BlockingRule):
         input_tablename_l: str,
         input_tablename_r: str,
         where_condition: str,
+        use_row_id: bool = False,
+        exclude_preceding_rules: bool = True,
     ) -> str:
         if source_dataset_input_column:
             unique_id_columns = [source_dataset_input_column, unique_id_input_column]
         else:
             unique_id_columns = [unique_id_input_column]
 
-        uid_l_expr = _composite_unique_id_from_nodes_sql(unique_id_columns, "l")
-        uid_r_expr = _composite_unique_id_from_nodes_sql(unique_id_columns, "r")
+        uid_l_expr, uid_r_expr = _join_key_sqls(unique_id_columns, use_row_id)
 
         sqls = []
-        exclude_sql = self.exclude_pairs_generated_by_all_preceding_rules_sql(
-            source_dataset_input_column, unique_id_input_column
-        )
+        exclude_sql = ""
+        if exclude_preceding_rules:
+            exclude_sql = self.exclude_pairs_generated_by_all_preceding_rules_sql(
+                source_dataset_input_column, unique_id_input_column
+            )
         for salt in range(self.salting_partitions):
             salt_condition = self._salting_condition(salt)
             sql = f"""
@@ -333,6 +443,266 @@ class SaltedBlockingRule(BlockingRule):
         return " UNION ALL ".join(sqls)
 
 
+class AdaptiveSaltedBlockingRule(SaltedBlockingRule):
+    """A salted blocking rule that only salts the blocking keys which generate
+    large blocks.
+
+    Keys whose block size (pre filter conditions) exceeds
+    `salting_block_size_threshold` are split into
+    ceil(block size / threshold) partitions, up to a maximum of
+    `salting_partitions`.  All other keys are joined without salting.
+
+    The hot keys must first be found using `materialise_salting_hot_key_tables`.
+    If they have not been, the rule falls back to salting every key into
+    `salting_partitions` partitions, like a `SaltedBlockingRule`.
+    """
+
+    def __init__(
+        self,
+        blocking_rule: str,
+        sqlglot_dialect: str = None,
+        salting_partitions: int = 1,
+        salting_block_size_threshold: int = None,
+    ):
+        if salting_block_size_threshold is None or salting_block_size_threshold < 1:
+            raise ValueError("salting_block_size_threshold must be specified and > 0")
+
+        super().__init__(blocking_rule, sqlglot_dialect, salting_partitions)
+        self.salting_block_size_threshold = salting_block_size_threshold
+        self.hot_keys_table: Optional[SplinkDataFrame] = None
+
+        if not self._equi_join_conditions:
+            raise ValueError(
+                "Adaptive salting requires a blocking rule with at least one "
+                f"equi-join condition. {blocking_rule} has none."
+            )
+
+    def as_dict(self):
+        output = super().as_dict()
+        output["salting_block_size_threshold"] = self.salting_block_size_threshold
+        return output
+
+    @property
+    def _equi_join_keys_l(self) -> list[str]:
+        """The left hand side of the equi-join conditions, retaining the `l.`
+        table prefix, e.g. ['l.first_name', 'substr(l.dob, 1, 4)']
+        """
+        source_keys, _, _ = join_condition(self._parsed_join_condition)
+        return [k.sql(dialect=self.sqlglot_dialect) for k in source_keys]
+
+    def hot_keys_sql(self) -> str:
+        """Select the keys which need salting, and the number of partitions each
+        should be split into, from the per-key record counts produced when
+        counting comparisons pre filter conditions"""
+        keys = ", ".join(f"key_{i}" for i in range(len(self._equi_join_keys_l)))
+        threshold = self.salting_block_size_threshold
+        partitions_expr = f"ceiling(1e0 * count_l * count_r / {threshold})"
+        return f"""
+        select
+            {keys},
+            cast(
+                case
+                    when {partitions_expr} > {self.salting_partitions}
+                    then {self.salting_partitions}
+                    else {partitions_expr}
+                end
+            as int) as __splink_salting_partitions
+        from __splink__count_comparisons_from_blocking_l
+        inner join __splink__count_comparisons_from_blocking_r
+        using ({keys})
+        where count_l * count_r > {threshold}
+        """
+
+    def drop_materialised_hot_keys_dataframe(self):
+        if self.hot_keys_table is not None:
+            self.hot_keys_table.drop_table_from_database_and_remove_from_cache()
+        self.hot_keys_table = None
+
+    def create_blocked_pairs_sql(
+        self,
+        *,
+        source_dataset_input_column: Optional[InputColumn],
+        unique_id_input_column: InputColumn,
+        input_tablename_l: str,
+        input_tablename_r: str,
+        where_condition: str,
+        use_row_id: bool = False,
+        exclude_preceding_rules: bool = True,
+    ) -> str:
+        if self.hot_keys_table is None:
+            return super().create_blocked_pairs_sql(
+                source_dataset_input_column=source_dataset_input_column,
+                unique_id_input_column=unique_id_input_column,
+                input_tablename_l=input_tablename_l,
+                input_tablename_r=input_tablename_r,
+                where_condition=where_condition,
+                use_row_id=use_row_id,
+                exclude_preceding_rules=exclude_preceding_rules,
+            )
+
+        if source_dataset_input_column:
+            unique_id_columns = [source_dataset_input_column, unique_id_input_column]
+        else:
+            unique_id_columns = [unique_id_input_column]
+
+        uid_l_expr, uid_r_expr = _join_key_sqls(unique_id_columns, use_row_id)
+
+        exclude_sql = ""
+        if exclude_preceding_rules:
+            exclude_sql = self.exclude_pairs_generated_by_all_preceding_rules_sql(
+                source_dataset_input_column, unique_id_input_column
+            )
+
+        hot_keys_join_condition = " AND ".join(
+            f"{key_l} = hot_keys.key_{i}"
+            for i, key_l in enumerate(self._equi_join_keys_l)
+        )
+        hot_keys_tablename = self.hot_keys_table.physical_name
+
+        # Keys which do not generate large blocks are joined without salting
+        sqls = [
+            f"""
+            select
+            '{self.match_key}' as match_key,
+            {uid_l_expr} as join_key_l,
+            {uid_r_expr} as join_key_r
+            from {input_tablename_l} as l
+            left join {hot_keys_tablename} as hot_keys
+            on {hot_keys_join_condition}
+            inner join {input_tablename_r} as r
+            on
+            ({self.blocking_rule_sql}
+            AND hot_keys.__splink_salting_partitions is null)
+            {where_condition}
+            {exclude_sql}
+            """
+        ]
+
+        # Each hot key is split into its own number of partitions, so the
+        # n-th branch only contains keys with at least n partitions
+        for salt in range(self.salting_partitions):
+            salt_condition = (
+                "AND ceiling(l.__splink_salt * hot_keys.__splink_salting_partitions)"
+                f" = {salt + 1}"
+            )
+            sql = f"""
+            select
+            '{self.match_key}' as match_key,
+            {uid_l_expr} as join_key_l,
+            {uid_r_expr} as join_key_r
+            from {input_tablename_l} as l
+            inner join {hot_keys_tablename} as hot_keys
+            on {hot_keys_join_condition}
+            inner join {input_tablename_r} as r
+            on
+            ({self.blocking_rule_sql} {salt_condition})
+            {where_condition}
+            {exclude_sql}
+            """
+            sqls.append(sql)
+
+        return " UNION ALL ".join(sqls)
+
+
+class BandBlockingRule(BlockingRule):
+    """Pairs records whose values of `band_expression` differ by at most
+    `band_width`, such as dates of birth within a year of each other.
+
+    `blocking_rule` is the full condition, e.g. 'abs(l.dob - r.dob) <= 365',
+    which is how subsequent rules exclude the pairs generated by this rule.
+    Most backends execute such an inequality as a nested loop join.  Instead,
+    records are bucketed into bands of width `band_width`, so that any pair
+    within `band_width` of each other is in the same or an adjacent band.  The
+    pairs are then found using one equi-join on the band for each of these
+    three offsets, with the condition applied as a filter.
+    """
+
+    def __init__(
+        self,
+        blocking_rule: str,
+        sqlglot_dialect: str = None,
+        band_expression: str = None,
+        band_width: float = None,
+    ):
+        if band_expression is None:
+            raise ValueError("band_expression must be specified")
+        if band_width is None or band_width <= 0:
+            raise ValueError("band_width must be specified and > 0")
+
+        super().__init__(blocking_rule, sqlglot_dialect)
+        self.band_expression = band_expression
+        self.band_width = band_width
+
+    def _band_sql(self, table_name: str) -> str:
+        tree = parse_one(self.band_expression, dialect=self.sqlglot_dialect)
+        for node in tree.find_all(Column):
+            node.set("table", table_name)
+        band_expression = tree.sql(dialect=self.sqlglot_dialect)
+        return f"floor(({band_expression}) / {self.band_width})"
+
+    def create_blocked_pairs_sql(
+        self,
+        *,
+        source_dataset_input_column: Optional[InputColumn],
+        unique_id_input_column: InputColumn,
+        input_tablename_l: str,
+        input_tablename_r: str,
+        where_condition: str,
+        use_row_id: bool = False,
+        exclude_preceding_rules: bool = True,
+    ) -> str:
+        if source_dataset_input_column:
+            unique_id_columns = [source_dataset_input_column, unique_id_input_column]
+        else:
+            unique_id_columns = [unique_id_input_column]
+
+        uid_l_expr, uid_r_expr = _join_key_sqls(unique_id_columns, use_row_id)
+
+        exclude_sql = ""
+        if exclude_preceding_rules:
+            exclude_sql = self.exclude_pairs_generated_by_all_preceding_rules_sql(
+                source_dataset_input_column, unique_id_input_column
+            )
+
+        band_l = self._band_sql("l")
+        band_r = self._band_sql("r")
+
+        # The offsets are disjoint, so no pair is generated twice
+        sqls = []
+        for band_offset in ["", " + 1", " - 1"]:
+            sql = f"""
+            select
+            '{self.match_key}' as match_key,
+            {uid_l_expr} as join_key_l,
+            {uid_r_expr} as join_key_r
+            from {input_tablename_l} as l
+            inner join {input_tablename_r} as r
+            on
+            ({band_l} = {band_r}{band_offset}
+            AND ({self.blocking_rule_sql}))
+            {where_condition}
+            {exclude_sql}
+            """
+            sqls.append(sql)
+        return " UNION ALL ".join(sqls)
+
+    def as_dict(self):
+        output = super().as_dict()
+        output["band_expression"] = self.band_expression
+        output["band_width"] = self.band_width
+        return output
+
+    def _as_completed_dict(self):
+        return self.as_dict()
+
+    @property
+    def _human_readable_succinct(self):
+        return (
+            f"Band blocking rule on {self.band_expression} "
+            f"with band width {self.band_width}"
+        )
+
+
 def _explode_arrays_sql(db_api, tbl_name, columns_to_explode, other_columns_to_retain):
     return db_api.sql_dialect.explode_arrays_sql(
         tbl_name, columns_to_explode, other_columns_to_retain
@@ -345,6 +715,7 @@ class ExplodingBlockingRule(BlockingRule):
         blocking_rule: BlockingRule | dict[str, Any] | str,
         sqlglot_dialect: str = None,
         array_columns_to_explode: list[str] = [],
+        max_array_element_frequency: Optional[int] = None,
     ):
         if isinstance(blocking_rule, BlockingRule):
             blocking_rule_sql = blocking_rule.blocking_rule_sql
@@ -354,42 +725,100 @@ class ExplodingBlockingRule(BlockingRule):
             blocking_rule_sql = blocking_rule
         super().__init__(blocking_rule_sql, sqlglot_dialect)
         self.array_columns_to_explode: List[str] = array_columns_to_explode
+        self.max_array_element_frequency = max_array_element_frequency
         self.exploded_id_pair_table: Optional[SplinkDataFrame] = None
 
+    def marginal_id_pairs_sqls(
+        self,
+        db_api: DatabaseAPISubClass,
+        input_colnames: set[str],
+        source_dataset_input_column: Optional[InputColumn],
+        unique_id_input_column: InputColumn,
+        link_type: "LinkTypeLiteralType",
+        exclude_preceding_rules: bool = True,
+    ) -> list[dict[str, str]]:
+        """The sqls to compute the marginal id pairs table from
+        `__splink__df_concat_unnested`, see `unnested_concat_sqls`"""
+        sql = self.marginal_exploded_id_pairs_table_sql(
+            source_dataset_input_column=source_dataset_input_column,
+            unique_id_input_column=unique_id_input_column,
+            br=self,
+            link_type=link_type,
+            exclude_preceding_rules=exclude_preceding_rules,
+        )
+
+        return [
+            {"sql": sql, "output_table_name": self._marginal_id_pairs_table_name},
+        ]
+
+    def columns_used_by_marginal_id_pairs_sql(
+        self,
+        source_dataset_input_column: Optional[InputColumn],
+        exclude_preceding_rules: bool = True,
+    ) -> set[str]:
+        """The (unquoted) names of the columns of `__splink__df_concat_unnested`
+        needed to compute the marginal id pairs, so that no others need be unnested
+        """
+        columns = {"__splink_row_id", *self.array_columns_to_explode}
+        if source_dataset_input_column:
+            columns.add(source_dataset_input_column.unquote().name)
+
+        # The pairs of preceding exploding rules are excluded using row ids
+        rules: list[BlockingRule] = [self]
+        if exclude_preceding_rules:
+            rules += [
+                br
+                for br in self.preceding_rules
+                if not isinstance(br, ExplodingBlockingRule)
+            ]
+        for br in rules:
+            columns.update(
+                get_columns_used_from_sql(
+                    br.blocking_rule_sql, sqlglot_dialect=self.sqlglot_dialect
+                )
+            )
+        return columns
+
+    @property
+    def _marginal_id_pairs_table_name(self) -> str:
+        base_name = "__splink__marginal_exploded_ids_blocking_rule"
+        return f"{base_name}_mk_{self.match_key}"
+
     def marginal_exploded_id_pairs_table_sql(
         self,
         source_dataset_input_column: Optional[InputColumn],
         unique_id_input_column: InputColumn,
         br: BlockingRule,
         link_type: "LinkTypeLiteralType",
+        exclude_preceding_rules: bool = True,
     ) -> str:
         """generates a table of the marginal id pairs from the exploded blocking rule
         i.e. pairs are only created that match this blocking rule and NOT any of
         the preceding blocking rules
         """
 
-        unique_id_col = unique_id_input_column
         unique_id_input_columns = combine_unique_id_input_columns(
             source_dataset_input_column, unique_id_input_column
         )
 
-        where_condition = _sql_gen_where_condition(link_type, unique_id_input_columns)
-
-        id_expr_l = _composite_unique_id_from_nodes_sql(unique_id_input_columns, "l")
-        id_expr_r = _composite_unique_id_from_nodes_sql(unique_id_input_columns, "r")
+        where_condition = _sql_gen_where_condition(
+            link_type, unique_id_input_columns, use_row_id=True
+        )
 
         if link_type == "two_dataset_link_only":
             where_condition = (
                 where_condition + " and l.source_dataset < r.source_dataset"
             )
 
-        exclude_sql = self.exclude_pairs_generated_by_all_preceding_rules_sql(
-            source_dataset_input_column, unique_id_input_column
-        )
+        exclude_sql = ""
+        if exclude_preceding_rules:
+            exclude_sql = self.exclude_pairs_generated_by_all_preceding_rules_sql(
+                source_dataset_input_column, unique_id_input_column
+            )
         sql = f"""
             select distinct
-                {id_expr_l} as {unique_id_col.name_l},
-                {id_expr_r} as {unique_id_col.name_r}
+                l.__splink_row_id as __splink_row_id_l,
+                r.__splink_row_id as __splink_row_id_r
             from __splink__df_concat_unnested as l
             inner join __splink__df_concat_unnested as r
             on ({br.blocking_rule_sql})
@@ -414,12 +843,6 @@ class ExplodingBlockingRule(BlockingRule):
         so that subsequent statements do not produce duplicate pairs
         """
 
-        unique_id_column = unique_id_input_column
-
-        unique_id_input_columns = combine_unique_id_input_columns(
-            source_dataset_input_column, unique_id_input_column
-        )
-
         if (splink_df := self.exploded_id_pair_table) is None:
             raise SplinkException(
                 "Must use `materialise_exploded_id_table(linker)` "
@@ -428,14 +851,11 @@ class ExplodingBlockingRule(BlockingRule):
             )
         ids_to_compare_sql = f"select * from {splink_df.physical_name}"
 
-        id_expr_l = _composite_unique_id_from_nodes_sql(unique_id_input_columns, "l")
-        id_expr_r = _composite_unique_id_from_nodes_sql(unique_id_input_columns, "r")
-
         return f"""EXISTS (
             select 1 from ({ids_to_compare_sql}) as ids_to_compare
             where (
-                {id_expr_l} = ids_to_compare.{unique_id_column.name_l} and
-                {id_expr_r} = ids_to_compare.{unique_id_column.name_r}
+                l.__splink_row_id = ids_to_compare.__splink_row_id_l and
+                r.__splink_row_id = ids_to_compare.__splink_row_id_r
             )
         )
         """
@@ -448,8 +868,12 @@ class ExplodingBlockingRule(BlockingRule):
         input_tablename_l: str,
         input_tablename_r: str,
         where_condition: str,
+        use_row_id: bool = False,
+        exclude_preceding_rules: bool = True,
     ) -> str:
-        if self.exploded_id_pair_table is None:
+        # Pairs generated by preceding rules are excluded (or not) when the
+        # marginal id pairs table is materialised
+        if self.exploded_id_pair_table is None or not use_row_id:
             raise ValueError(
                 "Exploding blocking rules are not supported for the function you have"
                 " called."
@@ -459,8 +883,8 @@ class ExplodingBlockingRule(BlockingRule):
         sql = f"""
             select
                 '{self.match_key}' as match_key,
-                {unique_id_input_column.name_l} as join_key_l,
-                {unique_id_input_column.name_r} as join_key_r
+                __splink_row_id_l as join_key_l,
+                __splink_row_id_r as join_key_r
             from {exploded_id_pair_table.physical_name}
         """
         return sql
@@ -468,81 +892,733 @@ class ExplodingBlockingRule(BlockingRule):
     def as_dict(self):
         output = super().as_dict()
         output["arrays_to_explode"] = self.array_columns_to_explode
+        if self.max_array_element_frequency is not None:
+            output["max_array_element_frequency"] = self.max_array_element_frequency
+        return output
+
+
+class SortedNeighbourhoodBlockingRule(ExplodingBlockingRule):
+    """Sorts records by `sort_key` and pairs each record with the records that
+    follow it within a sliding window of `window_size` records.
+
+    Like an `ExplodingBlockingRule`, the pairs generated cannot be expressed as
+    a join condition, so the marginal id pairs are materialised up front using
+    `materialise_exploded_id_tables`, and subsequent rules exclude them using
+    that table.
+
+    `blocking_rule` is an additional condition which candidate pairs must
+    satisfy, usually '1=1'.
+    """
+
+    def __init__(
+        self,
+        blocking_rule: str,
+        sqlglot_dialect: str = None,
+        sort_key: str = None,
+        window_size: int = None,
+    ):
+        if sort_key is None:
+            raise ValueError("sort_key must be specified")
+        if window_size is None or window_size < 2:
+            raise ValueError("window_size must be specified and > 1")
+
+        super().__init__(blocking_rule, sqlglot_dialect, [])
+        self.sort_key = sort_key
+        self.window_size = window_size
+
+    @property
+    def _marginal_id_pairs_table_name(self) -> str:
+        base_name = "__splink__marginal_sorted_neighbourhood_ids_blocking_rule"
+        return f"{base_name}_mk_{self.match_key}"
+
+    def marginal_id_pairs_sqls(
+        self,
+        db_api: DatabaseAPISubClass,
+        input_colnames: set[str],
+        source_dataset_input_column: Optional[InputColumn],
+        unique_id_input_column: InputColumn,
+        link_type: "LinkTypeLiteralType",
+        exclude_preceding_rules: bool = True,
+    ) -> list[dict[str, str]]:
+        unique_id_input_columns = combine_unique_id_input_columns(
+            source_dataset_input_column, unique_id_input_column
+        )
+        order_by = ", ".join(
+            [self.sort_key] + [c.name for c in unique_id_input_columns]
+        )
+
+        # Records are numbered in sort order and grouped into consecutive buckets
+        # of window_size records, so that the window only ever spans a bucket and
+        # one of its neighbours.  This allows the pairs to be found using equi-joins
+        # on the bucket, keeping the number of candidates linear in N * W
+        sql = f"""
+        select
+            *,
+            floor(__splink_sn_rank / {self.window_size}) as __splink_sn_bucket
+        from (
+            select *, row_number() over (order by {order_by}) as __splink_sn_rank
+            from __splink__df_concat
+            where {self.sort_key} is not null
+        ) as ranked
+        """
+        sqls = [
+            {"sql": sql, "output_table_name": "__splink__df_concat_sorted"},
+        ]
+
+        where_condition = _sql_gen_where_condition(
+            link_type, unique_id_input_columns, use_row_id=True
+        )
+        if link_type == "two_dataset_link_only":
+            where_condition = (
+                where_condition + " and l.source_dataset < r.source_dataset"
+            )
+
+        exclude_sql = ""
+        if exclude_preceding_rules:
+            exclude_sql = self.exclude_pairs_generated_by_all_preceding_rules_sql(
+                source_dataset_input_column, unique_id_input_column
+            )
+
+        # The where condition determines which record of the pair is on the left,
+        # so r may be before or after l in the sort order
+        bucket_sqls = []
+        for bucket_offset in ["", " + 1", " - 1"]:
+            sql = f"""
+            select
+                l.__splink_row_id as __splink_row_id_l,
+                r.__splink_row_id as __splink_row_id_r
+            from __splink__df_concat_sorted as l
+            inner join __splink__df_concat_sorted as r
+            on r.__splink_sn_bucket = l.__splink_sn_bucket{bucket_offset}
+            and abs(r.__splink_sn_rank - l.__splink_sn_rank) < {self.window_size}
+            and ({self.blocking_rule_sql})
+            {where_condition}
+            {exclude_sql}
+            """
+            bucket_sqls.append(sql)
+
+        sqls.append(
+            {
+                "sql": " UNION ALL ".join(bucket_sqls),
+                "output_table_name": self._marginal_id_pairs_table_name,
+            }
+        )
+        return sqls
+
+    def as_dict(self):
+        output = BlockingRule.as_dict(self)
+        output["sort_key"] = self.sort_key
+        output["window_size"] = self.window_size
+        return output
+
+    def _as_completed_dict(self):
+        return self.as_dict()
+
+    @property
+    def _human_readable_succinct(self):
+        return (
+            f"Sorted neighbourhood blocking rule on {self.sort_key} "
+            f"with window size {self.window_size}"
+        )
+
+
+class MinHashLSHBlockingRule(ExplodingBlockingRule):
+    """Generates pairs of records whose values of `minhash_column` are likely to
+    have a high Jaccard similarity, using locality sensitive hashing.
+
+    A MinHash signature of `num_bands * rows_per_band` hashes is computed over
+    the shingles of each record's value, and split into `num_bands` bands.
+    Records are paired if all the hashes in any one band are equal, which
+    happens with probability `1 - (1 - s^rows_per_band)^num_bands` for values
+    with Jaccard similarity `s`.
+
+    Like an `ExplodingBlockingRule`, the marginal id pairs are materialised up
+    front using `materialise_exploded_id_tables`.
+
+    `blocking_rule` is an additional condition which candidate pairs must
+    satisfy, usually '1=1'.
+    """
+
+    def __init__(
+        self,
+        blocking_rule: str,
+        sqlglot_dialect: str = None,
+        minhash_column: str = None,
+        num_bands: int = 20,
+        rows_per_band: int = 5,
+        shingle_type: Literal["character", "word"] = "character",
+        shingle_size: int = 3,
+    ):
+        if minhash_column is None:
+            raise ValueError("minhash_column must be specified")
+        if num_bands < 1 or rows_per_band < 1 or shingle_size < 1:
+            raise ValueError(
+                "num_bands, rows_per_band and shingle_size must all be > 0"
+            )
+        if shingle_type not in ("character", "word"):
+            raise ValueError(
+                "shingle_type should be 'character' or 'word', "
+                f"received: '{shingle_type}'"
+            )
+
+        super().__init__(blocking_rule, sqlglot_dialect, [])
+        self.minhash_column = minhash_column
+        self.num_bands = num_bands
+        self.rows_per_band = rows_per_band
+        self.shingle_type = shingle_type
+        self.shingle_size = shingle_size
+
+    @property
+    def _marginal_id_pairs_table_name(self) -> str:
+        base_name = "__splink__marginal_minhash_lsh_ids_blocking_rule"
+        return f"{base_name}_mk_{self.match_key}"
+
+    def marginal_id_pairs_sqls(
+        self,
+        db_api: DatabaseAPISubClass,
+        input_colnames: set[str],
+        source_dataset_input_column: Optional[InputColumn],
+        unique_id_input_column: InputColumn,
+        link_type: "LinkTypeLiteralType",
+        exclude_preceding_rules: bool = True,
+    ) -> list[dict[str, str]]:
+        dialect = db_api.sql_dialect
+        unique_id_input_columns = combine_unique_id_input_columns(
+            source_dataset_input_column, unique_id_input_column
+        )
+        shingles = dialect.shingles_sql(
+            self.minhash_column, self.shingle_type, self.shingle_size
+        )
+        sql = f"""
+        select __splink_row_id, {shingles} as __splink_shingle
+        from __splink__df_concat
+        where {self.minhash_column} is not null
+        """
+        sqls = [{"sql": sql, "output_table_name": "__splink__df_concat_shingles"}]
+
+        sql = dialect.explode_arrays_sql(
+            "__splink__df_concat_shingles", ["__splink_shingle"], ["__splink_row_id"]
+        )
+        sqls.append(
+            {"sql": sql, "output_table_name": "__splink__df_concat_shingles_unnested"}
+        )
+
+        # Each hash function of the signature is the dialect's hash function,
+        # salted with the position of the hash in the signature
+        hash_fn = dialect.hash_function_name
+        num_hashes = self.num_bands * self.rows_per_band
+        minhashes = ", ".join(
+            f"min({hash_fn}(__splink_shingle || '-{i}')) as __splink_minhash_{i}"
+            for i in range(num_hashes)
+        )
+        sql = f"""
+        select __splink_row_id, {minhashes}
+        from __splink__df_concat_shingles_unnested
+        group by __splink_row_id
+        """
+        sqls.append(
+            {"sql": sql, "output_table_name": "__splink__df_concat_minhash_signatures"}
+        )
+
+        band_sqls = []
+        for band in range(self.num_bands):
+            band_hashes = ", ".join(
+                f"__splink_minhash_{band * self.rows_per_band + i} "
+                f"as __splink_band_hash_{i}"
+                for i in range(self.rows_per_band)
+            )
+            band_sqls.append(
+                f"""
+                select __splink_row_id, {band} as __splink_band, {band_hashes}
+                from __splink__df_concat_minhash_signatures
+                """
+            )
+        sqls.append(
+            {
+                "sql": " UNION ALL ".join(band_sqls),
+                "output_table_name": "__splink__df_concat_minhash_bands",
+            }
+        )
+
+        # The bands are self-joined with only the columns needed to pair
+        # records correctly for the link type
+        band_cols = ", ".join(
+            ["b.__splink_row_id", "b.__splink_band"]
+            + [f"b.__splink_band_hash_{i}" for i in range(self.rows_per_band)]
+        )
+        if source_dataset_input_column:
+            band_cols += f", c.{source_dataset_input_column.name}"
+            sql = f"""
+            select {band_cols}
+            from __splink__df_concat_minhash_bands as b
+            inner join __splink__df_concat as c
+            on b.__splink_row_id = c.__splink_row_id
+            """
+        else:
+            sql = f"""
+            select {band_cols}
+            from __splink__df_concat_minhash_bands as b
+            """
+        sqls.append({"sql": sql, "output_table_name": "__splink__df_concat_lsh"})
+
+        where_condition = _sql_gen_where_condition(
+            link_type, unique_id_input_columns, use_row_id=True
+        )
+        if link_type == "two_dataset_link_only":
+            where_condition = (
+                where_condition + " and l.source_dataset < r.source_dataset"
+            )
+
+        band_join = " and ".join(
+            ["l.__splink_band = r.__splink_band"]
+            + [
+                f"l.__splink_band_hash_{i} = r.__splink_band_hash_{i}"
+                for i in range(self.rows_per_band)
+            ]
+        )
+
+        sql = f"""
+            select distinct
+                l.__splink_row_id as __splink_row_id_l,
+                r.__splink_row_id as __splink_row_id_r
+            from __splink__df_concat_lsh as l
+            inner join __splink__df_concat_lsh as r
+            on {band_join}
+            {where_condition}
+            """
+        sqls.append(
+            {"sql": sql, "output_table_name": "__splink__minhash_lsh_candidate_pairs"}
+        )
+
+        # Bring back the remaining columns of each candidate pair, which are
+        # needed by the blocking rule and to exclude the pairs generated by
+        # preceding rules
+        exclude_sql = ""
+        if exclude_preceding_rules:
+            exclude_sql = self.exclude_pairs_generated_by_all_preceding_rules_sql(
+                source_dataset_input_column, unique_id_input_column
+            )
+
+        sql = f"""
+            select
+                p.__splink_row_id_l,
+                p.__splink_row_id_r
+            from __splink__minhash_lsh_candidate_pairs as p
+            inner join __splink__df_concat as l
+            on p.__splink_row_id_l = l.__splink_row_id
+            inner join __splink__df_concat as r
+            on p.__splink_row_id_r = r.__splink_row_id
+            where ({self.blocking_rule_sql})
+            {exclude_sql}
+            """
+        sqls.append(
+            {"sql": sql, "output_table_name": self._marginal_id_pairs_table_name}
+        )
+        return sqls
+
+    def as_dict(self):
+        output = BlockingRule.as_dict(self)
+        output["minhash_column"] = self.minhash_column
+        output["num_bands"] = self.num_bands
+        output["rows_per_band"] = self.rows_per_band
+        output["shingle_type"] = self.shingle_type
+        output["shingle_size"] = self.shingle_size
         return output
 
+    def _as_completed_dict(self):
+        return self.as_dict()
+
+    @property
+    def _human_readable_succinct(self):
+        return (
+            f"MinHash LSH blocking rule on {self.minhash_column} with "
+            f"{self.num_bands} bands of {self.rows_per_band} rows"
+        )
+
+
+class TokenBlockingRule(ExplodingBlockingRule):
+    """Generates pairs of records which share a token of `token_column`, using
+    an inverted index from each token to the records containing it.
+
+    `token_column` is either an array of tokens or, if `tokenise` is True, a
+    string which is split into words.  Tokens found in more than
+    `max_token_frequency` records are skipped, like stop words, so each token
+    generates at most `max_token_frequency * (max_token_frequency - 1) / 2`
+    pairs.
+
+    Like an `ExplodingBlockingRule`, the marginal id pairs are materialised up
+    front using `materialise_exploded_id_tables`.
+
+    `blocking_rule` is an additional condition which candidate pairs must
+    satisfy, usually '1=1'.
+    """
+
+    def __init__(
+        self,
+        blocking_rule: str,
+        sqlglot_dialect: str = None,
+        token_column: str = None,
+        max_token_frequency: int = 100,
+        tokenise: bool = False,
+    ):
+        if token_column is None:
+            raise ValueError("token_column must be specified")
+        if max_token_frequency < 2:
+            raise ValueError("max_token_frequency must be at least 2")
+
+        super().__init__(blocking_rule, sqlglot_dialect, [])
+        self.token_column = token_column
+        self.max_token_frequency = max_token_frequency
+        self.tokenise = tokenise
+
+    @property
+    def _marginal_id_pairs_table_name(self) -> str:
+        base_name = "__splink__marginal_token_ids_blocking_rule"
+        return f"{base_name}_mk_{self.match_key}"
+
+    def marginal_id_pairs_sqls(
+        self,
+        db_api: DatabaseAPISubClass,
+        input_colnames: set[str],
+        source_dataset_input_column: Optional[InputColumn],
+        unique_id_input_column: InputColumn,
+        link_type: "LinkTypeLiteralType",
+        exclude_preceding_rules: bool = True,
+    ) -> list[dict[str, str]]:
+        dialect = db_api.sql_dialect
+        unique_id_input_columns = combine_unique_id_input_columns(
+            source_dataset_input_column, unique_id_input_column
+        )
+
+        # The postings are kept slim, holding only what is needed to pair
+        # records correctly for the link type
+        posting_columns = ["__splink_row_id"]
+        if source_dataset_input_column:
+            posting_columns.append(source_dataset_input_column.name)
+
+        tokens = self.token_column
+        if self.tokenise:
+            tokens = dialect.shingles_sql(tokens, "word", 1)
+        sql = f"""
+        select {", ".join(posting_columns)}, {tokens} as __splink_token
+        from __splink__df_concat
+        where {self.token_column} is not null
+        """
+        sqls = [{"sql": sql, "output_table_name": "__splink__df_concat_tokens"}]
+
+        # The inverted index, without the postings of tokens too common to block on
+        sqls.extend(
+            unnested_concat_sqls(
+                db_api,
+                ["__splink_token"],
+                posting_columns,
+                self.max_token_frequency,
+                input_table_name="__splink__df_concat_tokens",
+                output_table_name="__splink__token_postings",
+            )
+        )
+
+        where_condition = _sql_gen_where_condition(
+            link_type, unique_id_input_columns, use_row_id=True
+        )
+        if link_type == "two_dataset_link_only":
+            where_condition = (
+                where_condition + " and l.source_dataset < r.source_dataset"
+            )
+
+        sql = f"""
+            select distinct
+                l.__splink_row_id as __splink_row_id_l,
+                r.__splink_row_id as __splink_row_id_r
+            from __splink__token_postings as l
+            inner join __splink__token_postings as r
+            on l.__splink_token = r.__splink_token
+            {where_condition}
+            """
+        sqls.append(
+            {"sql": sql, "output_table_name": "__splink__token_candidate_pairs"}
+        )
+
+        # Bring back the columns of each candidate pair which are needed by the
+        # blocking rule and to exclude the pairs generated by preceding rules
+        columns_used = self.columns_used_by_marginal_id_pairs_sql(
+            source_dataset_input_column, exclude_preceding_rules
+        )
+        columns_to_retain = [
+            c
+            for c in sorted(input_colnames)
+            if InputColumn(c, sqlglot_dialect_str=dialect.sqlglot_dialect)
+            .unquote()
+            .name
+            in columns_used
+        ]
+        sql = f"""
+        select {", ".join(columns_to_retain)}
+        from __splink__df_concat
+        """
+        sqls.append(
+            {"sql": sql, "output_table_name": "__splink__df_concat_token_columns"}
+        )
+
+        exclude_sql = ""
+        if exclude_preceding_rules:
+            exclude_sql = self.exclude_pairs_generated_by_all_preceding_rules_sql(
+                source_dataset_input_column, unique_id_input_column
+            )
+
+        sql = f"""
+            select
+                p.__splink_row_id_l,
+                p.__splink_row_id_r
+            from __splink__token_candidate_pairs as p
+            inner join __splink__df_concat_token_columns as l
+            on p.__splink_row_id_l = l.__splink_row_id
+            inner join __splink__df_concat_token_columns as r
+            on p.__splink_row_id_r = r.__splink_row_id
+            where ({self.blocking_rule_sql})
+            {exclude_sql}
+            """
+        sqls.append(
+            {"sql": sql, "output_table_name": self._marginal_id_pairs_table_name}
+        )
+        return sqls
+
+    def as_dict(self):
+        output = BlockingRule.as_dict(self)
+        output["token_column"] = self.token_column
+        output["max_token_frequency"] = self.max_token_frequency
+        output["tokenise"] = self.tokenise
+        return output
+
+    def _as_completed_dict(self):
+        return self.as_dict()
+
+    @property
+    def _human_readable_succinct(self):
+        return (
+            f"Token blocking rule on {self.token_column}, skipping tokens in more "
+            f"than {self.max_token_frequency} records"
+        )
+
+
+def unnested_concat_sqls(
+    db_api: DatabaseAPISubClass,
+    arrays_to_explode: list[str],
+    columns_to_retain: list[str],
+    max_array_element_frequency: Optional[int] = None,
+    input_table_name: str = "__splink__df_concat",
+    output_table_name: str = "__splink__df_concat_unnested",
+) -> list[dict[str, str]]:
+    """Unnest the `arrays_to_explode` of `input_table_name`, keeping only
+    `columns_to_retain` (escaped names) alongside them.
+
+    If `max_array_element_frequency` is given, array elements found in more than
+    this number of records are dropped, since they would generate very large
+    blocks whilst providing little evidence of a match.
+    """
+    dialect = db_api.sql_dialect.sqlglot_dialect
+    arrays_to_explode_quoted = [
+        InputColumn(colname, sqlglot_dialect_str=dialect).quote().name
+        for colname in arrays_to_explode
+    ]
+    other_columns_to_retain = [
+        c for c in columns_to_retain if c not in arrays_to_explode_quoted
+    ]
+
+    expl_sql = db_api.sql_dialect.explode_arrays_sql(
+        input_table_name, arrays_to_explode, other_columns_to_retain
+    )
+
+    if max_array_element_frequency is None:
+        return [{"sql": expl_sql, "output_table_name": output_table_name}]
+
+    all_elements_table_name = f"{output_table_name}_all_elements"
+
+    frequency_conditions = " and ".join(
+        f"""{col} in (
+            select {col}
+            from {all_elements_table_name}
+            group by {col}
+            having count(distinct __splink_row_id) <= {max_array_element_frequency}
+        )"""
+        for col in arrays_to_explode_quoted
+    )
+    sql = f"""
+    select *
+    from {all_elements_table_name}
+    where {frequency_conditions}
+    """
+    return [
+        {"sql": expl_sql, "output_table_name": all_elements_table_name},
+        {"sql": sql, "output_table_name": output_table_name},
+    ]
+
 
 def materialise_exploded_id_tables(
     link_type: "LinkTypeLiteralType",
     blocking_rules: List[BlockingRule],
     db_api: DatabaseAPISubClass,
-    splink_df_dict: dict[str, SplinkDataFrame],
+    df_concat: SplinkDataFrame,
     source_dataset_input_column: Optional[InputColumn],
     unique_id_input_column: InputColumn,
+    pair_deduplication: Optional[pair_deduplication_options] = None,
 ) -> list[ExplodingBlockingRule]:
+    """Materialise the marginal id pairs table of each exploding blocking rule.
+
+    `df_concat` is the materialised concatenation of the input tables, with row
+    ids, which the pairs are later joined to.  The pairs are derived from it,
+    rather than from a separate concatenation, since row ids are not the same
+    each time a concatenation is computed in some dialects.
+
+    `pair_deduplication` must match the value later passed to
+    `block_using_rules_sqls`.  By default, both choose the same strategy
+    automatically.
+
+    Rules which explode the same arrays share a single unnested table, retaining
+    only the columns they use.  This is cached, so is reused by later calls on
+    the same concatenation.
+    """
+    if pair_deduplication is None:
+        pair_deduplication = _pair_deduplication_strategy(blocking_rules)
+
     exploding_blocking_rules = [
         br for br in blocking_rules if isinstance(br, ExplodingBlockingRule)
     ]
 
     if len(exploding_blocking_rules) == 0:
         return []
-    exploded_tables = []
-
-    pipeline = CTEPipeline()
-
-    sql = vertically_concatenate_sql(
-        splink_df_dict,
-        salting_required=False,
-        source_dataset_input_column=source_dataset_input_column,
-    )
-    pipeline.enqueue_sql(sql, "__splink__df_concat")
-    nodes_concat = db_api.sql_pipeline_to_splink_dataframe(pipeline)
+    exclude_preceding_rules = pair_deduplication == "exclusion"
 
-    input_colnames = {col.name for col in nodes_concat.columns}
+    concat_sql = f"select * from {df_concat.physical_name}"
+    concat_colnames = df_concat.columns_escaped
 
+    # Rules exploding the same arrays (with the same frequency cap) share an
+    # unnested table, which needs the columns used by any of them
+    columns_used_by_unnested_table: dict[tuple[Any, ...], set[str]] = {}
     for br in exploding_blocking_rules:
-        pipeline = CTEPipeline([nodes_concat])
-        arrays_to_explode_quoted = [
-            InputColumn(colname, sqlglot_dialect_str=db_api.sql_dialect.sqlglot_dialect)
-            .quote()
-            .name
-            for colname in br.array_columns_to_explode
-        ]
-
-        expl_sql = db_api.sql_dialect.explode_arrays_sql(
-            "__splink__df_concat",
-            br.array_columns_to_explode,
-            list(input_colnames.difference(arrays_to_explode_quoted)),
+        if not br.array_columns_to_explode:
+            continue
+        key = (tuple(br.array_columns_to_explode), br.max_array_element_frequency)
+        columns_used_by_unnested_table.setdefault(key, set()).update(
+            br.columns_used_by_marginal_id_pairs_sql(
+                source_dataset_input_column, exclude_preceding_rules
+            )
         )
 
-        pipeline.enqueue_sql(
-            expl_sql,
-            "__splink__df_concat_unnested",
+    unnested_tables = {}
+    for key, columns_used in columns_used_by_unnested_table.items():
+        arrays_to_explode, max_array_element_frequency = key
+        columns_to_retain = [
+            c
+            for c in concat_colnames
+            if InputColumn(c, sqlglot_dialect_str=db_api.sql_dialect.sqlglot_dialect)
+            .unquote()
+            .name
+            in columns_used
+        ]
+        pipeline = CTEPipeline()
+        pipeline.enqueue_sql(concat_sql, "__splink__df_concat")
+        pipeline.enqueue_list_of_sqls(
+            unnested_concat_sqls(
+                db_api,
+                list(arrays_to_explode),
+                columns_to_retain,
+                max_array_element_frequency,
+            )
         )
+        unnested_tables[key] = db_api.sql_pipeline_to_splink_dataframe(pipeline)
 
-        base_name = "__splink__marginal_exploded_ids_blocking_rule"
-        table_name = f"{base_name}_mk_{br.match_key}"
+    for br in exploding_blocking_rules:
+        if br.array_columns_to_explode:
+            key = (tuple(br.array_columns_to_explode), br.max_array_element_frequency)
+            pipeline = CTEPipeline([unnested_tables[key]])
+        else:
+            pipeline = CTEPipeline()
+            pipeline.enqueue_sql(concat_sql, "__splink__df_concat")
 
-        sql = br.marginal_exploded_id_pairs_table_sql(
+        sqls = br.marginal_id_pairs_sqls(
+            db_api=db_api,
+            input_colnames=set(concat_colnames),
             source_dataset_input_column=source_dataset_input_column,
             unique_id_input_column=unique_id_input_column,
-            br=br,
             link_type=link_type,
+            exclude_preceding_rules=exclude_preceding_rules,
         )
-
-        pipeline.enqueue_sql(sql, table_name)
+        pipeline.enqueue_list_of_sqls(sqls)
 
         marginal_ids_table = db_api.sql_pipeline_to_splink_dataframe(pipeline)
         br.exploded_id_pair_table = marginal_ids_table
-        exploded_tables.append(marginal_ids_table)
 
     return exploding_blocking_rules
 
 
+def materialise_salting_hot_key_tables(
+    link_type: "LinkTypeLiteralType",
+    blocking_rules: List[BlockingRule],
+    db_api: DatabaseAPISubClass,
+    splink_df_dict: dict[str, SplinkDataFrame],
+) -> list[AdaptiveSaltedBlockingRule]:
+    """For each adaptively salted blocking rule, find the blocking keys that
+    generate blocks larger than the rule's threshold, and materialise them
+    alongside the number of salting partitions to use for each"""
+    # Avoid a circular import - blocking_analysis depends on this module
+    from splink.internals.blocking_analysis import (
+        _count_comparisons_from_blocking_rule_pre_filter_conditions_sqls,
+    )
+
+    adaptive_salted_blocking_rules = [
+        br for br in blocking_rules if isinstance(br, AdaptiveSaltedBlockingRule)
+    ]
+
+    if link_type == "two_dataset_link_only":
+        link_type = "link_only"
+
+    for br in adaptive_salted_blocking_rules:
+        sqls = _count_comparisons_from_blocking_rule_pre_filter_conditions_sqls(
+            splink_df_dict, br, link_type, db_api
+        )
+        # The final step computes block counts without the keys, so is not needed
+        pipeline = CTEPipeline()
+        pipeline.enqueue_list_of_sqls(sqls[:-1])
+        pipeline.enqueue_sql(
+            br.hot_keys_sql(), f"__splink__salting_hot_keys_mk_{br.match_key}"
+        )
+        br.hot_keys_table = db_api.sql_pipeline_to_splink_dataframe(pipeline)
+
+    return adaptive_salted_blocking_rules
+
+
+def _pair_deduplication_strategy(
+    blocking_rules: List[BlockingRule],
+) -> pair_deduplication_options:
+    """Choose how to avoid generating the same pair from more than one rule.
+
+    'exclusion' adds `AND NOT (<all preceding rules>)` to each rule's join, so the
+    number of predicates evaluated grows quadratically with the number of rules.
+    'aggregation' generates each rule's pairs independently and keeps the lowest
+    match_key of each pair in a single aggregation, so is preferred for larger
+    sets of rules, by an amount that depends on the backend.
+    """
+    dialect_strs = {
+        br._sql_dialect_str for br in blocking_rules if hasattr(br, "_sql_dialect_str")
+    }
+    if len(dialect_strs) != 1:
+        return "exclusion"
+
+    dialect = SplinkDialect.from_string(dialect_strs.pop())
+    if len(blocking_rules) >= (
+        dialect.min_blocking_rules_to_deduplicate_pairs_by_aggregation
+    ):
+        return "aggregation"
+    return "exclusion"
+
+
 def _sql_gen_where_condition(
-    link_type: backend_link_type_options, unique_id_cols: List[InputColumn]
+    link_type: backend_link_type_options,
+    unique_id_cols: List[InputColumn],
+    use_row_id: bool = False,
 ) -> str:
-    id_expr_l = _composite_unique_id_from_nodes_sql(unique_id_cols, "l")
-    id_expr_r = _composite_unique_id_from_nodes_sql(unique_id_cols, "r")
+    id_expr_l, id_expr_r = _join_key_sqls(unique_id_cols, use_row_id)
 
     if link_type in ("two_dataset_link_only", "self_link"):
         where_condition = " where 1=1 "
@@ -566,13 +1642,21 @@ def block_using_rules_sqls(
     link_type: "LinkTypeLiteralType",
     source_dataset_input_column: Optional[InputColumn],
     unique_id_input_column: InputColumn,
+    use_row_id: bool = False,
+    pair_deduplication: Optional[pair_deduplication_options] = None,
 ) -> list[dict[str, str]]:
     """Use the blocking rules specified in the linker's settings object to
     generate a SQL statement that will create pairwise record comparions
     according to the blocking rule(s).
 
     Where there are multiple blocking rules, the SQL statement contains logic
-    so that duplicate comparisons are not generated.
+    so that duplicate comparisons are not generated.  How this is done is
+    set by `pair_deduplication` - see `_pair_deduplication_strategy`, which
+    chooses it if not specified.
+
+    If `use_row_id` is True, the input tables must have the `__splink_row_id`
+    column of `__splink__df_concat`, and the pairs are identified by row id rather
+    than by the composite unique id.
     """
 
     sqls = []
@@ -581,7 +1665,9 @@ def block_using_rules_sqls(
         source_dataset_input_column, unique_id_input_column
     )
 
-    where_condition = _sql_gen_where_condition(link_type, unique_id_input_columns)
+    where_condition = _sql_gen_where_condition(
+        link_type, unique_id_input_columns, use_row_id
+    )
 
     # Cover the case where there are no blocking rules
     # This is a bit of a hack where if you do a self-join on 'true'
@@ -590,6 +1676,9 @@ def block_using_rules_sqls(
     if not blocking_rules:
         blocking_rules = [BlockingRule("1=1")]
 
+    if pair_deduplication is None:
+        pair_deduplication = _pair_deduplication_strategy(blocking_rules)
+
     br_sqls = []
 
     for br in blocking_rules:
@@ -599,11 +1688,77 @@ def block_using_rules_sqls(
             input_tablename_l=input_tablename_l,
             input_tablename_r=input_tablename_r,
             where_condition=where_condition,
+            use_row_id=use_row_id,
+            exclude_preceding_rules=pair_deduplication == "exclusion",
         )
         br_sqls.append(sql)
 
     sql = " UNION ALL ".join(br_sqls)
 
+    if pair_deduplication == "exclusion":
+        sqls.append({"sql": sql, "output_table_name": "__splink__blocked_id_pairs"})
+        return sqls
+
+    sqls.append(
+        {"sql": sql, "output_table_name": "__splink__blocked_id_pairs_all_rules"}
+    )
+
+    # match_key is a string, so map the lowest key back from its integer value
+    # rather than taking the min of the strings, which would sort '10' before '2'
+    match_key_cases = " ".join(
+        f"when {br.match_key} then '{br.match_key}'" for br in blocking_rules
+    )
+    sql = f"""
+    select
+        case min(cast(match_key as int)) {match_key_cases} end as match_key,
+        join_key_l,
+        join_key_r
+    from __splink__blocked_id_pairs_all_rules
+    group by join_key_l, join_key_r
+    """
     sqls.append({"sql": sql, "output_table_name": "__splink__blocked_id_pairs"})
 
     return sqls
+
+
+def input_fingerprint_sql(
+    table_name: str, column_names: list[str], sql_dialect: SplinkDialect
+) -> str:
+    """A cheap fingerprint of the contents of a table, which does not depend on
+    the order of its rows: the row count, and the xor of a hash of every row"""
+    hash_fn = sql_dialect.hash_function_name
+    return f"""
+    select
+        count(*) as row_count,
+        bit_xor({hash_fn}({", ".join(column_names)})) as row_hash
+    from {table_name}
+    """
+
+
+def persisted_blocked_pairs_table_name(
+    *,
+    blocking_rules: List[BlockingRule],
+    link_type: backend_link_type_options,
+    unique_id_column_names: list[str],
+    use_row_id: bool,
+    input_columns: list[str],
+    input_fingerprint: dict[str, Any],
+) -> str:
+    """A table name for the blocked pairs which is the same in every session for
+    the same blocking rules, link type and input data, so that the pairs can be
+    found and reused"""
+    key = json.dumps(
+        {
+            "blocking_rules": [br.as_dict() for br in blocking_rules],
+            "pair_deduplication": _pair_deduplication_strategy(blocking_rules),
+            "link_type": link_type,
+            "unique_id_column_names": unique_id_column_names,
+            "use_row_id": use_row_id,
+            "input_columns": input_columns,
+            "input_fingerprint": input_fingerprint,
+        },
+        sort_keys=True,
+        default=str,
+    )
+    key_hash = hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+    return f"__splink__blocked_id_pairs_persisted_{key_hash}"
@@ -8,7 +8,11 @@ import pandas as pd
 import sqlglot
 
 from splink.internals.blocking import (
+    BandBlockingRule,
     BlockingRule,
+    ExplodingBlockingRule,
+    SortedNeighbourhoodBlockingRule,
+    TokenBlockingRule,
     _sql_gen_where_condition,
     backend_link_type_options,
     block_using_rules_sqls,
@@ -186,6 +190,290 @@ def _count_comparisons_from_blocking_rule_pre_filter_conditions_sqls(
     return sqls
 
 
+def _estimate_comparisons_from_blocking_rule_pre_filter_conditions(
+    input_data_dict: dict[str, "SplinkDataFrame"],
+    blocking_rule: "BlockingRule",
+    link_type: str,
+    db_api: DatabaseAPISubClass,
+    sample_proportion: float,
+    seed: Optional[int] = None,
+) -> dict[str, float]:
+    """Estimate the number of comparisons generated pre filter conditions from a
+    random sample of the input data, rather than counting them exactly.
+
+    The join key frequencies are counted in a sample of the input records and
+    scaled up.  If c is the count of a key in a sample drawn with probability p,
+    c(c-1)/p^2 + c/p is an unbiased estimate of n^2, where n is the count of the
+    key in the full data.  For a link between two tables c_l * c_r / p^2 is an
+    unbiased estimate of n_l * n_r.  If the l and r keys of a rule differ, the
+    keys of a record may not match each other, so sum(c_l * c_r) is corrected
+    by the count d of sampled records whose keys do, giving
+    (sum(c_l * c_r) - d)/p^2 + d/p.
+
+    The standard error is also estimated from the sample, so will tend to be
+    too small if the sample is small enough that it misses many large blocks.
+
+    Returns:
+        dict: containing the estimate, its standard error and the realised
+            sample proportion
+    """
+    input_dataframes = list(input_data_dict.values())
+
+    join_conditions = blocking_rule._equi_join_conditions
+    two_dataset_link_only = link_type == "link_only" and len(input_dataframes) == 2
+    symmetric = all(l_key == r_key for l_key, r_key in join_conditions)
+
+    # Row counts are needed both by the dialects which sample a fixed number
+    # of rows, and to compute the realised sampling proportion
+    counts_sql = ", ".join(
+        f"(select count(*) from {df.physical_name}) as count_{i}"
+        for i, df in enumerate(input_dataframes)
+    )
+    pipeline = CTEPipeline()
+    pipeline.enqueue_sql(f"select {counts_sql}", "__splink__sample_row_counts")
+    row_counts_df = db_api.sql_pipeline_to_splink_dataframe(pipeline, use_cache=False)
+    row_counts = list(row_counts_df.as_record_dict()[0].values())
+    row_counts_df.drop_table_from_database_and_remove_from_cache()
+
+    columns_sql = ", ".join(input_dataframes[0].columns_escaped)
+
+    def sample_sql(table_indices: list[int]) -> str:
+        # Each input table is sampled separately, with its own seed, rather than
+        # sampling their vertical concatenation.  Some backends draw the same
+        # sample from each part of a union, which would bias the estimate.
+        sample_sqls = []
+        for i in table_indices:
+            sample = db_api.sql_dialect.random_sample_sql(
+                sample_proportion,
+                sample_proportion * row_counts[i],
+                seed=seed + i if seed is not None else None,
+            )
+            sample_sqls.append(
+                f"select * from (select {columns_sql} "
+                f"from {input_dataframes[i].physical_name} {sample}) as sample_{i}"
+            )
+        return " UNION ALL ".join(sample_sqls)
+
+    def key_counts(table_indices: list[int], side: str) -> SplinkDataFrame:
+        keys = [k_l if side == "l" else k_r for k_l, k_r in join_conditions]
+        keys_sel = ", ".join(f"{k} as key_{i}" for i, k in enumerate(keys))
+
+        # The key counts are materialised so that the random sample is drawn
+        # exactly once, however many times the counts are referenced below
+        pipeline = CTEPipeline()
+        pipeline.enqueue_sql(sample_sql(table_indices), f"__splink__df_sample_{side}")
+        sql = f"""
+        select {keys_sel}, count(*) as count_{side}
+        from __splink__df_sample_{side}
+        group by {", ".join(keys)}
+        """
+        pipeline.enqueue_sql(sql, f"__splink__sample_key_counts_{side}")
+        return db_api.sql_pipeline_to_splink_dataframe(pipeline, use_cache=False)
+
+    def key_pair_counts(table_indices: list[int]) -> SplinkDataFrame:
+        # The count of sampled records with each combination of l and r keys,
+        # from which the l and r key counts can both be derived
+        keys_l = [k_l for k_l, _ in join_conditions]
+        keys_r = [k_r for _, k_r in join_conditions]
+        keys_sel = ", ".join(
+            [f"{k} as key_l_{i}" for i, k in enumerate(keys_l)]
+            + [f"{k} as key_r_{i}" for i, k in enumerate(keys_r)]
+        )
+        pipeline = CTEPipeline()
+        pipeline.enqueue_sql(sample_sql(table_indices), "__splink__df_sample")
+        sql = f"""
+        select {keys_sel}, count(*) as count_lr
+        from __splink__df_sample
+        group by {", ".join(keys_l + keys_r)}
+        """
+        pipeline.enqueue_sql(sql, "__splink__sample_key_pair_counts")
+        return db_api.sql_pipeline_to_splink_dataframe(pipeline, use_cache=False)
+
+    using_str = ", ".join(f"key_{i}" for i in range(len(join_conditions)))
+    not_null_str = " and ".join(
+        f"key_{i} is not null" for i in range(len(join_conditions))
+    )
+
+    # 1e0 forces floating point arithmetic, avoiding integer overflow
+    if two_dataset_link_only:
+        key_counts_tables = [key_counts([0], "l"), key_counts([1], "r")]
+        totals = {"total_l": row_counts[0], "total_r": row_counts[1]}
+        sql = f"""
+        select
+            (select sum(count_l) from __splink__sample_key_counts_l)
+                as sample_size_l,
+            (select sum(count_r) from __splink__sample_key_counts_r)
+                as sample_size_r,
+            sum(1e0 * count_l * count_r) as s_lr,
+            sum(1e0 * count_l * count_l * count_r) as s_llr,
+            sum(1e0 * count_l * count_r * count_r) as s_lrr
+        from __splink__sample_key_counts_l
+        inner join __splink__sample_key_counts_r
+        using ({using_str})
+        """
+    elif symmetric:
+        key_counts_tables = [key_counts(list(range(len(input_dataframes))), "l")]
+        totals = {"total_l": sum(row_counts)}
+        sql = f"""
+        select
+            sum(count_l) as sample_size_l,
+            sum(case when {not_null_str} then 1e0 * count_l end) as s1,
+            sum(case when {not_null_str} then 1e0 * count_l * count_l end) as s2,
+            sum(case when {not_null_str} then 1e0 * count_l * count_l * count_l end)
+                as s3
+        from __splink__sample_key_counts_l
+        """
+    else:
+        # The l and r keys of a record differ, so each record i is counted by
+        # the l key counts under x_i and by the r key counts under y_i.  For
+        # each combination (x, y) of keys, a flags records which match
+        # themselves, o counts the other sampled records they match on either
+        # side, and w is the sum of the squares of those matches per record
+        key_counts_tables = [key_pair_counts(list(range(len(input_dataframes))))]
+        totals = {"total_l": sum(row_counts)}
+        n = len(join_conditions)
+        keys_l = [f"key_l_{i}" for i in range(n)]
+        keys_r = [f"key_r_{i}" for i in range(n)]
+        self_match = " and ".join(
+            f"p.{k_l} = p.{k_r}" for k_l, k_r in zip(keys_l, keys_r)
+        )
+
+        sql = f"""
+        select {", ".join(keys_l)}, sum(count_lr) as count_l
+        from __splink__sample_key_pair_counts
+        group by {", ".join(keys_l)}
+        """
+        sqls = [{"sql": sql, "output_table_name": "__splink__sample_key_counts_l"}]
+
+        sql = f"""
+        select {", ".join(keys_r)}, sum(count_lr) as count_r
+        from __splink__sample_key_pair_counts
+        group by {", ".join(keys_r)}
+        """
+        sqls.append({"sql": sql, "output_table_name": "__splink__sample_key_counts_r"})
+
+        on_r = " and ".join(f"p.{k_l} = cr.{k_r}" for k_l, k_r in zip(keys_l, keys_r))
+        on_l = " and ".join(f"p.{k_r} = cl.{k_l}" for k_l, k_r in zip(keys_l, keys_r))
+        on_rev = " and ".join(
+            f"p.{k_l} = rev.{k_r} and p.{k_r} = rev.{k_l}"
+            for k_l, k_r in zip(keys_l, keys_r)
+        )
+        sql = f"""
+        select
+            1e0 * p.count_lr as m,
+            coalesce(cr.count_r, 0) as count_r,
+            coalesce(cl.count_l, 0) as count_l,
+            coalesce(rev.count_lr, 0) as count_rev,
+            case when {self_match} then 1 else 0 end as a
+        from __splink__sample_key_pair_counts as p
+        left join __splink__sample_key_counts_r as cr on {on_r}
+        left join __splink__sample_key_counts_l as cl on {on_l}
+        left join __splink__sample_key_pair_counts as rev on {on_rev}
+        """
+        sqls.append({"sql": sql, "output_table_name": "__splink__sample_key_pairs"})
+
+        sql = """
+        select
+            m,
+            count_r,
+            a,
+            count_r + count_l - 2 * a as o,
+            count_r + count_l - 2 * a + 2 * (count_rev - a) as w
+        from __splink__sample_key_pairs
+        """
+        sqls.append(
+            {"sql": sql, "output_table_name": "__splink__sample_key_pair_matches"}
+        )
+
+        sql = """
+        select
+            sum(m) as sample_size_l,
+            sum(m * count_r) as s_lr,
+            sum(m * a) as d,
+            sum(m * a * o) as s_ao,
+            sum(m * o * o) as s_oo,
+            sum(m * w) as s_w
+        from __splink__sample_key_pair_matches
+        """
+        sqls.append(
+            {"sql": sql, "output_table_name": "__splink__sample_key_count_sums"}
+        )
+
+    pipeline = CTEPipeline(key_counts_tables)
+    if not two_dataset_link_only and not symmetric:
+        pipeline.enqueue_list_of_sqls(sqls)
+    else:
+        pipeline.enqueue_sql(sql, "__splink__sample_key_count_moments")
+
+    moments_df = db_api.sql_pipeline_to_splink_dataframe(pipeline, use_cache=False)
+    moments = {k: float(v or 0) for k, v in moments_df.as_record_dict()[0].items()}
+    for df in [moments_df, *key_counts_tables]:
+        df.drop_table_from_database_and_remove_from_cache()
+
+    def realised_proportion(sample_size, total):
+        return sample_size / total if total else 1.0
+
+    if two_dataset_link_only:
+        p_l = realised_proportion(moments["sample_size_l"], totals["total_l"])
+        p_r = realised_proportion(moments["sample_size_r"], totals["total_r"])
+        if p_l == 0 or p_r == 0:
+            raise ValueError(
+                "The sample drawn from the input data was empty. "
+                "Please increase sample_proportion."
+            )
+        q_l, q_r = 1 / p_l, 1 / p_r
+        s_lr, s_llr, s_lrr = moments["s_lr"], moments["s_llr"], moments["s_lrr"]
+        estimate = q_l * q_r * s_lr
+        # For a key with counts n_l, n_r the variance of the estimate is
+        # (q_l - 1)(q_r - 1) n_l n_r + (q_l - 1) n_l n_r^2 + (q_r - 1) n_l^2 n_r.
+        # Each product of n is replaced by its unbiased estimate from the sample
+        variance = (
+            (q_l - 1) * (q_r - 1) * q_l * q_r * s_lr
+            + (q_l - 1) * q_l * (q_r**2 * (s_lrr - s_lr) + q_r * s_lr)
+            + (q_r - 1) * q_r * (q_l**2 * (s_llr - s_lr) + q_l * s_lr)
+        )
+        proportion = min(p_l, p_r)
+    else:
+        p = realised_proportion(moments["sample_size_l"], totals["total_l"])
+        if p == 0:
+            raise ValueError(
+                "The sample drawn from the input data was empty. "
+                "Please increase sample_proportion."
+            )
+        q = 1 / p
+        if not symmetric:
+            s_lr, d = moments["s_lr"], moments["d"]
+            s_ao, s_oo, s_w = moments["s_ao"], moments["s_oo"], moments["s_w"]
+            # Pairs of distinct records are sampled with probability p^2, and each
+            # record paired with itself with probability p
+            estimate = q**2 * (s_lr - d) + q * d
+            # If b_ij counts the sides on which records i and j match, and B_i is
+            # the sum of b_ij over j, the variance of the estimate is
+            # (q - 1)^2 sum_{i<j} b_ij^2 + (q - 1) sum_i (a_i + B_i)^2.  Both sums
+            # are replaced by their unbiased estimates from the sample
+            variance = (q - 1) ** 2 * q**2 * s_w / 2 + (q - 1) * q * (
+                d + 2 * q * s_ao + q**2 * s_oo - (q - 1) * q * s_w
+            )
+            proportion = p
+        else:
+            s1, s2, s3 = moments["s1"], moments["s2"], moments["s3"]
+            # Sums of the falling factorials c(c-1) and c(c-1)(c-2) over keys
+            f2 = s2 - s1
+            f3 = s3 - 3 * s2 + 2 * s1
+            estimate = q**2 * f2 + q * s1
+            # For a key with count n the variance of the estimate is
+            # (q - 1)(4n(n-1)(n-2) + (2q + 6)n(n-1) + n).  Each falling factorial
+            # of n is replaced by its unbiased estimate from the sample
+            variance = (q - 1) * (4 * q**3 * f3 + (2 * q + 6) * q**2 * f2 + q * s1)
+            proportion = p
+
+    return {
+        "estimate": estimate,
+        "standard_error": math.sqrt(max(variance, 0)),
+        "sample_proportion": proportion,
+    }
+
+
 def _row_counts_per_input_table(
     *,
     splink_df_dict: dict[str, "SplinkDataFrame"],
@@ -288,10 +576,21 @@ def _cumulative_comparisons_to_be_scored_from_blocking_rules(
     max_rows_limit: int = int(1e9),
     unique_id_input_column: InputColumn,
     source_dataset_input_column: Optional[InputColumn],
+    estimate_from_key_frequencies: bool = False,
 ) -> pd.DataFrame:
     # Check none of the blocking rules will create a vast/computationally
-    # intractable number of comparisons
-    for br in blocking_rules:
+    # intractable number of comparisons.  When estimating, no pairs are
+    # generated so there is nothing to guard against
+    for br in [] if estimate_from_key_frequencies else blocking_rules:
+        # A sorted neighbourhood rule's comparisons are bounded by the window size,
+        # a token rule's by its maximum token frequency and a band rule's by its
+        # band width, but their conditions on their own would be counted as a
+        # cartesian product
+        if isinstance(
+            br,
+            (SortedNeighbourhoodBlockingRule, TokenBlockingRule, BandBlockingRule),
+        ):
+            continue
         # TODO: Deal properly with exlpoding rules
         count = _count_comparisons_generated_from_blocking_rule(
             splink_df_dict=splink_df_dict,
@@ -326,26 +625,56 @@ def _cumulative_comparisons_to_be_scored_from_blocking_rules(
 
     cartesian_count = calculate_cartesian(rc, link_type)
 
+    if estimate_from_key_frequencies:
+        marginal_counts = _estimate_marginal_comparisons_from_key_frequencies(
+            splink_df_dict=splink_df_dict,
+            blocking_rules=blocking_rules,
+            link_type=link_type,
+            db_api=db_api,
+            source_dataset_input_column=source_dataset_input_column,
+            cartesian_count=cartesian_count,
+        )
+        result_df = pd.DataFrame(
+            {
+                "row_count": marginal_counts,
+                "match_key": [str(i) for i in range(len(blocking_rules))],
+            }
+        )
+        return _cumulative_comparisons_dataframe(
+            blocking_rules, result_df, cartesian_count
+        )
+
     for n, br in enumerate(blocking_rules):
         br.add_preceding_rules(blocking_rules[:n])
 
-    exploding_br_with_id_tables = materialise_exploded_id_tables(
-        link_type,
-        blocking_rules,
-        db_api,
-        splink_df_dict,
-        source_dataset_input_column=source_dataset_input_column,
-        unique_id_input_column=unique_id_input_column,
-    )
-
     pipeline = CTEPipeline()
 
     sql = vertically_concatenate_sql(
         splink_df_dict,
         salting_required=False,
         source_dataset_input_column=source_dataset_input_column,
+        unique_id_input_column=unique_id_input_column,
+        sql_dialect=db_api.sql_dialect,
     )
 
+    # Exploding blocking rules derive their pairs from a materialised
+    # concatenation, so that they share its row ids
+    df_concat = None
+    exploding_br_with_id_tables = []
+    if any(isinstance(br, ExplodingBlockingRule) for br in blocking_rules):
+        pipeline.enqueue_sql(sql, "__splink__df_concat_with_row_ids")
+        df_concat = db_api.sql_pipeline_to_splink_dataframe(pipeline)
+        exploding_br_with_id_tables = materialise_exploded_id_tables(
+            link_type,
+            blocking_rules,
+            db_api,
+            df_concat,
+            source_dataset_input_column=source_dataset_input_column,
+            unique_id_input_column=unique_id_input_column,
+        )
+        pipeline = CTEPipeline([df_concat])
+        sql = f"select * from {df_concat.templated_name}"
+
     pipeline.enqueue_sql(sql, "__splink__df_concat")
 
     blocking_input_tablename_l = "__splink__df_concat"
@@ -376,6 +705,7 @@ def _cumulative_comparisons_to_be_scored_from_blocking_rules(
         link_type=link_type,
         unique_id_input_column=unique_id_input_column,
         source_dataset_input_column=source_dataset_input_column,
+        use_row_id=True,
     )
 
     pipeline.enqueue_list_of_sqls(sqls)
@@ -392,7 +722,19 @@ def _cumulative_comparisons_to_be_scored_from_blocking_rules(
 
     result_df = db_api.sql_pipeline_to_splink_dataframe(pipeline).as_pandas_dataframe()
 
-    # The above table won't include rules that have no matches
+    [b.drop_materialised_id_pairs_dataframe() for b in exploding_br_with_id_tables]
+    if df_concat is not None:
+        df_concat.drop_table_from_database_and_remove_from_cache()
+
+    return _cumulative_comparisons_dataframe(blocking_rules, result_df, cartesian_count)
+
+
+def _cumulative_comparisons_dataframe(
+    blocking_rules: List[BlockingRule],
+    result_df: pd.DataFrame,
+    cartesian_count: float,
+) -> pd.DataFrame:
+    # result_df won't include rules that have no matches
     all_rules_df = pd.DataFrame(
         {
             "match_key": [str(i) for i in range(len(blocking_rules))],
@@ -418,8 +760,6 @@ def _cumulative_comparisons_to_be_scored_from_blocking_rules(
         complete_df["cartesian"] = cartesian_count
         complete_df["start"] = 0
 
-    [b.drop_materialised_id_pairs_dataframe() for b in exploding_br_with_id_tables]
-
     col_order = [
         "blocking_rule",
         "row_count",
@@ -432,6 +772,266 @@ def _cumulative_comparisons_to_be_scored_from_blocking_rules(
     return complete_df[col_order]
 
 
+def _non_null_keys_sqls(keys: list[int]) -> tuple[str, str]:
+    """SQL expressions for the number of the given keys which are non-null, and for
+    a bitmask identifying them"""
+    num_non_null_str = " + ".join(
+        f"(case when key_{i} is not null then 1 else 0 end)" for i in keys
+    )
+    key_mask_str = " + ".join(
+        f"(case when key_{i} is not null then {2**i} else 0 end)" for i in keys
+    )
+    return num_non_null_str, key_mask_str
+
+
+def _count_comparisons_by_grouping_sets_sqls(
+    input_data_dict: dict[str, "SplinkDataFrame"],
+    key_expressions: list[str],
+    combinations: list[list[int]],
+    link_type: str,
+) -> list[dict[str, str]]:
+    """Count the comparisons generated by equi-joins on each of several
+    combinations of key expressions, in a single scan of the input data.
+
+    All combinations must contain the same number of keys.  Each combination is
+    a grouping set, so after aggregation the keys outside a combination are
+    null. Groups in which a key of the combination is null generate no
+    comparisons, so the remaining groups are exactly those with the expected
+    number of non-null keys, and the combination is identified by which keys
+    those are (output as a bitmask, key_mask).
+    """
+    input_dataframes = list(input_data_dict.values())
+    two_dataset_link_only = link_type == "link_only" and len(input_dataframes) == 2
+
+    keys = sorted({i for combination in combinations for i in combination})
+    keys_sel_str = ", ".join(f"{key_expressions[i]} as key_{i}" for i in keys)
+
+    sqls = []
+
+    if two_dataset_link_only:
+        sql = f"""
+        select 0 as side, {keys_sel_str} from {input_dataframes[0].physical_name}
+        union all
+        select 1 as side, {keys_sel_str} from {input_dataframes[1].physical_name}
+        """
+        counts_sel_str = """
+        count(case when side = 0 then 1 end) as count_l,
+        count(case when side = 1 then 1 end) as count_r
+        """
+    else:
+        sql = vertically_concatenate_sql(
+            input_data_dict, salting_required=False, source_dataset_input_column=None
+        )
+        sqls.append({"sql": sql, "output_table_name": "__splink__df_concat"})
+        sql = f"select {keys_sel_str} from __splink__df_concat"
+        counts_sel_str = "count(*) as count_l, count(*) as count_r"
+
+    sqls.append({"sql": sql, "output_table_name": "__splink__blocking_keys"})
+
+    keys_str = ", ".join(f"key_{i}" for i in keys)
+    grouping_sets_str = ", ".join(
+        "(" + ", ".join(f"key_{i}" for i in combination) + ")"
+        for combination in combinations
+    )
+    sql = f"""
+    select {keys_str}, {counts_sel_str}
+    from __splink__blocking_keys
+    group by grouping sets ({grouping_sets_str})
+    """
+    sqls.append(
+        {"sql": sql, "output_table_name": "__splink__block_counts_by_grouping_set"}
+    )
+
+    num_non_null_str, key_mask_str = _non_null_keys_sqls(keys)
+    sql = f"""
+    select
+        {key_mask_str} as key_mask,
+        cast(sum(count_l * count_r) as bigint)
+            as count_of_pairwise_comparisons_generated
+    from __splink__block_counts_by_grouping_set
+    where {num_non_null_str} = {len(combinations[0])}
+    group by {key_mask_str}
+    """
+    sqls.append(
+        {"sql": sql, "output_table_name": "__splink__total_of_block_counts_by_mask"}
+    )
+
+    return sqls
+
+
+def _count_distinct_pairs_by_key_sets_sqls(
+    input_data_dict: dict[str, "SplinkDataFrame"],
+    key_expressions: list[str],
+    key_sets: list[list[int]],
+    link_type: backend_link_type_options,
+    source_dataset_input_column: Optional[InputColumn],
+) -> list[dict[str, str]]:
+    """Count the distinct pairs of records, allowed by the link type, which agree on
+    every key in each of several key sets, in a single scan of the input data.
+
+    As in _count_comparisons_by_grouping_sets_sqls, all key sets must contain the
+    same number of keys, and are identified in the output by key_mask.  The
+    output is twice the number of pairs, to avoid integer division in SQL.
+    """
+    keys = sorted({i for key_set in key_sets for i in key_set})
+    keys_sel_str = ", ".join(f"{key_expressions[i]} as key_{i}" for i in keys)
+
+    # Pairs of records from the same source dataset are not compared in
+    # link_only, so they must be counted separately and subtracted
+    link_only = link_type in ("link_only", "two_dataset_link_only")
+    source_sel_str = ""
+    if link_only:
+        source_sel_str = f"{source_dataset_input_column.name} as source_dataset, "
+
+    sqls = []
+    sql = vertically_concatenate_sql(
+        input_data_dict,
+        salting_required=False,
+        source_dataset_input_column=source_dataset_input_column,
+    )
+    sqls.append({"sql": sql, "output_table_name": "__splink__df_concat"})
+
+    sql = f"select {source_sel_str}{keys_sel_str} from __splink__df_concat"
+    sqls.append({"sql": sql, "output_table_name": "__splink__blocking_keys"})
+
+    group_by_sets = [
+        (["source_dataset"] if link_only else []) + [f"key_{i}" for i in key_set]
+        for key_set in key_sets
+    ]
+    if len(group_by_sets) == 1:
+        group_by_str = ", ".join(group_by_sets[0])
+    else:
+        grouping_sets_str = ", ".join(f"({', '.join(g)})" for g in group_by_sets)
+        group_by_str = f"grouping sets ({grouping_sets_str})"
+
+    keys_str = ", ".join(f"key_{i}" for i in keys)
+    sql = f"""
+    select {keys_str}, count(*) as key_count
+    from __splink__blocking_keys
+    group by {group_by_str}
+    """
+    sqls.append({"sql": sql, "output_table_name": "__splink__key_counts_by_key_set"})
+
+    num_non_null_str, key_mask_str = _non_null_keys_sqls(keys)
+    sql = f"""
+    select
+        {key_mask_str} as key_mask,
+        sum(key_count) as key_count,
+        sum(key_count * key_count) as sum_of_squared_source_counts
+    from __splink__key_counts_by_key_set
+    where {num_non_null_str} = {len(key_sets[0])}
+    group by {key_mask_str}, {keys_str}
+    """
+    sqls.append({"sql": sql, "output_table_name": "__splink__key_counts_by_mask"})
+
+    same_record_or_source = "sum_of_squared_source_counts" if link_only else "key_count"
+    sql = f"""
+    select
+        key_mask,
+        cast(sum(key_count * key_count - {same_record_or_source}) as bigint)
+            as twice_count_of_pairs
+    from __splink__key_counts_by_mask
+    group by key_mask
+    """
+    sqls.append({"sql": sql, "output_table_name": "__splink__pair_counts_by_mask"})
+
+    return sqls
+
+
+def _estimate_marginal_comparisons_from_key_frequencies(
+    *,
+    splink_df_dict: dict[str, "SplinkDataFrame"],
+    blocking_rules: List[BlockingRule],
+    link_type: backend_link_type_options,
+    db_api: DatabaseAPISubClass,
+    source_dataset_input_column: Optional[InputColumn],
+    cartesian_count: float,
+) -> list[int]:
+    """Estimate the number of comparisons each blocking rule adds to those of the
+    preceding rules, without generating any pairs.
+
+    The pairs generated by a combination of rules are those which agree on every
+    equi-join key of every rule in the combination, which can be counted from key
+    frequencies.  The pairs added by each rule then follow by inclusion–exclusion
+    over the preceding rules.  Filter conditions are ignored, so if any rule has
+    them the cumulative sum of the result is an upper bound.  Otherwise the
+    result is exact.
+    """
+    key_expressions: list[str] = []
+    rule_key_sets: list[frozenset[int]] = []
+    for br in blocking_rules:
+        if isinstance(br, (ExplodingBlockingRule, BandBlockingRule)) or any(
+            l_key != r_key for l_key, r_key in br._equi_join_conditions
+        ):
+            raise ValueError(
+                f"Blocking rule {br.blocking_rule_sql} cannot be analysed using "
+                "key frequencies.  Only rules whose equi-join conditions compare "
+                "the same expression on both sides, and which are not band rules "
+                "or explode arrays, are supported.  Set "
+                "estimate_from_key_frequencies=False to count pairs exactly."
+            )
+        key_set = set()
+        for l_key, _ in br._equi_join_conditions:
+            if l_key not in key_expressions:
+                key_expressions.append(l_key)
+            key_set.add(key_expressions.index(l_key))
+        rule_key_sets.append(frozenset(key_set))
+
+    # Express the pairs of each rule not generated by preceding rules, and the
+    # union of the pairs of all rules so far, as signed sums of counts of pairs
+    # agreeing on sets of keys
+    union_terms: dict[frozenset[int], int] = {}
+    marginal_terms: list[dict[frozenset[int], int]] = []
+    for key_set in rule_key_sets:
+        terms = {key_set: 1}
+        for other_key_set, coefficient in union_terms.items():
+            combined = key_set | other_key_set
+            terms[combined] = terms.get(combined, 0) - coefficient
+        marginal_terms.append(terms)
+
+        for k, coefficient in terms.items():
+            union_terms[k] = union_terms.get(k, 0) + coefficient
+        union_terms = {k: c for k, c in union_terms.items() if c != 0}
+
+    key_sets_to_count = {k for terms in marginal_terms for k in terms if k}
+    key_sets_by_size: dict[int, list[list[int]]] = {}
+    for k in sorted(key_sets_to_count, key=sorted):
+        key_sets_by_size.setdefault(len(k), []).append(sorted(k))
+
+    if db_api.sql_dialect.supports_grouping_sets:
+        batches = list(key_sets_by_size.values())
+    else:
+        batches = [[k] for ks in key_sets_by_size.values() for k in ks]
+
+    # With no keys, every pair allowed by the link type agrees
+    pair_counts = {frozenset(): cartesian_count}
+    for key_sets in batches:
+        pipeline = CTEPipeline()
+        sqls = _count_distinct_pairs_by_key_sets_sqls(
+            splink_df_dict,
+            key_expressions,
+            key_sets,
+            link_type,
+            source_dataset_input_column,
+        )
+        pipeline.enqueue_list_of_sqls(sqls)
+        counts_df = db_api.sql_pipeline_to_splink_dataframe(pipeline)
+        counts_by_mask = {
+            int(r["key_mask"]): r["twice_count_of_pairs"]
+            for r in counts_df.as_record_dict()
+        }
+        counts_df.drop_table_from_database_and_remove_from_cache()
+
+        for k in key_sets:
+            count = counts_by_mask.get(sum(2**i for i in k)) or 0
+            pair_counts[frozenset(k)] = int(count) / 2
+
+    return [
+        round(sum(c * pair_counts[k] for k, c in terms.items()))
+        for terms in marginal_terms
+    ]
+
+
 def _count_comparisons_generated_from_blocking_rule(
     *,
     splink_df_dict: dict[str, "SplinkDataFrame"],
@@ -442,27 +1042,50 @@ def _count_comparisons_generated_from_blocking_rule(
     max_rows_limit: int = int(1e9),
     unique_id_input_column: InputColumn,
     source_dataset_input_column: Optional[InputColumn],
+    sample_proportion: Optional[float] = None,
+    seed: Optional[int] = None,
 ) -> dict[str, Union[int, str]]:
     # TODO: if it's an exploding blocking rule, make sure we error out
-    pipeline = CTEPipeline()
-    sqls = _count_comparisons_from_blocking_rule_pre_filter_conditions_sqls(
-        splink_df_dict, blocking_rule, link_type, db_api
+
+    # Without equi-join conditions the count is a cheap cartesian product,
+    # so there is nothing to be gained by estimating it
+    estimate_from_sample = (
+        sample_proportion is not None and len(blocking_rule._equi_join_conditions) > 0
     )
-    pipeline.enqueue_list_of_sqls(sqls)
 
-    sql = """
-    select cast(sum(block_count) as bigint) as count_of_pairwise_comparisons_generated
-    from __splink__block_counts
-    """
+    if estimate_from_sample:
+        estimate = _estimate_comparisons_from_blocking_rule_pre_filter_conditions(
+            splink_df_dict,
+            blocking_rule,
+            link_type,
+            db_api,
+            sample_proportion=sample_proportion,
+            seed=seed,
+        )
+        pre_filter_total = round(estimate["estimate"])
+    else:
+        pipeline = CTEPipeline()
+        sqls = _count_comparisons_from_blocking_rule_pre_filter_conditions_sqls(
+            splink_df_dict, blocking_rule, link_type, db_api
+        )
+        pipeline.enqueue_list_of_sqls(sqls)
 
-    pipeline.enqueue_sql(sql=sql, output_table_name="__splink__total_of_block_counts")
+        sql = """
+        select cast(sum(block_count) as bigint)
+            as count_of_pairwise_comparisons_generated
+        from __splink__block_counts
+        """
 
-    pre_filter_total_df = db_api.sql_pipeline_to_splink_dataframe(pipeline)
+        pipeline.enqueue_sql(
+            sql=sql, output_table_name="__splink__total_of_block_counts"
+        )
 
-    pre_filter_total = pre_filter_total_df.as_record_dict()[0][
-        "count_of_pairwise_comparisons_generated"
-    ]
-    pre_filter_total_df.drop_table_from_database_and_remove_from_cache()
+        pre_filter_total_df = db_api.sql_pipeline_to_splink_dataframe(pipeline)
+
+        pre_filter_total = pre_filter_total_df.as_record_dict()[0][
+            "count_of_pairwise_comparisons_generated"
+        ]
+        pre_filter_total_df.drop_table_from_database_and_remove_from_cache()
 
     # This is sometimes the sum() over zero rows, with returns as a nan (flaot)
     # or None.  This result implies a count of zero.
@@ -495,6 +1118,22 @@ def _count_comparisons_generated_from_blocking_rule(
 
     link_type_join_condition_sql = _sql_gen_where_condition(link_type, uid_for_where)
 
+    if estimate_from_sample:
+        # Computing the post filter count means performing the full join, which
+        # would defeat the purpose of estimating the pre filter count
+        est, se = estimate["estimate"], estimate["standard_error"]
+        return {
+            "number_of_comparisons_generated_pre_filter_conditions": pre_filter_total,
+            "number_of_comparisons_to_be_scored_post_filter_conditions": "not computed",
+            "filter_conditions_identified": filter_conditions,
+            "equi_join_conditions_identified": equi_join_conditions_joined,
+            "link_type_join_condition": link_type_join_condition_sql,
+            "pre_filter_count_standard_error": se,
+            "pre_filter_count_95pc_lower_bound": max(round(est - 1.96 * se), 0),
+            "pre_filter_count_95pc_upper_bound": round(est + 1.96 * se),
+            "sample_proportion": estimate["sample_proportion"],
+        }
+
     if not compute_post_filter_count:
         return {
             "number_of_comparisons_generated_pre_filter_conditions": pre_filter_total,
@@ -552,12 +1191,19 @@ def count_comparisons_from_blocking_rule(
     source_dataset_column_name: Optional[str] = None,
     compute_post_filter_count: bool = True,
     max_rows_limit: int = int(1e9),
+    sample_proportion: Optional[float] = None,
+    seed: Optional[int] = None,
 ) -> dict[str, Union[int, str]]:
     """Analyse a blocking rule to understand the number of comparisons it will generate.
 
     Read more about the definition of pre and post filter conditions
     [here]("https://moj-analytical-services.github.io/splink/topic_guides/blocking/performance.html?h=filter+cond#filter-conditions")
 
+    On very large inputs, `sample_proportion` can be used to estimate the
+    pre filter count from a random sample of the input records.  This allows
+    candidate blocking rules to be screened quickly, before computing exact counts
+    for a shortlist.
+
     Args:
         table_or_tables (dataframe, str): Input data
         blocking_rule (Union[BlockingRuleCreator, str, Dict[str, Any]]): The blocking
@@ -573,6 +1219,13 @@ def count_comparisons_from_blocking_rule(
         max_rows_limit (int, optional): Calculation of post filter counts will only
             proceed if the fast method returns a value below this limit. Defaults
             to int(1e9).
+        sample_proportion (float, optional): If provided, estimate the pre filter
+            count from a random sample of this proportion of the input records,
+            rather than counting exactly.  The results then also contain a
+            standard error and an approximate 95% interval for the estimate, and
+            the post filter count is not computed. Defaults to None.
+        seed (int, optional): Seed for the random sample, where supported by the
+            backend. Defaults to None.
 
     Returns:
         dict[str, Union[int, str]]: A dictionary containing the results
@@ -602,6 +1255,8 @@ def count_comparisons_from_blocking_rule(
         max_rows_limit=max_rows_limit,
         unique_id_input_column=unique_id_input_column,
         source_dataset_input_column=source_dataset_input_column,
+        sample_proportion=sample_proportion,
+        seed=seed,
     )
 
 
@@ -614,8 +1269,18 @@ def cumulative_comparisons_to_be_scored_from_blocking_rules_data(
     unique_id_column_name: str = "unique_id",
     max_rows_limit: int = int(1e9),
     source_dataset_column_name: Optional[str] = None,
+    estimate_from_key_frequencies: bool = False,
 ) -> pd.DataFrame:
-    """TODO: Add docstring here"""
+    """Count the comparisons generated by each of a list of blocking rules, which
+    were not already generated by a preceding rule, and their cumulative total.
+
+    By default, the comparisons are counted exactly, which means generating them.
+    With `estimate_from_key_frequencies=True`, the counts are instead derived from
+    the frequencies of the rules' equi-join keys, without generating any pairs.
+    These counts ignore filter conditions, so if any rule has them the cumulative
+    counts are upper bounds.  Otherwise they are exact.  This is not supported
+    for rules which explode arrays or join different columns on each side.
+    """
     splink_df_dict = db_api.register_multiple_tables(table_or_tables)
 
     # whilst they're named blocking_rules, this is actually a list of
@@ -646,6 +1311,7 @@ def cumulative_comparisons_to_be_scored_from_blocking_rules_data(
         max_rows_limit=max_rows_limit,
         unique_id_input_column=unique_id_input_column,
         source_dataset_input_column=source_dataset_input_column,
+        estimate_from_key_frequencies=estimate_from_key_frequencies,
     )
 
 
@@ -658,8 +1324,18 @@ def cumulative_comparisons_to_be_scored_from_blocking_rules_chart(
     unique_id_column_name: str = "unique_id",
     max_rows_limit: int = int(1e9),
     source_dataset_column_name: Optional[str] = None,
+    estimate_from_key_frequencies: bool = False,
 ) -> ChartReturnType:
-    """TODO: Add docstring here"""
+    """Count the comparisons generated by each of a list of blocking rules, which
+    were not already generated by a preceding rule, and their cumulative total.
+
+    By default, the comparisons are counted exactly, which means generating them.
+    With `estimate_from_key_frequencies=True`, the counts are instead derived from
+    the frequencies of the rules' equi-join keys, without generating any pairs.
+    These counts ignore filter conditions, so if any rule has them the cumulative
+    counts are upper bounds.  Otherwise they are exact.  This is not supported
+    for rules which explode arrays or join different columns on each side.
+    """
     splink_df_dict = db_api.register_multiple_tables(table_or_tables)
 
     # whilst they're named blocking_rules, this is actually a list of
@@ -690,6 +1366,7 @@ def cumulative_comparisons_to_be_scored_from_blocking_rules_chart(
         max_rows_limit=max_rows_limit,
         unique_id_input_column=unique_id_input_column,
         source_dataset_input_column=source_dataset_input_column,
+        estimate_from_key_frequencies=estimate_from_key_frequencies,
     )
 
     return cumulative_blocking_rule_comparisons_generated(
@@ -12,9 +12,13 @@ class BlockingRuleCreator(ABC):
         self,
         salting_partitions: int | None = None,
         arrays_to_explode: list[str] | None = None,
+        salting_block_size_threshold: int | None = None,
+        max_array_element_frequency: int | None = None,
     ):
         self._salting_partitions = salting_partitions
         self._arrays_to_explode = arrays_to_explode
+        self._salting_block_size_threshold = salting_block_size_threshold
+        self._max_array_element_frequency = max_array_element_frequency
 
     # @property because merged levels need logic to determine salting partitions
     @property
@@ -25,10 +29,23 @@ class BlockingRuleCreator(ABC):
     def arrays_to_explode(self):
         return self._arrays_to_explode
 
+    @property
+    def salting_block_size_threshold(self):
+        return self._salting_block_size_threshold
+
+    @property
+    def max_array_element_frequency(self):
+        return self._max_array_element_frequency
+
     @abstractmethod
     def create_sql(self, sql_dialect: SplinkDialect) -> str:
         pass
 
+    def _create_blocking_rule_options(self, sql_dialect: SplinkDialect) -> dict:
+        """Any further options of the blocking rule dict, for rule types which
+        are not fully specified by their SQL condition"""
+        return {}
+
     @final
     def create_blocking_rule_dict(self, sql_dialect_str: str) -> dict[str, Any]:
         sql_dialect = SplinkDialect.from_string(sql_dialect_str)
@@ -43,9 +60,19 @@ class BlockingRuleCreator(ABC):
         if self.salting_partitions:
             level_dict["salting_partitions"] = self.salting_partitions
 
+        if self.salting_block_size_threshold:
+            level_dict["salting_block_size_threshold"] = (
+                self.salting_block_size_threshold
+            )
+
         if self.arrays_to_explode:
             level_dict["arrays_to_explode"] = self.arrays_to_explode
 
+        if self.max_array_element_frequency:
+            level_dict["max_array_element_frequency"] = self.max_array_element_frequency
+
+        level_dict.update(self._create_blocking_rule_options(sql_dialect))
+
         return level_dict
 
     @final
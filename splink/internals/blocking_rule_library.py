@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Any, Union, final
+from typing import Any, Literal, Optional, Union, final
 
 from sqlglot import TokenError, parse_one
 
@@ -44,6 +44,8 @@ class CustomRule(BlockingRuleCreator):
         sql_dialect: str = None,
         salting_partitions: int | None = None,
         arrays_to_explode: list[str] | None = None,
+        salting_block_size_threshold: int | None = None,
+        max_array_element_frequency: int | None = None,
     ):
         """
         Represents a custom blocking rule using a user-defined SQL condition.  To
@@ -61,6 +63,14 @@ class CustomRule(BlockingRuleCreator):
                 salting. If provided, enables salting for this blocking rule.
             arrays_to_explode (list[str], optional): A list of array column names
                 to explode before applying the blocking rule.
+            salting_block_size_threshold (int, optional): If provided, only salt
+                the blocking keys which generate more than this number of
+                comparisons, splitting each into a number of partitions
+                proportional to its block size, up to a maximum of
+                `salting_partitions`.
+            max_array_element_frequency (int, optional): If provided alongside
+                `arrays_to_explode`, array elements found in more than this
+                number of records are not blocked on.
 
         Examples:
             ```python
@@ -80,10 +90,20 @@ class CustomRule(BlockingRuleCreator):
                 "l.city = r.city",
                 salting_partitions=10
             )
+
+            # Custom rule only salting cities generating over 1m comparisons
+            rule_4 = CustomRule(
+                "l.city = r.city",
+                salting_partitions=10,
+                salting_block_size_threshold=1_000_000,
+            )
             ```
         """
         super().__init__(
-            salting_partitions=salting_partitions, arrays_to_explode=arrays_to_explode
+            salting_partitions=salting_partitions,
+            arrays_to_explode=arrays_to_explode,
+            salting_block_size_threshold=salting_block_size_threshold,
+            max_array_element_frequency=max_array_element_frequency,
         )
         self.sql_condition = blocking_rule
 
@@ -185,21 +205,270 @@ class Not(BlockingRuleCreator):
     def salting_partitions(self):
         return self.blocking_rule_creator.salting_partitions
 
+    @property
+    def salting_block_size_threshold(self):
+        return self.blocking_rule_creator.salting_block_size_threshold
+
     @property
     def arrays_to_explode(self):
         if self.blocking_rule_creator.arrays_to_explode:
             raise ValueError("Cannot use arrays_to_explode with Not")
         return None
 
+    @property
+    def max_array_element_frequency(self):
+        return None
+
     @final
     def create_sql(self, sql_dialect: SplinkDialect) -> str:
         return f"NOT ({self.blocking_rule_creator.create_sql(sql_dialect)})"
 
 
+class SortedNeighbourhoodRule(BlockingRuleCreator):
+    def __init__(
+        self,
+        col_name_or_expr: Union[str, ColumnExpression],
+        window_size: int,
+    ):
+        """
+        Sorts the records by the given column or SQL expression, and compares
+        each record to the `window_size - 1` records which follow it in the sort
+        order.
+
+        This is tolerant of small differences in the sort key, such as typos
+        towards the end of a surname, whilst generating a number of comparisons
+        which grows linearly with the number of records.  Records with a null
+        sort key are not compared.
+
+        Args:
+            col_name_or_expr (Union[str, ColumnExpression]): The column or SQL
+                expression to sort records by
+            window_size (int): The size of the sliding window.  Each record is
+                compared with the `window_size - 1` records which follow it.
+
+        Examples:
+            ```python
+            from splink.blocking_rule_library import SortedNeighbourhoodRule
+
+            rule = SortedNeighbourhoodRule("surname", window_size=5)
+            ```
+        """
+        super().__init__()
+        self.col_expression = ColumnExpression.instantiate_if_str(col_name_or_expr)
+        self.window_size = window_size
+
+    def create_sql(self, sql_dialect: SplinkDialect) -> str:
+        # Every pair within the window is a candidate
+        return "1=1"
+
+    def _create_blocking_rule_options(self, sql_dialect: SplinkDialect) -> dict:
+        self.col_expression.sql_dialect = sql_dialect
+        return {
+            "sort_key": self.col_expression.name,
+            "window_size": self.window_size,
+        }
+
+
+class MinHashLSHRule(BlockingRuleCreator):
+    def __init__(
+        self,
+        col_name_or_expr: Union[str, ColumnExpression],
+        num_bands: int = 20,
+        rows_per_band: int = 5,
+        shingle_type: Literal["character", "word"] = "character",
+        shingle_size: int = 3,
+    ):
+        """
+        Compares records whose values of the given column are likely to have a
+        high Jaccard similarity, using MinHash locality sensitive hashing.
+
+        A MinHash signature is computed once for each record over the shingles
+        of its value, and split into `num_bands` bands of `rows_per_band`
+        hashes.  Records are compared if their hashes in any band are all equal.
+        Two values with Jaccard similarity `s` are compared with probability
+        `1 - (1 - s^rows_per_band)^num_bands`, so more bands increase recall
+        and more rows per band increase precision.
+
+        This is useful for free text fields such as addresses and company
+        names, which vary too much for equality based blocking.
+
+        Args:
+            col_name_or_expr (Union[str, ColumnExpression]): The column or SQL
+                expression to compute signatures from
+            num_bands (int, optional): The number of bands. Defaults to 20.
+            rows_per_band (int, optional): The number of hashes in each band.
+                Defaults to 5.
+            shingle_type (str, optional): Whether to shingle the value into
+                'character' or 'word' n-grams. Defaults to 'character'.
+            shingle_size (int, optional): The number of characters or words in
+                each shingle. Defaults to 3.
+
+        Examples:
+            ```python
+            from splink.blocking_rule_library import MinHashLSHRule
+
+            rule = MinHashLSHRule("address", num_bands=20, rows_per_band=5)
+            ```
+        """
+        super().__init__()
+        self.col_expression = ColumnExpression.instantiate_if_str(col_name_or_expr)
+        self.num_bands = num_bands
+        self.rows_per_band = rows_per_band
+        self.shingle_type = shingle_type
+        self.shingle_size = shingle_size
+
+    def create_sql(self, sql_dialect: SplinkDialect) -> str:
+        # Every pair sharing a band is a candidate
+        return "1=1"
+
+    def _create_blocking_rule_options(self, sql_dialect: SplinkDialect) -> dict:
+        self.col_expression.sql_dialect = sql_dialect
+        return {
+            "minhash_column": self.col_expression.name,
+            "num_bands": self.num_bands,
+            "rows_per_band": self.rows_per_band,
+            "shingle_type": self.shingle_type,
+            "shingle_size": self.shingle_size,
+        }
+
+
+class TokenRule(BlockingRuleCreator):
+    def __init__(
+        self,
+        col_name_or_expr: Union[str, ColumnExpression],
+        max_token_frequency: int = 100,
+        tokenise: bool = False,
+    ):
+        """
+        Compares records which share a token, such as a word of a company name
+        or an element of an array of postcodes.
+
+        An inverted index is built from each token to the records containing
+        it.  Tokens found in more than `max_token_frequency` records, such as
+        'LTD' or 'STREET', are skipped like stop words, so no single token can
+        generate more than `max_token_frequency * (max_token_frequency - 1) / 2`
+        comparisons.
+
+        Args:
+            col_name_or_expr (Union[str, ColumnExpression]): The array column, or
+                string column if `tokenise` is True, to take tokens from
+            max_token_frequency (int, optional): Tokens found in more than this
+                number of records are not blocked on. Defaults to 100.
+            tokenise (bool, optional): If True, the column is a string which is
+                split into words to form its tokens. Defaults to False.
+
+        Examples:
+            ```python
+            from splink.blocking_rule_library import TokenRule
+
+            rule = TokenRule("company_name", max_token_frequency=50, tokenise=True)
+            ```
+        """
+        super().__init__()
+        self.col_expression = ColumnExpression.instantiate_if_str(col_name_or_expr)
+        self.max_token_frequency = max_token_frequency
+        self.tokenise = tokenise
+
+    def create_sql(self, sql_dialect: SplinkDialect) -> str:
+        # Every pair sharing a token is a candidate
+        return "1=1"
+
+    def _create_blocking_rule_options(self, sql_dialect: SplinkDialect) -> dict:
+        self.col_expression.sql_dialect = sql_dialect
+        return {
+            "token_column": self.col_expression.name,
+            "max_token_frequency": self.max_token_frequency,
+            "tokenise": self.tokenise,
+        }
+
+
+class BandRule(BlockingRuleCreator):
+    def __init__(
+        self,
+        col_name_or_expr: Union[str, ColumnExpression],
+        band_width: Union[int, float],
+        metric: Optional[Literal["second", "minute", "hour", "day", "year"]] = None,
+    ):
+        """
+        Compares records whose values of a numeric, date or timestamp column
+        differ by at most `band_width`, such as dates of birth within a year
+        of each other.
+
+        Rather than an inequality join, which most backends execute as a nested
+        loop, records are bucketed into bands of width `band_width` and joined on
+        the band and its neighbours, before filtering on the difference.
+
+        For proximity relative to the size of the values, such as amounts within
+        5% of each other, use the logarithm of the column with a `band_width` of
+        `log(1.05)`.
+
+        Args:
+            col_name_or_expr (Union[str, ColumnExpression]): The column or SQL
+                expression to compare
+            band_width (Union[int, float]): The maximum difference between the
+                values of a pair of records.  The difference is inclusive.
+            metric (str, optional): If the column is a date or timestamp, the unit
+                of `band_width`: 'second', 'minute', 'hour', 'day' or 'year'.
+                Defaults to None, meaning the column is numeric.
+
+        Examples:
+            ```python
+            from splink.blocking_rule_library import BandRule
+
+            rule = BandRule("dob", band_width=1, metric="year")
+            ```
+        """
+        super().__init__()
+        if band_width is None or band_width <= 0:
+            raise ValueError("band_width must be > 0")
+        self.col_expression = ColumnExpression.instantiate_if_str(col_name_or_expr)
+        self.band_width_raw = band_width
+        self.metric = metric
+
+    @property
+    def band_width(self) -> Union[int, float]:
+        if self.metric is None:
+            return self.band_width_raw
+        seconds_per_unit = {
+            "second": 1,
+            "minute": 60,
+            "hour": 60 * 60,
+            "day": 60 * 60 * 24,
+            "year": 60 * 60 * 24 * 365.25,
+        }
+        return self.band_width_raw * seconds_per_unit[self.metric]
+
+    def _band_expression(self, sql_dialect: SplinkDialect, col_name: str) -> str:
+        if self.metric is None:
+            return col_name
+        translated = _translate_sql_string(
+            "TIME_TO_UNIX(___col___)", sql_dialect.sqlglot_dialect
+        )
+        return translated.replace("___col___", col_name)
+
+    def create_sql(self, sql_dialect: SplinkDialect) -> str:
+        self.col_expression.sql_dialect = sql_dialect
+        col = self.col_expression
+        band_l = self._band_expression(sql_dialect, col.l_name)
+        band_r = self._band_expression(sql_dialect, col.r_name)
+        return f"abs({band_l} - {band_r}) <= {self.band_width}"
+
+    def _create_blocking_rule_options(self, sql_dialect: SplinkDialect) -> dict:
+        self.col_expression.sql_dialect = sql_dialect
+        return {
+            "band_expression": self._band_expression(
+                sql_dialect, self.col_expression.name
+            ),
+            "band_width": self.band_width,
+        }
+
+
 def block_on(
     *col_names_or_exprs: Union[str, ColumnExpression],
     salting_partitions: int | None = None,
     arrays_to_explode: list[str] | None = None,
+    salting_block_size_threshold: int | None = None,
+    max_array_element_frequency: int | None = None,
 ) -> BlockingRuleCreator:
     """Generates blocking rules of equality conditions  based on the columns
     or SQL expressions specified.
@@ -219,6 +488,13 @@ def block_on(
             be found within the docs.
         arrays_to_explode (optional, List[str]): List of arrays to explode
             before applying the blocking rule.
+        salting_block_size_threshold (optional, int): If provided alongside
+            `salting_partitions`, only salt the keys which generate more than
+            this number of comparisons, leaving all other keys unsalted.
+        max_array_element_frequency (optional, int): If provided alongside
+            `arrays_to_explode`, array elements found in more than this number
+            of records are dropped before the join, since very common elements
+            generate huge blocks.
 
     Examples:
         ``` python
@@ -244,4 +520,8 @@ def block_on(
         br._salting_partitions = salting_partitions
     if arrays_to_explode:
         br._arrays_to_explode = arrays_to_explode
+    if salting_block_size_threshold:
+        br._salting_block_size_threshold = salting_block_size_threshold
+    if max_array_element_frequency:
+        br._max_array_element_frequency = max_array_element_frequency
     return br
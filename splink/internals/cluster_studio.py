@@ -3,11 +3,10 @@ from __future__ import annotations
 import json
 import os
 import random
-from typing import TYPE_CHECKING, Any, Literal, Optional
+from typing import TYPE_CHECKING, Any, Literal, Optional, get_args
 
 from jinja2 import Template
 
-from splink.internals.exceptions import SplinkException
 from splink.internals.misc import EverythingEncoder, read_resource
 from splink.internals.pipeline import CTEPipeline
 from splink.internals.splink_dataframe import SplinkDataFrame
@@ -156,15 +155,192 @@ def df_edges_as_records(
     return df_edges.as_record_dict()
 
 
+def _cluster_index_nodes_sql(
+    linker: "Linker",
+    df_clustered_nodes: SplinkDataFrame,
+) -> dict[str, str]:
+    """Generates SQL for a table with one row per cluster holding its size, and
+    the largest unique id in it to order clusters of the same size by.
+    """
+    unique_id_col_name = linker._settings_obj.column_info_settings.unique_id_column_name
+
+    sql = f"""
+    select
+        cluster_id,
+        count(*) as n_nodes,
+        max({unique_id_col_name}) as ordering
+    from {df_clustered_nodes.physical_name}
+    group by cluster_id
+    """
+    return {"sql": sql, "output_table_name": "__splink__cluster_index_nodes"}
+
+
+def _cluster_index_sqls(
+    linker: "Linker",
+    df_predicted_edges: SplinkDataFrame,
+    df_clustered_nodes: SplinkDataFrame,
+    cluster_index_nodes: SplinkDataFrame,
+) -> list[dict[str, str]]:
+    """Generates SQL to add the density and the range of edge weights of each
+    cluster to the node index of cluster_index_nodes.
+
+    Edges are only counted if they are within a single cluster and, where the
+    clustering threshold is known, at or above that threshold.
+    """
+    unique_id_cols = linker._settings_obj.column_info_settings.unique_id_input_columns
+
+    nodes_l_id_expr = _composite_unique_id_from_nodes_sql(unique_id_cols, "nodes_l")
+    nodes_r_id_expr = _composite_unique_id_from_nodes_sql(unique_id_cols, "nodes_r")
+    edges_l_id_expr = _composite_unique_id_from_edges_sql(
+        unique_id_cols, "l", table_prefix="edges"
+    )
+    edges_r_id_expr = _composite_unique_id_from_edges_sql(
+        unique_id_cols, "r", table_prefix="edges"
+    )
+
+    # Deterministic link outputs have no match probability
+    if "match_probability" in [c.unquote().name for c in df_predicted_edges.columns]:
+        min_max_probability = """
+        min(edges.match_probability) as min_match_probability,
+        max(edges.match_probability) as max_match_probability"""
+        threshold = df_clustered_nodes.metadata.get("threshold_match_probability")
+        threshold_filter = (
+            f"and edges.match_probability >= {threshold}"
+            if threshold is not None
+            else ""
+        )
+    else:
+        min_max_probability = """
+        cast(null as float) as min_match_probability,
+        cast(null as float) as max_match_probability"""
+        threshold_filter = ""
+
+    sqls = []
+
+    sql = f"""
+    select
+        nodes_l.cluster_id,
+        count(*) as n_edges,
+        {min_max_probability}
+    from {df_predicted_edges.physical_name} as edges
+    inner join
+    {df_clustered_nodes.physical_name} as nodes_l
+    on {edges_l_id_expr} = {nodes_l_id_expr}
+    inner join
+    {df_clustered_nodes.physical_name} as nodes_r
+    on {edges_r_id_expr} = {nodes_r_id_expr}
+    where nodes_l.cluster_id = nodes_r.cluster_id
+    {threshold_filter}
+    group by nodes_l.cluster_id
+    """
+    sqls.append({"sql": sql, "output_table_name": "__splink__cluster_index_edges"})
+
+    sql = f"""
+    select
+        n.cluster_id,
+        n.n_nodes,
+        n.ordering,
+        coalesce(e.n_edges, 0) as n_edges,
+        case
+            when n.n_nodes > 1 then
+                1.0*(coalesce(e.n_edges, 0) * 2)/(n.n_nodes * (n.n_nodes-1))
+            else
+                -- n_nodes is 1 density undefined
+                null
+        end as density,
+        e.min_match_probability,
+        e.max_match_probability
+    from {cluster_index_nodes.physical_name} as n
+    left join __splink__cluster_index_edges as e
+    on n.cluster_id = e.cluster_id
+    """
+    sqls.append({"sql": sql, "output_table_name": "__splink__cluster_index"})
+
+    return sqls
+
+
+def compute_cluster_index_nodes(
+    linker: "Linker",
+    df_clustered_nodes: SplinkDataFrame,
+) -> SplinkDataFrame:
+    """Returns the node index of df_clustered_nodes, with one row per cluster
+    holding its size, computing it if this is the first time it has been asked
+    for.
+
+    The index is kept in the metadata of df_clustered_nodes.  It needs no edges,
+    so is all that sampling clusters at random or by size requires.
+
+    Args:
+        linker: An instance of the Splink Linker class.
+        df_clustered_nodes (SplinkDataFrame): Result of
+        cluster_pairwise_predictions_at_threshold().
+
+    Returns:
+        A SplinkDataFrame with columns cluster_id, n_nodes and ordering.
+    """
+    cluster_index_nodes = df_clustered_nodes.metadata.get("cluster_index_nodes")
+    if cluster_index_nodes is not None:
+        return cluster_index_nodes
+
+    pipeline = CTEPipeline()
+    pipeline.enqueue_sql(**_cluster_index_nodes_sql(linker, df_clustered_nodes))
+    cluster_index_nodes = linker._db_api.sql_pipeline_to_splink_dataframe(pipeline)
+    df_clustered_nodes.metadata["cluster_index_nodes"] = cluster_index_nodes
+
+    return cluster_index_nodes
+
+
+def compute_cluster_index(
+    linker: "Linker",
+    df_predicted_edges: SplinkDataFrame,
+    df_clustered_nodes: SplinkDataFrame,
+) -> SplinkDataFrame:
+    """Returns the cluster index of df_clustered_nodes, computing it if this is
+    the first time it has been asked for with df_predicted_edges.
+
+    The index is kept in the metadata of df_clustered_nodes, along with the
+    predictions it was computed from, so that sampling clusters for any number
+    of dashboards scans the clustered table once.  It is rebuilt if asked for
+    with different predictions.
+
+    Args:
+        linker: An instance of the Splink Linker class.
+        df_predicted_edges (SplinkDataFrame): The outputs of `linker.predict()`
+        df_clustered_nodes (SplinkDataFrame): Result of
+        cluster_pairwise_predictions_at_threshold().
+
+    Returns:
+        A SplinkDataFrame with columns cluster_id, n_nodes, ordering, n_edges,
+        density, min_match_probability and max_match_probability.
+    """
+    predictions_name = df_predicted_edges.physical_name
+    cached = df_clustered_nodes.metadata.get("cluster_index")
+    if cached is not None and cached[0] == predictions_name:
+        return cached[1]
+
+    cluster_index_nodes = compute_cluster_index_nodes(linker, df_clustered_nodes)
+
+    pipeline = CTEPipeline()
+    pipeline.enqueue_list_of_sqls(
+        _cluster_index_sqls(
+            linker, df_predicted_edges, df_clustered_nodes, cluster_index_nodes
+        )
+    )
+    cluster_index = linker._db_api.sql_pipeline_to_splink_dataframe(pipeline)
+    df_clustered_nodes.metadata["cluster_index"] = (predictions_name, cluster_index)
+
+    return cluster_index
+
+
 def _get_random_cluster_ids(
     linker: "Linker",
-    connected_components: SplinkDataFrame,
+    cluster_index_nodes: SplinkDataFrame,
     sample_size: int,
     seed: int | None = None,
 ) -> list[str]:
     sql = f"""
-    select count(distinct cluster_id) as count
-    from {connected_components.physical_name}
+    select count(*) as count
+    from {cluster_index_nodes.physical_name}
     """
     pipeline = CTEPipeline()
     pipeline.enqueue_sql(sql, "__splink__cluster_count")
@@ -178,16 +354,13 @@ def _get_random_cluster_ids(
         proportion,
         sample_size,
         seed,
-        table=connected_components.physical_name,
+        table=cluster_index_nodes.physical_name,
         unique_id="cluster_id",
     )
 
     sql = f"""
-    with distinct_clusters as (
-    select distinct(cluster_id)
-    from {connected_components.physical_name}
-    )
-    select cluster_id from distinct_clusters
+    select cluster_id
+    from {cluster_index_nodes.physical_name}
     {random_sample_sql}
     """
     pipeline = CTEPipeline()
@@ -198,29 +371,18 @@ def _get_random_cluster_ids(
 
 
 def _get_cluster_id_of_each_size(
-    linker: "Linker", connected_components: SplinkDataFrame, rows_per_partition: int
+    linker: "Linker", cluster_index_nodes: SplinkDataFrame, rows_per_partition: int
 ) -> list[dict[str, Any]]:
-    unique_id_col_name = linker._settings_obj.column_info_settings.unique_id_column_name
     pipeline = CTEPipeline()
-    sql = f"""
-    select
-        cluster_id,
-        count(*) as cluster_size,
-        max({unique_id_col_name}) as ordering
-    from {connected_components.physical_name}
-    group by cluster_id
-    having count(*)>1
-    """
-
-    pipeline.enqueue_sql(sql, "__splink__cluster_count")
 
     # Assign unique row number to each row in partition
-    sql = """
+    sql = f"""
     select
         cluster_id,
-        cluster_size,
-        row_number() over (partition by cluster_size order by ordering) as row_num
-    from __splink__cluster_count
+        n_nodes as cluster_size,
+        row_number() over (partition by n_nodes order by ordering) as row_num
+    from {cluster_index_nodes.physical_name}
+    where n_nodes > 1
     """
 
     pipeline.enqueue_sql(sql, "__splink__cluster_count_row_numbered")
@@ -294,20 +456,26 @@ def _get_lowest_density_clusters(
 
 def _get_cluster_ids(
     linker: "Linker",
+    df_predicted_edges: SplinkDataFrame,
     df_clustered_nodes: SplinkDataFrame,
     sampling_method: SamplingMethods,
     sample_size: int,
     sample_seed: int | None,
     _df_cluster_metrics: Optional[SplinkDataFrame] = None,
 ) -> tuple[list[str], list[str]]:
+    if sampling_method not in get_args(SamplingMethods):
+        raise ValueError(f"Unknown sampling method {sampling_method}")
+
     if sampling_method == "random":
+        cluster_index_nodes = compute_cluster_index_nodes(linker, df_clustered_nodes)
         cluster_ids = _get_random_cluster_ids(
-            linker, df_clustered_nodes, sample_size, sample_seed
+            linker, cluster_index_nodes, sample_size, sample_seed
         )
         cluster_names = []
     elif sampling_method == "by_cluster_size":
+        cluster_index_nodes = compute_cluster_index_nodes(linker, df_clustered_nodes)
         cluster_id_infos = _get_cluster_id_of_each_size(
-            linker, df_clustered_nodes, rows_per_partition=1
+            linker, cluster_index_nodes, rows_per_partition=1
         )
         if len(cluster_id_infos) > sample_size:
             cluster_id_infos = random.sample(cluster_id_infos, k=sample_size)
@@ -317,16 +485,18 @@ def _get_cluster_ids(
         ]
         cluster_ids = [c["cluster_id"] for c in cluster_id_infos]
     elif sampling_method == "lowest_density_clusters_by_size":
+        # Densities from the cluster index are used unless a cluster metrics
+        # table is provided
         if _df_cluster_metrics is None:
-            raise SplinkException(
-                """To sample by density, you must provide a cluster metrics table
-                    containing density. This can be generated by calling the
-                    _compute_graph_metrics method on the linker."""
+            df_density = compute_cluster_index(
+                linker, df_predicted_edges, df_clustered_nodes
             )
+        else:
+            df_density = _df_cluster_metrics
         # Using sensible default for min_nodes. Might become option
         # for users in future
         cluster_id_infos = _get_lowest_density_clusters(
-            linker, _df_cluster_metrics, rows_per_partition=1, min_nodes=3
+            linker, df_density, rows_per_partition=1, min_nodes=3
         )
         if len(cluster_id_infos) > sample_size:
             cluster_id_infos = random.sample(cluster_id_infos, k=sample_size)
@@ -336,8 +506,6 @@ def _get_cluster_ids(
             for c in cluster_id_infos
         ]
         cluster_ids = [c["cluster_id"] for c in cluster_id_infos]
-    else:
-        raise ValueError(f"Unknown sampling method {sampling_method}")
     return cluster_ids, cluster_names
 
 
@@ -363,6 +531,7 @@ def render_splink_cluster_studio_html(
     if cluster_ids is None:
         cluster_ids, cluster_names = _get_cluster_ids(
             linker,
+            df_predicted_edges,
             df_clustered_nodes,
             sampling_method,
             sample_size,
@@ -2,9 +2,15 @@ from __future__ import annotations
 
 import logging
 import math
-from typing import Optional
+from typing import Literal, Optional
 
-from splink.internals.connected_components import solve_connected_components
+import pandas as pd
+
+from splink.internals.connected_components import (
+    _labels_from_merge_tree,
+    _solve_merge_tree_in_memory,
+    solve_connected_components,
+)
 from splink.internals.database_api import AcceptableInputTableType, DatabaseAPISubClass
 from splink.internals.input_column import InputColumn
 from splink.internals.misc import (
@@ -49,6 +55,7 @@ def cluster_pairwise_predictions_at_threshold(
     edge_id_column_name_right: Optional[str] = None,
     threshold_match_probability: Optional[float] = None,
     threshold_match_weight: Optional[float] = None,
+    engine: Literal["sql", "sql_pointer_jumping", "in_memory"] = "sql",
 ) -> SplinkDataFrame:
     """Clusters the pairwise match predictions into groups of connected records using
     the connected components graph clustering algorithm.
@@ -77,6 +84,11 @@ def cluster_pairwise_predictions_at_threshold(
             match_probability at or above this threshold are matched
         threshold_match_weight (Optional[float]): Pairwise comparisons with a
             match_weight at or above this threshold are matched
+        engine (str): "sql" to solve connected components in the database,
+            "sql_pointer_jumping" to do so in far fewer iterations on graphs with
+            long chains of edges, or "in_memory" to pull the matching edges into
+            memory and solve them using union-find, which is much faster if they
+            fit in memory.  All give identical clusters.  Defaults to "sql".
 
     Returns:
         SplinkDataFrame: A SplinkDataFrame containing a list of all IDs, clustered
@@ -149,6 +161,7 @@ def cluster_pairwise_predictions_at_threshold(
         edge_id_column_name_right=edge_id_column_name_right,
         db_api=db_api,
         threshold_match_probability=threshold_match_probability,
+        engine=engine,
     )
     cc.metadata["threshold_match_probability"] = threshold_match_probability
     return cc
@@ -343,6 +356,75 @@ def _generate_cluster_summary_stats_sql(
     return sql
 
 
+def _cluster_at_multiple_thresholds_from_merge_tree(
+    nodes_sdf: SplinkDataFrame,
+    edges_sdf: SplinkDataFrame,
+    db_api: DatabaseAPISubClass,
+    node_id_column_name: str,
+    edge_id_column_name_left: str,
+    edge_id_column_name_right: str,
+    match_probability_thresholds: list[float],
+    is_match_weight: bool,
+    output_cluster_summary_stats: bool,
+) -> SplinkDataFrame:
+    """The in memory engine of `cluster_pairwise_predictions_at_multiple_thresholds`.
+
+    Rather than re-solving connected components at each threshold, a single merge
+    tree is computed from the edges at or above the lowest threshold, and the
+    clusters, or summary statistics, at each threshold are read off it.
+    """
+    thresholds = sorted(match_probability_thresholds)
+    sorted_node_ids, merges = _solve_merge_tree_in_memory(
+        nodes_sdf,
+        edges_sdf,
+        node_id_column_name,
+        edge_id_column_name_left,
+        edge_id_column_name_right,
+        db_api,
+        thresholds[0],
+    )
+    num_nodes = len(sorted_node_ids)
+
+    if output_cluster_summary_stats:
+        rows = []
+        for threshold in thresholds:
+            merged = merges[merges["match_probability"] >= threshold]
+            num_clusters = num_nodes - len(merged)
+            rows.append(
+                {
+                    "threshold_match_probability": threshold,
+                    "threshold_match_weight": (
+                        None if threshold in (0, 1) else prob_to_match_weight(threshold)
+                    ),
+                    "num_clusters": num_clusters,
+                    "max_cluster_size": (
+                        merged["cluster_size"].max() if len(merged) else 1
+                    ),
+                    "avg_cluster_size": num_nodes / num_clusters,
+                }
+            )
+        results = pd.DataFrame(rows)
+    else:
+        results = pd.DataFrame({node_id_column_name: sorted_node_ids})
+        for threshold in thresholds:
+            labels = _labels_from_merge_tree(num_nodes, merges, threshold)
+            column = f"cluster_{_threshold_to_str(threshold, is_match_weight)}"
+            results[column] = sorted_node_ids[labels]
+
+    results_sdf = db_api.register_table(
+        results, f"__splink__df_clusters_from_merge_tree_{ascii_uid(8)}"
+    )
+    pipeline = CTEPipeline([results_sdf])
+    sql = f"select * from {results_sdf.templated_name}"
+    pipeline.enqueue_sql(sql, "__splink__clusters_at_all_thresholds")
+    joined = db_api.sql_pipeline_to_splink_dataframe(pipeline)
+    results_sdf.drop_table_from_database_and_remove_from_cache(
+        force_non_splink_table=True
+    )
+
+    return joined
+
+
 def cluster_pairwise_predictions_at_multiple_thresholds(
     nodes: AcceptableInputTableType,
     edges: AcceptableInputTableType,
@@ -353,6 +435,7 @@ def cluster_pairwise_predictions_at_multiple_thresholds(
     edge_id_column_name_left: Optional[str] = None,
     edge_id_column_name_right: Optional[str] = None,
     output_cluster_summary_stats: bool = False,
+    engine: Literal["sql", "sql_pointer_jumping", "in_memory"] = "sql",
 ) -> SplinkDataFrame:
     """Clusters the pairwise match predictions at multiple thresholds using
     the connected components graph clustering algorithm.
@@ -380,6 +463,13 @@ def cluster_pairwise_predictions_at_multiple_thresholds(
             right edge IDs. If not provided, assumed to be f"{node_id_column_name}_r"
         output_cluster_summary_stats (bool): If True, output summary statistics
             for each threshold instead of full cluster information
+        engine (str): "sql" to solve connected components in the database,
+            "sql_pointer_jumping" to do so in far fewer iterations on graphs with
+            long chains of edges, or "in_memory" to pull the matching edges into
+            memory and compute a single merge tree (see
+            `compute_cluster_dendrogram`) from which the clusters at every
+            threshold are read off, which is much faster if they fit in memory.
+            All give identical clusters.  Defaults to "sql".
 
     Returns:
         SplinkDataFrame: A SplinkDataFrame containing cluster information for all
@@ -465,9 +555,6 @@ def cluster_pairwise_predictions_at_multiple_thresholds(
             "or match_weight_thresholds"
         )
 
-    initial_threshold = match_probability_thresholds.pop(0)
-    all_results = {}
-
     edge_id_column_name_left, edge_id_column_name_right = _get_edge_id_column_names(
         node_id_column_name,
         db_api,
@@ -475,6 +562,22 @@ def cluster_pairwise_predictions_at_multiple_thresholds(
         edge_id_column_name_right,
     )
 
+    if engine == "in_memory":
+        return _cluster_at_multiple_thresholds_from_merge_tree(
+            nodes_sdf,
+            edges_sdf,
+            db_api,
+            node_id_column_name,
+            edge_id_column_name_left,
+            edge_id_column_name_right,
+            match_probability_thresholds,
+            is_match_weight,
+            output_cluster_summary_stats,
+        )
+
+    initial_threshold = match_probability_thresholds.pop(0)
+    all_results = {}
+
     # First cluster at the lowest threshold
     cc = cluster_pairwise_predictions_at_threshold(
         nodes=nodes_sdf,
@@ -484,6 +587,7 @@ def cluster_pairwise_predictions_at_multiple_thresholds(
         edge_id_column_name_left=edge_id_column_name_left,
         edge_id_column_name_right=edge_id_column_name_right,
         threshold_match_probability=initial_threshold,
+        engine=engine,
     )
 
     if output_cluster_summary_stats:
@@ -547,6 +651,7 @@ def cluster_pairwise_predictions_at_multiple_thresholds(
             edge_id_column_name_right=edge_id_column_name_right,
             db_api=db_api,
             threshold_match_probability=new_threshold,
+            engine=engine,
         )
 
         pipeline = CTEPipeline([stable_clusters, marginal_new_clusters])
@@ -598,3 +703,399 @@ def cluster_pairwise_predictions_at_multiple_thresholds(
     cc.drop_table_from_database_and_remove_from_cache()
 
     return joined
+
+
+def _touched_nodes_sql(
+    edge_tables: list[SplinkDataFrame],
+    edge_id_column_name_left: str,
+    edge_id_column_name_right: str,
+    node_id_column_name: str,
+    threshold_match_probability: Optional[float],
+) -> str:
+    where = ""
+    if threshold_match_probability is not None:
+        where = f"where match_probability >= {threshold_match_probability}"
+
+    return " UNION ".join(
+        f"""
+        select {col} as {node_id_column_name}
+        from {t.templated_name}
+        {where}
+        """
+        for t in edge_tables
+        for col in (edge_id_column_name_left, edge_id_column_name_right)
+    )
+
+
+def _cluster_change_log_sqls(
+    clusters: SplinkDataFrame,
+    updated_clusters: SplinkDataFrame,
+    node_id_column_name: str,
+) -> list[dict[str, str]]:
+    """SQL to compare the previous and recomputed clusters of the nodes in play.
+
+    Each row of the output is a (previous_cluster_id, cluster_id) pair with the
+    number of nodes that moved from one to the other.  A new cluster is a merge if
+    it draws nodes from more than one previous cluster, and a previous cluster is
+    split if its nodes now belong to more than one cluster.  Nodes not previously
+    clustered have a null previous_cluster_id.  Pairs which are unchanged are
+    omitted.
+    """
+    sqls = []
+
+    sql = f"""
+    select
+        c.cluster_id as previous_cluster_id,
+        u.cluster_id,
+        count(*) as node_count
+    from {updated_clusters.physical_name} as u
+    left join {clusters.physical_name} as c
+    on u.{node_id_column_name} = c.{node_id_column_name}
+    group by c.cluster_id, u.cluster_id
+    """
+    sqls.append({"sql": sql, "output_table_name": "__splink__cluster_moves"})
+
+    sql = """
+    select cluster_id, count(previous_cluster_id) as num_previous_clusters
+    from __splink__cluster_moves
+    group by cluster_id
+    """
+    sqls.append({"sql": sql, "output_table_name": "__splink__cluster_merges"})
+
+    sql = """
+    select previous_cluster_id, count(*) as num_new_clusters
+    from __splink__cluster_moves
+    where previous_cluster_id is not null
+    group by previous_cluster_id
+    """
+    sqls.append({"sql": sql, "output_table_name": "__splink__cluster_splits"})
+
+    sql = """
+    select
+        moves.previous_cluster_id,
+        moves.cluster_id,
+        moves.node_count,
+        merges.num_previous_clusters > 1 as is_merge,
+        coalesce(splits.num_new_clusters, 0) > 1 as is_split
+    from __splink__cluster_moves as moves
+    inner join __splink__cluster_merges as merges
+    on moves.cluster_id = merges.cluster_id
+    left join __splink__cluster_splits as splits
+    on moves.previous_cluster_id = splits.previous_cluster_id
+    where
+        moves.previous_cluster_id is null
+        or moves.previous_cluster_id <> moves.cluster_id
+        or merges.num_previous_clusters > 1
+        or splits.num_new_clusters > 1
+    """
+    sqls.append({"sql": sql, "output_table_name": "__splink__cluster_change_log"})
+
+    return sqls
+
+
+def update_clusters_from_edge_deltas(
+    clusters: SplinkDataFrame,
+    edges: AcceptableInputTableType,
+    db_api: DatabaseAPISubClass,
+    node_id_column_name: str,
+    edges_added: Optional[AcceptableInputTableType] = None,
+    edges_removed: Optional[AcceptableInputTableType] = None,
+    edge_id_column_name_left: Optional[str] = None,
+    edge_id_column_name_right: Optional[str] = None,
+    threshold_match_probability: Optional[float] = None,
+    threshold_match_weight: Optional[float] = None,
+    engine: Literal["sql", "sql_pointer_jumping", "in_memory"] = "sql",
+) -> tuple[SplinkDataFrame, SplinkDataFrame]:
+    """Updates the output of `cluster_pairwise_predictions_at_threshold` after
+    edges have been added or removed, recomputing connected components only for
+    the clusters touched by those edges.
+
+    Any cluster containing an endpoint of an added or removed edge at or above the
+    threshold is broken up, and its nodes, along with any new nodes in the added
+    edges, are re-clustered using the edges between them.  All other clusters are
+    carried over unchanged.
+
+    Args:
+        clusters (SplinkDataFrame): The existing clusters, as output by
+            `cluster_pairwise_predictions_at_threshold`
+        edges (AcceptableInputTableType): All edges, with the added edges
+            included and the removed edges excluded
+        db_api (DatabaseAPISubClass): The database API to use for querying
+        node_id_column_name (str): The name of the column containing node IDs
+        edges_added (AcceptableInputTableType, optional): The edges which have
+            been added since the clusters were computed
+        edges_removed (AcceptableInputTableType, optional): The edges which have
+            been removed since the clusters were computed
+        edge_id_column_name_left (Optional[str]): The name of the column containing
+            left edge IDs. If not provided, assumed to be f"{node_id_column_name}_l"
+        edge_id_column_name_right (Optional[str]): The name of the column containing
+            right edge IDs. If not provided, assumed to be f"{node_id_column_name}_r"
+        threshold_match_probability (Optional[float]): Pairwise comparisons with a
+            match_probability at or above this threshold are matched.  Defaults to
+            the threshold the clusters were computed at, which must be known if
+            neither threshold is provided.
+        threshold_match_weight (Optional[float]): Pairwise comparisons with a
+            match_weight at or above this threshold are matched
+        engine (str): The connected components engine used to re-cluster the
+            touched clusters.  See `cluster_pairwise_predictions_at_threshold`.
+
+    Returns:
+        tuple[SplinkDataFrame, SplinkDataFrame]: The updated clusters, and a change
+            log of the merges and splits, with one row for each pair of previous
+            and new cluster which nodes moved between, and columns
+            previous_cluster_id, cluster_id, node_count, is_merge and is_split.
+
+    Examples:
+        ```python
+        clusters = cluster_pairwise_predictions_at_threshold(
+            nodes, edges, db_api=db_api, node_id_column_name="unique_id",
+            threshold_match_probability=0.9,
+        )
+
+        # ... later, after adding and removing some edges
+
+        updated_clusters, change_log = update_clusters_from_edge_deltas(
+            clusters,
+            new_edges,
+            db_api=db_api,
+            node_id_column_name="unique_id",
+            edges_added=edges_added,
+            edges_removed=edges_removed,
+        )
+        ```
+    """
+    if edges_added is None and edges_removed is None:
+        raise ValueError("Must provide at least one of edges_added or edges_removed")
+    if (
+        threshold_match_probability is None
+        and threshold_match_weight is None
+        and "threshold_match_probability" not in clusters.metadata
+    ):
+        raise ValueError(
+            "The threshold the clusters were computed at is not known, so must be "
+            "provided using threshold_match_probability or threshold_match_weight"
+        )
+
+    uid = ascii_uid(8)
+
+    if isinstance(edges, SplinkDataFrame):
+        edges_sdf = edges
+    else:
+        edges_sdf = db_api.register_table(edges, f"__splink__df_edges_{uid}")
+
+    delta_sdfs = []
+    for name, delta in [("added", edges_added), ("removed", edges_removed)]:
+        if delta is None:
+            continue
+        if not isinstance(delta, SplinkDataFrame):
+            delta = db_api.register_table(delta, f"__splink__df_edges_{name}_{uid}")
+        delta_sdfs.append(delta)
+
+    edge_id_column_name_left, edge_id_column_name_right = _get_edge_id_column_names(
+        node_id_column_name,
+        db_api,
+        edge_id_column_name_left,
+        edge_id_column_name_right,
+    )
+
+    threshold_match_probability = threshold_args_to_match_prob(
+        threshold_match_probability, threshold_match_weight
+    )
+    if threshold_match_probability is None and threshold_match_weight is None:
+        threshold_match_probability = clusters.metadata["threshold_match_probability"]
+
+    # Nodes in play are the members of every cluster touched by a matching edge
+    # in the delta, plus any nodes which only appear in the added edges
+    pipeline = CTEPipeline([clusters] + delta_sdfs)
+    sql = _touched_nodes_sql(
+        delta_sdfs,
+        edge_id_column_name_left,
+        edge_id_column_name_right,
+        node_id_column_name,
+        threshold_match_probability,
+    )
+    if edges_added is not None:
+        new_nodes_sql = _touched_nodes_sql(
+            delta_sdfs[:1],
+            edge_id_column_name_left,
+            edge_id_column_name_right,
+            node_id_column_name,
+            None,
+        )
+        sql = f"""
+        {sql}
+        UNION
+        select {node_id_column_name}
+        from ({new_nodes_sql}) as added_nodes
+        where {node_id_column_name} not in
+        (select {node_id_column_name} from {clusters.templated_name})
+        """
+    pipeline.enqueue_sql(sql, "__splink__touched_nodes")
+    sql = f"""
+    select {node_id_column_name}
+    from {clusters.templated_name}
+    where cluster_id in (
+        select cluster_id
+        from {clusters.templated_name}
+        where {node_id_column_name} in
+        (select {node_id_column_name} from __splink__touched_nodes)
+    )
+    UNION
+    select {node_id_column_name} from __splink__touched_nodes
+    """
+    pipeline.enqueue_sql(sql, "__splink__nodes_in_play")
+    nodes_in_play = db_api.sql_pipeline_to_splink_dataframe(pipeline)
+
+    pipeline = CTEPipeline([nodes_in_play, edges_sdf])
+    sql = f"""
+    select *
+    from {edges_sdf.templated_name}
+    where {edge_id_column_name_left} in
+    (select {node_id_column_name} from {nodes_in_play.templated_name})
+    and {edge_id_column_name_right} in
+    (select {node_id_column_name} from {nodes_in_play.templated_name})
+    """
+    pipeline.enqueue_sql(sql, "__splink__edges_in_play")
+    edges_in_play = db_api.sql_pipeline_to_splink_dataframe(pipeline)
+
+    marginal_new_clusters = cluster_pairwise_predictions_at_threshold(
+        nodes_in_play,
+        edges_in_play,
+        node_id_column_name=node_id_column_name,
+        edge_id_column_name_left=edge_id_column_name_left,
+        edge_id_column_name_right=edge_id_column_name_right,
+        db_api=db_api,
+        threshold_match_probability=threshold_match_probability,
+        engine=engine,
+    )
+
+    # Both cluster tables share a templated name, so refer to them physically
+    pipeline = CTEPipeline()
+    sql = f"""
+    SELECT {node_id_column_name}, cluster_id
+    FROM {clusters.physical_name}
+    WHERE {node_id_column_name} NOT IN
+    (select {node_id_column_name} from {nodes_in_play.physical_name})
+    UNION ALL
+    SELECT {node_id_column_name}, cluster_id
+    FROM {marginal_new_clusters.physical_name}
+    """
+    pipeline.enqueue_sql(sql, "__splink__clusters_updated")
+    updated_clusters = db_api.sql_pipeline_to_splink_dataframe(pipeline)
+    updated_clusters.metadata["threshold_match_probability"] = (
+        threshold_match_probability
+    )
+
+    pipeline = CTEPipeline()
+    sqls = _cluster_change_log_sqls(
+        clusters, marginal_new_clusters, node_id_column_name
+    )
+    pipeline.enqueue_list_of_sqls(sqls)
+    change_log = db_api.sql_pipeline_to_splink_dataframe(pipeline)
+
+    edges_in_play.drop_table_from_database_and_remove_from_cache()
+    nodes_in_play.drop_table_from_database_and_remove_from_cache()
+    marginal_new_clusters.drop_table_from_database_and_remove_from_cache()
+
+    return updated_clusters, change_log
+
+
+def compute_cluster_dendrogram(
+    nodes: AcceptableInputTableType,
+    edges: AcceptableInputTableType,
+    db_api: DatabaseAPISubClass,
+    node_id_column_name: str,
+    edge_id_column_name_left: Optional[str] = None,
+    edge_id_column_name_right: Optional[str] = None,
+    threshold_match_probability: Optional[float] = None,
+    threshold_match_weight: Optional[float] = None,
+) -> SplinkDataFrame:
+    """Computes the merge tree (dendrogram) of the clusters of the pairwise match
+    predictions at every threshold, in a single pass over the edges in memory.
+
+    Edges are processed in descending order of match_probability through a
+    union-find, and every edge which joins two clusters is recorded as a merge.
+    The clusters at any threshold are the connected components of the merges at
+    or above it so, for example, the number of clusters at a threshold is the
+    number of nodes less the number of merges at or above it, and can be read
+    off without re-clustering.
+
+    Merges must be found in order, so the pass loops in Python over the edges
+    which join different clusters, in bounded chunks, and is slower per edge
+    than the vectorised union-find of `engine="in_memory"` clustering.
+
+    Args:
+        nodes (AcceptableInputTableType): The table containing node information
+        edges (AcceptableInputTableType): The table containing edge information
+        db_api (DatabaseAPISubClass): The database API to use for querying
+        node_id_column_name (str): The name of the column containing node IDs
+        edge_id_column_name_left (Optional[str]): The name of the column containing
+            left edge IDs. If not provided, assumed to be f"{node_id_column_name}_l"
+        edge_id_column_name_right (Optional[str]): The name of the column containing
+            right edge IDs. If not provided, assumed to be f"{node_id_column_name}_r"
+        threshold_match_probability (Optional[float]): Only edges with a
+            match_probability at or above this threshold are included
+        threshold_match_weight (Optional[float]): Only edges with a match_weight
+            at or above this threshold are included
+
+    Returns:
+        SplinkDataFrame: One row per merge, numbered by merge_order in descending
+            order of match_probability, with the cluster ids (lowest node id) of
+            the two clusters merged as cluster_id_l and cluster_id_r, and the size
+            of the merged cluster, whose cluster id is cluster_id_l.
+    """
+    uid = ascii_uid(8)
+
+    if isinstance(nodes, SplinkDataFrame):
+        nodes_sdf = nodes
+    else:
+        nodes_sdf = db_api.register_table(nodes, f"__splink__df_nodes_{uid}")
+
+    if isinstance(edges, SplinkDataFrame):
+        edges_sdf = edges
+    else:
+        edges_sdf = db_api.register_table(edges, f"__splink__df_edges_{uid}")
+
+    edge_id_column_name_left, edge_id_column_name_right = _get_edge_id_column_names(
+        node_id_column_name,
+        db_api,
+        edge_id_column_name_left,
+        edge_id_column_name_right,
+    )
+
+    threshold_match_probability = threshold_args_to_match_prob(
+        threshold_match_probability, threshold_match_weight
+    )
+
+    sorted_node_ids, merges = _solve_merge_tree_in_memory(
+        nodes_sdf,
+        edges_sdf,
+        node_id_column_name,
+        edge_id_column_name_left,
+        edge_id_column_name_right,
+        db_api,
+        threshold_match_probability,
+    )
+    merges["merge_order"] = range(len(merges))
+    merges["cluster_id_l"] = sorted_node_ids[merges["cluster_id_l"].to_numpy()]
+    merges["cluster_id_r"] = sorted_node_ids[merges["cluster_id_r"].to_numpy()]
+
+    merges_sdf = db_api.register_table(merges, f"__splink__df_cluster_merges_{uid}")
+    pipeline = CTEPipeline([merges_sdf])
+    sql = f"""
+    select
+        merge_order,
+        match_probability,
+        cluster_id_l,
+        cluster_id_r,
+        cluster_size
+    from {merges_sdf.templated_name}
+    order by merge_order
+    """
+    pipeline.enqueue_sql(sql, "__splink__cluster_dendrogram")
+    dendrogram = db_api.sql_pipeline_to_splink_dataframe(pipeline)
+    merges_sdf.drop_table_from_database_and_remove_from_cache(
+        force_non_splink_table=True
+    )
+
+    return dendrogram
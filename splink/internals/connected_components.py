@@ -13,9 +13,13 @@ from __future__ import annotations
 
 import logging
 import time
-from typing import Optional
+from typing import Iterator, Literal, Optional
+
+import numpy as np
+import pandas as pd
 
 from splink.internals.database_api import DatabaseAPISubClass
+from splink.internals.misc import ascii_uid
 from splink.internals.pipeline import CTEPipeline
 from splink.internals.splink_dataframe import SplinkDataFrame
 
@@ -151,7 +155,7 @@ def _cc_update_representatives_first_iter() -> str:
 
 
 def _cc_generate_representatives_loop_cond(
-    prev_representatives: str, filtered_neighbours: str
+    prev_representatives: str, filtered_neighbours: str, hook: bool = False
 ) -> str:
     """SQL for Connected components main loop.
 
@@ -173,8 +177,35 @@ def _cc_generate_representatives_loop_cond(
     The logic behind 'needs_updating' is summarised in
     'cc_update_representatives_first_iter' and it can be used here to reduce our
     neighbours table to only those nodes that need updating.
+
+    If 'hook' is True, the neighbour's representative is also offered to the
+    node's representative, not just to the node.  So if C is represented by B
+    (C -> B) and C has a neighbour D represented by A (D -> A), then (B -> A).
+    This lets whole trees of nodes move to a lower representative at once.
     """
 
+    hook_sql = ""
+    if hook:
+        hook_sql = f"""
+        UNION ALL
+
+        select
+
+            repr_node.representative as node_id,
+            repr_neighbour.representative as representative
+
+        from {filtered_neighbours} as neighbours
+
+        inner join {prev_representatives} as repr_neighbour
+        on neighbours.neighbour = repr_neighbour.node_id
+
+        inner join {prev_representatives} as repr_node
+        on neighbours.node_id = repr_node.node_id
+
+        where
+            repr_neighbour.needs_updating
+        """
+
     sql = f"""
     select
 
@@ -205,7 +236,7 @@ def _cc_generate_representatives_loop_cond(
             representative
 
         from {prev_representatives}
-
+        {hook_sql}
     ) AS source
     group by source.node_id
         """
@@ -213,8 +244,37 @@ def _cc_generate_representatives_loop_cond(
     return sql
 
 
+def _cc_shortcut_representatives(new_representatives: str) -> str:
+    """SQL to replace each node's representative by its representative's
+    representative (pointer jumping).
+
+    So, if we know that C is represented by B (C -> B) and B is represented by A
+    (B -> A), we can conclude that (C -> A) without waiting for A to propagate
+    one hop at a time through C's neighbours.  Together with hooking (see
+    'cc_generate_representatives_loop_cond') this halves the length of the chains
+    of representatives every iteration, so the number of iterations grows roughly
+    with the logarithm of the diameter of the graph, rather than linearly.
+
+    A representative is never greater than the node it represents, so this only
+    ever lowers representatives.  If a representative has already been removed
+    from play as part of a stable cluster, the node keeps its representative.
+    """
+
+    sql = f"""
+    select
+        r.node_id,
+        coalesce(repr_of_repr.representative, r.representative) as representative
+    from {new_representatives} as r
+    left join {new_representatives} as repr_of_repr
+    on r.representative = repr_of_repr.node_id
+    """
+
+    return sql
+
+
 def _cc_update_representatives_loop_cond(
     prev_representatives: str,
+    new_representatives: str = "r",
 ) -> str:
     """SQL to update our representatives table - while loop condition.
 
@@ -231,7 +291,7 @@ def _cc_update_representatives_loop_cond(
         r.representative,
         r.representative <> repr.representative as needs_updating
 
-    from r
+    from {new_representatives} as r
 
     left join {prev_representatives} as repr
     on r.node_id = repr.node_id
@@ -313,6 +373,321 @@ def _cc_find_converged_nodes(
     return sqls
 
 
+def _union_find_representatives(
+    num_nodes: int, edges_l: np.ndarray, edges_r: np.ndarray
+) -> np.ndarray:
+    """For nodes numbered 0 to num_nodes - 1, the lowest numbered node in the
+    connected component of each node, given edges between edges_l and edges_r.
+
+    A vectorised union-find: each round, every edge hooks the root of the
+    higher numbered of its two trees onto the root of the other, then paths are
+    fully compressed by pointer jumping.  Since every node only ever points to a
+    lower numbered node, the root of each tree is its lowest numbered node.
+    """
+    parent = np.arange(num_nodes)
+
+    while True:
+        root_l = parent[edges_l]
+        root_r = parent[edges_r]
+        unmerged = root_l != root_r
+        if not unmerged.any():
+            return parent
+
+        # Only edges between different trees are needed in later rounds
+        edges_l, edges_r = edges_l[unmerged], edges_r[unmerged]
+        root_l, root_r = root_l[unmerged], root_r[unmerged]
+        np.minimum.at(parent, np.maximum(root_l, root_r), np.minimum(root_l, root_r))
+
+        grandparent = parent[parent]
+        while (grandparent != parent).any():
+            parent = grandparent
+            grandparent = parent[parent]
+
+
+def _dense_labels(
+    sorted_node_ids: np.ndarray, ids: pd.Series
+) -> tuple[np.ndarray, np.ndarray]:
+    """The position of each of ids in sorted_node_ids, and whether it is there"""
+    ids_array = ids.to_numpy()
+    labels = np.searchsorted(sorted_node_ids, ids_array)
+    found = labels < len(sorted_node_ids)
+    found[found] = sorted_node_ids[labels[found]] == ids_array[found]
+    return labels, found
+
+
+def _nodes_and_edges_in_memory(
+    nodes_table: SplinkDataFrame,
+    edges_table: SplinkDataFrame,
+    node_id_column_name: str,
+    edge_id_column_name_left: str,
+    edge_id_column_name_right: str,
+    db_api: DatabaseAPISubClass,
+    threshold_match_probability: Optional[float],
+    with_match_probability: bool = False,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, Optional[np.ndarray]]:
+    """Pulls the node ids and the edges at or above the threshold into NumPy
+    arrays, relabelling the ids to dense integers in sorted order.
+
+    Returns the sorted node ids, the dense labels of either end of each edge and,
+    if with_match_probability, the match probability of each edge.  Any edges to
+    ids which are not nodes are dropped.
+    """
+    match_prob_expr = f"where match_probability >= {threshold_match_probability}"
+    if threshold_match_probability is None:
+        match_prob_expr = ""
+    match_prob_column = ", match_probability" if with_match_probability else ""
+
+    pipeline = CTEPipeline([nodes_table])
+    sql = f"""
+    select {node_id_column_name} as node_id
+    from {nodes_table.templated_name}
+    """
+    pipeline.enqueue_sql(sql, "__splink__df_node_ids")
+    node_ids_df = db_api.sql_pipeline_to_splink_dataframe(pipeline)
+    node_ids = node_ids_df.as_pandas_dataframe()["node_id"].to_numpy()
+    node_ids_df.drop_table_from_database_and_remove_from_cache()
+
+    pipeline = CTEPipeline([edges_table])
+    sql = f"""
+    select
+        {edge_id_column_name_left} as node_id_l,
+        {edge_id_column_name_right} as node_id_r
+        {match_prob_column}
+    from {edges_table.templated_name}
+    {match_prob_expr}
+    """
+    pipeline.enqueue_sql(sql, "__splink__df_edge_ids")
+    edge_ids_df = db_api.sql_pipeline_to_splink_dataframe(pipeline)
+    edge_ids = edge_ids_df.as_pandas_dataframe()
+    edge_ids_df.drop_table_from_database_and_remove_from_cache()
+
+    sorted_node_ids = np.unique(node_ids)
+    edges_l, in_nodes_l = _dense_labels(sorted_node_ids, edge_ids["node_id_l"])
+    edges_r, in_nodes_r = _dense_labels(sorted_node_ids, edge_ids["node_id_r"])
+    in_nodes = in_nodes_l & in_nodes_r
+
+    match_probability = None
+    if with_match_probability:
+        match_probability = edge_ids["match_probability"].to_numpy(dtype=float)[
+            in_nodes
+        ]
+
+    return sorted_node_ids, edges_l[in_nodes], edges_r[in_nodes], match_probability
+
+
+def solve_connected_components_in_memory(
+    nodes_table: SplinkDataFrame,
+    edges_table: SplinkDataFrame,
+    node_id_column_name: str,
+    edge_id_column_name_left: str,
+    edge_id_column_name_right: str,
+    db_api: DatabaseAPISubClass,
+    threshold_match_probability: Optional[float],
+) -> SplinkDataFrame:
+    """Connected components, solved in memory rather than in SQL.
+
+    The node ids and the edges at or above the threshold are pulled into NumPy
+    arrays, the ids are relabelled to dense integers in sorted order, and the
+    components are found by union-find.  As in the SQL algorithm, the cluster_id
+    of each node is the lowest node id in its cluster, so the results are
+    identical.
+
+    This needs the nodes and thresholded edges to fit in memory, but takes a
+    single pass over each rather than one query per iteration.
+    """
+    sorted_node_ids, edges_l, edges_r, _ = _nodes_and_edges_in_memory(
+        nodes_table,
+        edges_table,
+        node_id_column_name,
+        edge_id_column_name_left,
+        edge_id_column_name_right,
+        db_api,
+        threshold_match_probability,
+    )
+    num_nodes = len(sorted_node_ids)
+
+    representatives = _union_find_representatives(num_nodes, edges_l, edges_r)
+    logger.info(f"Solved connected components in memory for {num_nodes} nodes")
+
+    clusters = db_api.register_table(
+        pd.DataFrame(
+            {
+                "node_id": sorted_node_ids,
+                "cluster_id": sorted_node_ids[representatives],
+            }
+        ),
+        f"__splink__df_in_memory_clusters_{ascii_uid(8)}",
+    )
+
+    pipeline = CTEPipeline([clusters])
+    sql = f"""
+    select node_id as {node_id_column_name}, cluster_id
+    from {clusters.templated_name}
+    """
+    pipeline.enqueue_sql(sql, "__splink__clustering_output_final")
+    final_result = db_api.sql_pipeline_to_splink_dataframe(pipeline)
+    clusters.drop_table_from_database_and_remove_from_cache(force_non_splink_table=True)
+
+    return final_result
+
+
+def _roots(parent: np.ndarray, nodes: np.ndarray) -> np.ndarray:
+    """The root of the tree of each of nodes in the forest parent, compressing the
+    paths of nodes to point straight at their roots"""
+    roots = parent[nodes]
+    next_roots = parent[roots]
+    while (next_roots != roots).any():
+        roots = next_roots
+        next_roots = parent[roots]
+    parent[nodes] = roots
+    return roots
+
+
+def _descending_edge_chunks(
+    parent: np.ndarray,
+    edges_l: np.ndarray,
+    edges_r: np.ndarray,
+    match_probability: np.ndarray,
+    max_edges_per_chunk: int,
+) -> Iterator[tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]]:
+    """Chunks of at most max_edges_per_chunk edges, in descending order of
+    match_probability, for a union-find over the forest parent which the caller
+    updates between chunks.
+
+    For each chunk, the roots of the trees joined by its edges are found in a
+    vectorised pass, and edges within a single tree are dropped.  Yields the
+    sorted roots of the trees touched by the remaining edges, the positions in
+    those roots of either end of each remaining edge, and its match_probability.
+    """
+    order = np.argsort(-match_probability, kind="stable")
+    for start in range(0, len(order), max_edges_per_chunk):
+        chunk = order[start : start + max_edges_per_chunk]
+        roots_l = _roots(parent, edges_l[chunk])
+        roots_r = _roots(parent, edges_r[chunk])
+        between_trees = roots_l != roots_r
+        if not between_trees.any():
+            continue
+        roots, local_ids = np.unique(
+            np.concatenate([roots_l[between_trees], roots_r[between_trees]]),
+            return_inverse=True,
+        )
+        local_l, local_r = local_ids.reshape(2, -1)
+        yield roots, local_l, local_r, match_probability[chunk][between_trees]
+
+
+def _merge_tree(
+    num_nodes: int,
+    edges_l: np.ndarray,
+    edges_r: np.ndarray,
+    match_probability: np.ndarray,
+    max_edges_per_chunk: int = 1_000_000,
+) -> pd.DataFrame:
+    """The merge tree (dendrogram) of single linkage clustering of nodes numbered
+    0 to num_nodes - 1.
+
+    Edges are processed in descending order of match_probability through a
+    union-find.  Each edge which joins two clusters is recorded as a merge, with
+    the match_probability at which it happens, the lowest numbered node of each
+    of the two clusters, and the size of the merged cluster.  Merges are in
+    descending order of match_probability, so the clusters at any threshold are
+    the components of the merges at or above it, and there are at most
+    num_nodes - 1 of them.
+
+    Merges must be found in order, so unlike `_union_find_representatives` this
+    loops over edges in Python.  The edges are taken in chunks of at most
+    max_edges_per_chunk (see `_descending_edge_chunks`), so only the edges of a
+    chunk which join different clusters at its start are looped over, and only
+    they are held in Python lists.  With sparse edges, most of which are merges,
+    that is still close to one step of the loop per edge.
+    """
+    parent = np.arange(num_nodes)
+    size = np.ones(num_nodes, dtype=np.int64)
+    merges = []
+
+    for roots, local_l, local_r, chunk_probability in _descending_edge_chunks(
+        parent, edges_l, edges_r, match_probability, max_edges_per_chunk
+    ):
+        # A union-find over the roots touched by the chunk, in which the lower
+        # numbered root, as the roots are sorted, is also the lower numbered node
+        roots_list = roots.tolist()
+        local_parent = list(range(len(roots)))
+        local_size = size[roots].tolist()
+        for a, b, p in zip(
+            local_l.tolist(), local_r.tolist(), chunk_probability.tolist()
+        ):
+            while local_parent[a] != a:
+                local_parent[a] = local_parent[local_parent[a]]
+                a = local_parent[a]
+            while local_parent[b] != b:
+                local_parent[b] = local_parent[local_parent[b]]
+                b = local_parent[b]
+            if a == b:
+                continue
+            if b < a:
+                a, b = b, a
+            local_parent[b] = a
+            local_size[a] += local_size[b]
+            merges.append((p, roots_list[a], roots_list[b], local_size[a]))
+
+        local_roots = _roots(np.array(local_parent), np.arange(len(roots)))
+        parent[roots] = roots[local_roots]
+        size[roots] = np.array(local_size, dtype=np.int64)
+
+    return pd.DataFrame(
+        merges,
+        columns=["match_probability", "cluster_id_l", "cluster_id_r", "cluster_size"],
+    ).astype(
+        {
+            "match_probability": float,
+            "cluster_id_l": np.int64,
+            "cluster_id_r": np.int64,
+            "cluster_size": np.int64,
+        }
+    )
+
+
+def _solve_merge_tree_in_memory(
+    nodes_table: SplinkDataFrame,
+    edges_table: SplinkDataFrame,
+    node_id_column_name: str,
+    edge_id_column_name_left: str,
+    edge_id_column_name_right: str,
+    db_api: DatabaseAPISubClass,
+    threshold_match_probability: Optional[float],
+) -> tuple[np.ndarray, pd.DataFrame]:
+    """The sorted node ids, and the merge tree of the edges at or above the
+    threshold (see `_merge_tree`), with cluster ids given as dense labels into
+    the sorted node ids"""
+    sorted_node_ids, edges_l, edges_r, match_probability = _nodes_and_edges_in_memory(
+        nodes_table,
+        edges_table,
+        node_id_column_name,
+        edge_id_column_name_left,
+        edge_id_column_name_right,
+        db_api,
+        threshold_match_probability,
+        with_match_probability=True,
+    )
+    merges = _merge_tree(len(sorted_node_ids), edges_l, edges_r, match_probability)
+    logger.info(
+        f"Computed {len(merges)} merges between {len(sorted_node_ids)} nodes in memory"
+    )
+    return sorted_node_ids, merges
+
+
+def _labels_from_merge_tree(
+    num_nodes: int, merges: pd.DataFrame, threshold_match_probability: float
+) -> np.ndarray:
+    """The dense cluster label of each node at the threshold, read off the merge
+    tree without revisiting the edges"""
+    num_merges = int((merges["match_probability"] >= threshold_match_probability).sum())
+    return _union_find_representatives(
+        num_nodes,
+        merges["cluster_id_l"].to_numpy()[:num_merges],
+        merges["cluster_id_r"].to_numpy()[:num_merges],
+    )
+
+
 def solve_connected_components(
     nodes_table: SplinkDataFrame,
     edges_table: SplinkDataFrame,
@@ -321,6 +696,7 @@ def solve_connected_components(
     edge_id_column_name_right: str,
     db_api: DatabaseAPISubClass,
     threshold_match_probability: Optional[float],
+    engine: Literal["sql", "sql_pointer_jumping", "in_memory"] = "sql",
 ) -> SplinkDataFrame:
     """Connected Components main algorithm.
 
@@ -334,6 +710,12 @@ def solve_connected_components(
         edges_table (SplinkDataFrame):
             Splink dataframe containing our edges dataframe to be connected.
 
+        engine (str):
+            "sql" to solve in the database, "sql_pointer_jumping" to solve in the
+            database and also shortcut representatives each iteration (see
+            `_cc_shortcut_representatives`), or "in_memory" to solve with
+            `solve_connected_components_in_memory`.
+
 
     Returns:
         SplinkDataFrame: A dataframe containing the connected components list
@@ -341,6 +723,22 @@ def solve_connected_components(
 
     """
 
+    if engine == "in_memory":
+        return solve_connected_components_in_memory(
+            nodes_table=nodes_table,
+            edges_table=edges_table,
+            node_id_column_name=node_id_column_name,
+            edge_id_column_name_left=edge_id_column_name_left,
+            edge_id_column_name_right=edge_id_column_name_right,
+            db_api=db_api,
+            threshold_match_probability=threshold_match_probability,
+        )
+    if engine not in ("sql", "sql_pointer_jumping"):
+        raise ValueError(
+            f"Unknown connected components engine '{engine}'. "
+            "Use 'sql', 'sql_pointer_jumping' or 'in_memory'"
+        )
+
     # Unlike most Splink SQL generaiton, the templated_name of the edges table
     # and the nodes table are not known as fixed strings because they
     # can be used provided
@@ -460,11 +858,17 @@ def solve_connected_components(
         sql = _cc_generate_representatives_loop_cond(
             prev_representatives_thinned.physical_name,
             filtered_neighbours.templated_name,
+            hook=engine == "sql_pointer_jumping",
         )
         pipeline.enqueue_sql(sql, "r")
+        new_representatives = "r"
+        if engine == "sql_pointer_jumping":
+            sql = _cc_shortcut_representatives("r")
+            pipeline.enqueue_sql(sql, "r_shortcut")
+            new_representatives = "r_shortcut"
         # Update our needs_updating column in the representatives table.
         sql = _cc_update_representatives_loop_cond(
-            prev_representatives_thinned.physical_name
+            prev_representatives_thinned.physical_name, new_representatives
         )
 
         repr_name = f"__splink__df_representatives_{iteration}"
@@ -5,6 +5,14 @@ from typing import Dict, List, Union
 
 logger = logging.getLogger(__name__)
 
+# This lookup is somewhat arbitary but its purpose is to assign a very high
+# cost to combinations of blocking rules where a a field is not allowed to vary
+# much
+# TODO: Could incorporate information about how many other fields are allowed
+# to vary i.e. it's not just the count of other blocking rules that allow this
+# field to matter ,it's also how strict they are
+FIELD_FREEDOM_COSTS_BY_COUNT = {0: 20, 1: 10, 2: 2, 3: 1, 4: 1}
+
 
 def calculate_field_freedom_cost(combination_of_brs: List[Dict[str, float]]) -> float:
     """
@@ -32,18 +40,10 @@ def calculate_field_freedom_cost(combination_of_brs: List[Dict[str, float]]) ->
     total_cost: float = 0
     field_names = [c for c in combination_of_brs[0].keys() if c.startswith("__fixed__")]
 
-    # This lookup is somewhat arbitary but its purpose is to assign a very high
-    # cost to combinations of blocking rules where a a field is not allowed to vary
-    # much
-    # TODO: Could incorporate information about how many other fields are allowed
-    # to vary i.e. it's not just the count of other blocking rules that allow this
-    # field to matter ,it's also how strict they are
-    costs_by_count = {0: 20, 1: 10, 2: 2, 3: 1, 4: 1}
-
     for field in field_names:
         field_can_vary_count = sum(row[field] == 0 for row in combination_of_brs)
 
-        cost = costs_by_count.get(field_can_vary_count, 0) / 10
+        cost = FIELD_FREEDOM_COSTS_BY_COUNT.get(field_can_vary_count, 0) / 10
 
         total_cost = total_cost + cost
 
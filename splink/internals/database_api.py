@@ -181,6 +181,25 @@ class DatabaseAPI(ABC, Generic[TablishType]):
 
         return splink_dataframe
 
+    @final
+    def sql_pipeline_to_persisted_splink_dataframe(
+        self,
+        pipeline: CTEPipeline,
+        physical_name: str,
+    ) -> SplinkDataFrame:
+        """
+        Execute a pipeline, creating a table with the given physical name rather
+        than one derived from the SQL and this DatabaseAPI instance.  This allows
+        the table to be found and reused by later sessions, so it is not added to
+        the intermediate table cache.
+        """
+        sql = pipeline.generate_cte_pipeline_sql()
+        splink_dataframe = self._sql_to_splink_dataframe(
+            sql, pipeline.output_table_name, physical_name
+        )
+        splink_dataframe.sql_used_to_create = sql
+        return splink_dataframe
+
     def sql_pipeline_to_splink_dataframe(
         self,
         pipeline: CTEPipeline,
@@ -208,6 +208,55 @@ class SplinkDialect(ABC):
             f"Unnesting blocking rules are not supported for {type(self)}"
         )
 
+    @property
+    def hash_function_name(self):
+        raise NotImplementedError(
+            f"Backend '{self.sql_dialect_str}' does not have a 'hash' function"
+        )
+
+    @property
+    def supports_hash_function(self) -> bool:
+        """Whether the backend has a `hash_function_name`"""
+        return False
+
+    @property
+    def min_blocking_rules_to_deduplicate_pairs_by_aggregation(self) -> int:
+        """With at least this many blocking rules, pairs are deduplicated by
+        aggregating over the union of all rules' pairs, rather than by excluding
+        the pairs of all preceding rules within each rule's join"""
+        return 6
+
+    @property
+    def supports_grouping_sets(self) -> bool:
+        return True
+
+    def row_id_sql(self, sql: str, order_by: str) -> str:
+        """SQL adding a `__splink_row_id` column to the rows of `sql`, numbering
+        them with distinct integers which increase in the order of `order_by`.
+        Here, the integers are the same each time the table is computed"""
+        return f"""
+            select *, cast(row_number() over (order by {order_by}) as bigint)
+                as __splink_row_id
+            from ({sql}) as __splink__df_concat_without_row_id
+            """
+
+    @property
+    def row_ids_are_deterministic(self) -> bool:
+        """Whether `row_id_sql` numbers rows the same way each time the table is
+        computed, so that separately computed tables share row ids, and row ids
+        can be persisted between sessions"""
+        return True
+
+    def shingles_sql(
+        self,
+        name: str,
+        shingle_type: Literal["character", "word"],
+        shingle_size: int,
+    ) -> str:
+        raise NotImplementedError(
+            f"MinHash LSH blocking rules are not supported for {type(self)}"
+        )
+
 
 class DuckDBDialect(SplinkDialect):
     _dialect_name_for_factory = "duckdb"
@@ -335,6 +384,47 @@ class DuckDBDialect(SplinkDialect):
     def cosine_similarity_function_name(self):
         return "array_cosine_similarity"
 
+    @property
+    def hash_function_name(self):
+        return "hash"
+
+    @property
+    def supports_hash_function(self):
+        return True
+
+    @property
+    def min_blocking_rules_to_deduplicate_pairs_by_aggregation(self):
+        # Parallel hash aggregation is cheap relative to evaluating the
+        # preceding rules' predicates on every candidate pair
+        return 4
+
+    def shingles_sql(
+        self,
+        name: str,
+        shingle_type: Literal["character", "word"],
+        shingle_size: int,
+    ) -> str:
+        """An array of the shingles of a string.  Strings shorter than the
+        shingle size form a single shingle"""
+        k = shingle_size
+        if shingle_type == "character":
+            return (
+                f"list_transform(range(1, greatest(length({name}) - {k} + 1, 1) + 1), "
+                f"__i -> substr({name}, __i, {k}))"
+            )
+        if shingle_type == "word":
+            words = f"string_split(regexp_replace(trim({name}), ' +', ' ', 'g'), ' ')"
+            if k == 1:
+                return words
+            return (
+                f"list_transform(range(1, greatest(len({words}) - {k} + 1, 1) + 1), "
+                f"__i -> array_to_string({words}[__i:__i + {k - 1}], ' '))"
+            )
+        raise ValueError(
+            f"Argument 'shingle_type' should be 'character' or 'word', "
+            f"received: '{shingle_type}'"
+        )
+
 
 class SparkDialect(SplinkDialect):
     _dialect_name_for_factory = "spark"
@@ -450,6 +540,64 @@ class SparkDialect(SplinkDialect):
         return f"""select {','.join(cols_to_select)}
                 from ({self.explode_arrays_sql(tbl_name,columns_to_explode,other_columns_to_retain+[column_to_explode])})"""  # noqa: E501
 
+    @property
+    def hash_function_name(self):
+        return "xxhash64"
+
+    @property
+    def supports_hash_function(self):
+        return True
+
+    @property
+    def min_blocking_rules_to_deduplicate_pairs_by_aggregation(self):
+        # Aggregation shuffles every candidate pair across the cluster, whereas
+        # the predicates are evaluated locally within each join
+        return 8
+
+    def row_id_sql(self, sql: str, order_by: str) -> str:
+        # An unpartitioned row_number() would sort every row through a single
+        # partition.  Instead the rows are range partitioned by the sort, and
+        # numbered within each partition, so the ids increase in sort order but
+        # depend on the partition boundaries the sort chooses
+        return f"""
+            select *, monotonically_increasing_id() as __splink_row_id
+            from (
+                select * from ({sql}) as __splink__df_concat_without_row_id
+                order by {order_by}
+            ) as __splink__df_concat_sorted
+            """
+
+    @property
+    def row_ids_are_deterministic(self) -> bool:
+        return False
+
+    def shingles_sql(
+        self,
+        name: str,
+        shingle_type: Literal["character", "word"],
+        shingle_size: int,
+    ) -> str:
+        """An array of the shingles of a string.  Strings shorter than the
+        shingle size form a single shingle"""
+        k = shingle_size
+        if shingle_type == "character":
+            return (
+                f"transform(sequence(1, greatest(length({name}) - {k} + 1, 1)), "
+                f"__i -> substring({name}, __i, {k}))"
+            )
+        if shingle_type == "word":
+            words = f"split(regexp_replace(trim({name}), ' +', ' '), ' ')"
+            if k == 1:
+                return words
+            return (
+                f"transform(sequence(1, greatest(size({words}) - {k} + 1, 1)), "
+                f"__i -> array_join(slice({words}, __i, {k}), ' '))"
+            )
+        raise ValueError(
+            f"Argument 'shingle_type' should be 'character' or 'word', "
+            f"received: '{shingle_type}'"
+        )
+
 
 class SQLiteDialect(SplinkDialect):
     _dialect_name_for_factory = "sqlite"
@@ -480,6 +628,10 @@ class SQLiteDialect(SplinkDialect):
     def infinity_expression(self):
         return "'infinity'"
 
+    @property
+    def supports_grouping_sets(self):
+        return False
+
     def random_sample_sql(
         self, proportion, sample_size, seed=None, table=None, unique_id=None
     ):
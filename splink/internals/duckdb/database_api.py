@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import logging
+import threading
 from typing import Union
 
 import duckdb
@@ -31,7 +32,23 @@ class DuckDBAPI(DatabaseAPI[duckdb.DuckDBPyRelation]):
         self,
         connection: Union[str, ddb_con] = ":memory:",
         output_schema: str = None,
+        thread_safe: bool = False,
     ):
+        """
+        Args:
+            connection (str | DuckDBPyConnection, optional): A duckdb connection,
+                or a string specifying the database to connect to. Defaults to
+                ":memory:".
+            output_schema (str, optional): Schema in which to create Splink's
+                tables. Defaults to None.
+            thread_safe (bool, optional): If True, each thread that uses this
+                DatabaseAPI gets its own cursor on the shared database (see
+                `DuckDBPyConnection.cursor()`), so that methods such as
+                `linker.inference.compare_two_records()` can be called
+                concurrently from a thread pool. Input tables are materialised
+                as tables rather than registered as views so that they are
+                visible to every thread. Defaults to False.
+        """
         super().__init__()
         validate_duckdb_connection(connection, logger)
 
@@ -47,14 +64,33 @@ class DuckDBAPI(DatabaseAPI[duckdb.DuckDBPyRelation]):
             con = duckdb.connect(database=connection)
 
         self._con = con
+        self._thread_safe = thread_safe
+        self._thread_local = threading.local()
+        self._output_schema = output_schema
 
         if output_schema:
-            self._execute_sql_against_backend(
-                f"""
-                    CREATE SCHEMA IF NOT EXISTS {output_schema};
-                    SET schema '{output_schema}';
-                """
-            )
+            self._con.sql(f"CREATE SCHEMA IF NOT EXISTS {output_schema};")
+            self._con.sql(f"SET schema '{output_schema}';")
+
+    @property
+    def _thread_con(self) -> ddb_con:
+        """The connection to use for the current thread.
+
+        In thread-safe mode this is a cursor on the shared database, created
+        the first time a thread runs a query. Otherwise it is the connection
+        itself.
+        """
+        if not self._thread_safe:
+            return self._con
+
+        cursor = getattr(self._thread_local, "cursor", None)
+        if cursor is None:
+            cursor = self._con.cursor()
+            # the default schema is a per-connection setting
+            if self._output_schema:
+                cursor.sql(f"SET schema '{self._output_schema}';")
+            self._thread_local.cursor = cursor
+        return cursor
 
     def delete_table_from_database(self, name: str) -> None:
         # If the table is in fact a pandas dataframe that's been registered using
@@ -81,7 +117,22 @@ class DuckDBAPI(DatabaseAPI[duckdb.DuckDBPyRelation]):
             except ImportError:
                 input = pd.DataFrame.from_records(input)
 
-        self._con.register(table_name, input)
+        con = self._thread_con
+        if not self._thread_safe:
+            con.register(table_name, input)
+            return
+
+        # Registered views are local to the cursor that registered them, so in
+        # thread-safe mode we copy the data into a table all cursors can see
+        tmp_view_name = f"{table_name}__registration"
+        con.register(tmp_view_name, input)
+        try:
+            con.sql(
+                f"CREATE OR REPLACE TABLE {table_name} AS "
+                f"SELECT * FROM {tmp_view_name}"
+            )
+        finally:
+            con.unregister(tmp_view_name)
 
     def table_to_splink_dataframe(
         self, templated_name: str, physical_name: str
@@ -99,7 +150,7 @@ class DuckDBAPI(DatabaseAPI[duckdb.DuckDBPyRelation]):
         return True
 
     def _execute_sql_against_backend(self, final_sql: str) -> duckdb.DuckDBPyRelation:
-        return self._con.sql(final_sql)
+        return self._thread_con.sql(final_sql)
 
     @property
     def accepted_df_dtypes(self):
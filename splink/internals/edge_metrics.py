@@ -1,15 +1,23 @@
 from __future__ import annotations
 
 import logging
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
 from typing import TYPE_CHECKING
 
+import numpy as np
+import pandas as pd
+
 from splink.internals.graph_metrics import (
     _basic_edge_metrics_sql,
     _bridges_from_igraph_sql,
+    _cluster_edge_counts_sql,
+    _edges_for_igraph_chunked_sql,
     _edges_for_igraph_sql,
+    _edges_of_chunk_sql,
     _full_bridges_sql,
     _node_mapping_table_sql,
     _truncated_edges_sql,
+    _union_bridges_sql,
 )
 from splink.internals.pipeline import CTEPipeline
 from splink.internals.splink_dataframe import SplinkDataFrame
@@ -31,6 +39,8 @@ def compute_edge_metrics(
     df_predict: SplinkDataFrame,
     df_clustered: SplinkDataFrame,
     threshold_match_probability: float,
+    max_edges_per_chunk: int = 1_000_000,
+    max_workers: int = 1,
 ) -> SplinkDataFrame:
     try:
         df_edge_metrics = compute_igraph_metrics(
@@ -39,6 +49,8 @@ def compute_edge_metrics(
             df_predict,
             df_clustered,
             threshold_match_probability,
+            max_edges_per_chunk=max_edges_per_chunk,
+            max_workers=max_workers,
         )
     except MissingDependencyException:
         logger.warning(
@@ -72,15 +84,78 @@ def compute_basic_edge_metrics(
     return df_truncated_edges
 
 
+def _bridges_of_chunk(node_l: np.ndarray, node_r: np.ndarray) -> pd.DataFrame:
+    """The edges which are bridges, from a chunk of edges between whole clusters.
+
+    May run in a worker process, so only needs the chunk in memory.
+    """
+    import igraph as ig
+
+    node_ids, dense_ids = np.unique(
+        np.concatenate([node_l, node_r]), return_inverse=True
+    )
+    graph = ig.Graph(n=len(node_ids), edges=dense_ids.reshape(2, -1).T.tolist())
+    bridges_indices = graph.bridges()
+    return pd.DataFrame(
+        {"node_l": node_l[bridges_indices], "node_r": node_r[bridges_indices]}
+    )
+
+
+def _cluster_chunk_boundaries(
+    cluster_edge_counts: np.ndarray, max_edges_per_chunk: int
+) -> list[tuple[int, int]]:
+    """Greedily pack consecutive clusters into chunks of at most
+    max_edges_per_chunk edges, unless a single cluster has more.
+
+    Returns the (start, end) positions of each chunk in the edges, ordered by
+    cluster, whose counts per cluster are cluster_edge_counts.  Every chunk holds
+    at least one cluster.
+    """
+    cumulative_edges = np.concatenate([[0], np.cumsum(cluster_edge_counts)])
+    boundaries = []
+    cluster = 0
+    while cluster < len(cluster_edge_counts):
+        # the last cluster which fits in the chunk, taking at least one
+        next_cluster = int(
+            np.searchsorted(
+                cumulative_edges,
+                cumulative_edges[cluster] + max_edges_per_chunk,
+                side="right",
+            )
+        )
+        next_cluster = max(next_cluster - 1, cluster + 1)
+        boundaries.append(
+            (int(cumulative_edges[cluster]), int(cumulative_edges[next_cluster]))
+        )
+        cluster = next_cluster
+    return boundaries
+
+
 def compute_igraph_metrics(
     linker: Linker,
     df_node_metrics: SplinkDataFrame,
     df_predict: SplinkDataFrame,
     df_clustered: SplinkDataFrame,
     threshold_match_probability: float,
+    max_edges_per_chunk: int = 1_000_000,
+    max_workers: int = 1,
 ) -> SplinkDataFrame:
+    """Computes edge metrics using igraph.
+
+    Clusters are independent of one another, so whole clusters are packed into
+    chunks of at most max_edges_per_chunk edges (unless a single cluster has
+    more) using only the number of edges in each cluster.  The edges of one chunk
+    at a time are fetched from the database and a graph is built for them, and
+    the bridges of each chunk are registered with the database as soon as they
+    are found, so only the current chunks of edges, and the per-cluster edge
+    counts, are held in memory.  The chunks are processed in this process, or by
+    a pool of max_workers processes if max_workers is more than 1.
+
+    Each chunk is selected by a filter of the table of edges, so the database
+    scans that table once per chunk.
+    """
     try:
-        import igraph as ig
+        import igraph  # noqa: F401
     except ImportError:
         raise MissingDependencyException(
             "You need to install the 'igraph' package to compute "
@@ -105,7 +180,7 @@ def compute_igraph_metrics(
     df_truncated_edges = linker._db_api.sql_pipeline_to_splink_dataframe(pipeline)
 
     # we map the truncated edges to the integer encoding for nodes above,
-    # keeping only the list of endpoints
+    # keeping only the list of endpoints and their cluster
     pipeline = CTEPipeline()
     sql_info = _edges_for_igraph_sql(
         df_node_mappings,
@@ -115,18 +190,111 @@ def compute_igraph_metrics(
     )
     pipeline.enqueue_sql(**sql_info)
     edges_for_igraph = linker._db_api.sql_pipeline_to_splink_dataframe(pipeline)
-    # we will need to manually register a table, so we use the hash from this table
+    # we will need to manually register tables, so we use the hash from this table
     igraph_edges_hash = edges_for_igraph.physical_name[-9:]
-    # NB: for large data we may have to revise this and process in chunks
-    df_edges_for_igraph = edges_for_igraph.as_pandas_dataframe()
-    # feed our edges to igraph, get the edges which are bridges as a pandas frame,
-    # and register this table with our backend
-    igraph_df = ig.Graph.DataFrame(df_edges_for_igraph, directed=False)
-    bridges_indices = igraph_df.bridges()
-    df_bridges_pd = df_edges_for_igraph.iloc[bridges_indices, :]
-    df_bridges = linker.table_management.register_table(
-        df_bridges_pd, f"__splink__bridges_{igraph_edges_hash}"
+
+    # pack whole clusters into chunks, using only the number of edges of each
+    pipeline = CTEPipeline()
+    sql_info = _cluster_edge_counts_sql(edges_for_igraph.physical_name)
+    pipeline.enqueue_sql(**sql_info)
+    df_cluster_edge_counts = linker._db_api.sql_pipeline_to_splink_dataframe(pipeline)
+    cluster_chunks = df_cluster_edge_counts.as_pandas_dataframe()
+    df_cluster_edge_counts.drop_table_from_database_and_remove_from_cache()
+    n_edges = cluster_chunks["n_edges"].to_numpy(dtype=np.int64)
+    chunk_boundaries = _cluster_chunk_boundaries(n_edges, max_edges_per_chunk)
+    # each cluster belongs to the chunk in which its first edge falls
+    cluster_chunks = pd.DataFrame(
+        {
+            "cluster_id": cluster_chunks["cluster_id"],
+            "chunk_id": np.searchsorted(
+                [start for start, _ in chunk_boundaries],
+                np.cumsum(n_edges) - n_edges,
+                side="right",
+            ).astype(np.int64)
+            - 1,
+        }
     )
+
+    # and label each edge with the chunk of its cluster
+    df_cluster_chunks = linker.table_management.register_table(
+        cluster_chunks, f"__splink__cluster_chunks_{igraph_edges_hash}"
+    )
+    del cluster_chunks
+    pipeline = CTEPipeline()
+    sql_info = _edges_for_igraph_chunked_sql(
+        edges_for_igraph.physical_name, df_cluster_chunks.physical_name
+    )
+    pipeline.enqueue_sql(**sql_info)
+    df_edges_chunked = linker._db_api.sql_pipeline_to_splink_dataframe(pipeline)
+    df_cluster_chunks.drop_table_from_database_and_remove_from_cache(
+        force_non_splink_table=True
+    )
+    edges_for_igraph.drop_table_from_database_and_remove_from_cache()
+
+    def edges_of_chunk(chunk_id: int) -> tuple[np.ndarray, np.ndarray]:
+        pipeline = CTEPipeline()
+        sql_info = _edges_of_chunk_sql(df_edges_chunked.physical_name, chunk_id)
+        pipeline.enqueue_sql(**sql_info)
+        df_edges_of_chunk = linker._db_api.sql_pipeline_to_splink_dataframe(
+            pipeline, use_cache=False
+        )
+        edges = df_edges_of_chunk.as_pandas_dataframe()
+        df_edges_of_chunk.drop_table_from_database_and_remove_from_cache()
+        return (
+            edges["node_l"].to_numpy(dtype=np.int64),
+            edges["node_r"].to_numpy(dtype=np.int64),
+        )
+
+    # register the bridges of each chunk with our backend as soon as they are found
+    bridges_tables: list[SplinkDataFrame] = []
+
+    def register_bridges(bridges: pd.DataFrame) -> None:
+        if len(bridges) > 0:
+            bridges_tables.append(
+                linker.table_management.register_table(
+                    bridges,
+                    f"__splink__bridges_{igraph_edges_hash}_{len(bridges_tables)}",
+                )
+            )
+
+    if max_workers <= 1 or len(chunk_boundaries) <= 1:
+        for chunk_id in range(len(chunk_boundaries)):
+            register_bridges(_bridges_of_chunk(*edges_of_chunk(chunk_id)))
+    else:
+        # bound the chunks held by the pool, waiting to be processed
+        max_in_flight = 2 * max_workers
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            in_flight: set[Future[pd.DataFrame]] = set()
+            for chunk_id in range(len(chunk_boundaries)):
+                if len(in_flight) >= max_in_flight:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        register_bridges(future.result())
+                in_flight.add(
+                    executor.submit(_bridges_of_chunk, *edges_of_chunk(chunk_id))
+                )
+            for future in in_flight:
+                register_bridges(future.result())
+    df_edges_chunked.drop_table_from_database_and_remove_from_cache()
+    logger.info(f"Computed bridges for {len(chunk_boundaries)} chunks of clusters")
+
+    if not bridges_tables:
+        empty = np.empty(0, dtype=np.int64)
+        bridges_tables.append(
+            linker.table_management.register_table(
+                pd.DataFrame({"node_l": empty, "node_r": empty}),
+                f"__splink__bridges_{igraph_edges_hash}_0",
+            )
+        )
+    pipeline = CTEPipeline()
+    sql_info = _union_bridges_sql([t.physical_name for t in bridges_tables])
+    pipeline.enqueue_sql(**sql_info)
+    df_bridges = linker._db_api.sql_pipeline_to_splink_dataframe(pipeline)
+    for bridges_table in bridges_tables:
+        bridges_table.drop_table_from_database_and_remove_from_cache(
+            force_non_splink_table=True
+        )
+
     # map our bridge edges back to the original node labelling
     pipeline = CTEPipeline()
     sql_info = _bridges_from_igraph_sql(df_node_mappings, df_bridges)
@@ -140,4 +308,5 @@ def compute_igraph_metrics(
     )
     pipeline.enqueue_sql(**sql_info)
     df_edge_metrics = linker._db_api.sql_pipeline_to_splink_dataframe(pipeline)
+    df_bridges.drop_table_from_database_and_remove_from_cache()
     return df_edge_metrics
@@ -25,7 +25,10 @@ from splink.internals.settings import (
     Settings,
     TrainingSettings,
 )
-from splink.internals.vertically_concatenate import compute_df_concat_with_tf
+from splink.internals.vertically_concatenate import (
+    _df_concat_with_tf_has_row_id,
+    compute_df_concat_with_tf,
+)
 
 from .database_api import DatabaseAPISubClass
 from .exceptions import EMTrainingException
@@ -174,6 +177,7 @@ class EMTrainingSession:
         pipeline = CTEPipeline()
         nodes_with_tf = compute_df_concat_with_tf(self._original_linker, pipeline)
         pipeline = CTEPipeline([nodes_with_tf])
+        use_row_id = _df_concat_with_tf_has_row_id(self._original_linker)
 
         orig_settings = self._original_linker._settings_obj
         sqls = block_using_rules_sqls(
@@ -183,6 +187,7 @@ class EMTrainingSession:
             link_type=orig_settings._link_type,
             source_dataset_input_column=orig_settings.column_info_settings.source_dataset_input_column,
             unique_id_input_column=orig_settings.column_info_settings.unique_id_input_column,
+            use_row_id=use_row_id,
         )
         pipeline.enqueue_list_of_sqls(sqls)
 
@@ -197,6 +202,7 @@ class EMTrainingSession:
             input_tablename_r="__splink__df_concat_with_tf",
             source_dataset_input_column=orig_settings.column_info_settings.source_dataset_input_column,
             unique_id_input_column=orig_settings.column_info_settings.unique_id_input_column,
+            use_row_id=use_row_id,
         )
 
         pipeline.enqueue_list_of_sqls(sqls)
@@ -121,7 +121,7 @@ def estimate_u_values(linker: Linker, max_pairs: float, seed: int = None) -> Non
         sample_size = total_nodes
 
     pipeline = CTEPipeline()
-    pipeline = enqueue_df_concat(training_linker, pipeline)
+    pipeline = enqueue_df_concat(training_linker, pipeline, row_id=True)
 
     sql = f"""
     select *
@@ -131,6 +131,7 @@ def estimate_u_values(linker: Linker, max_pairs: float, seed: int = None) -> Non
 
     pipeline.enqueue_sql(sql, "__splink__df_concat_sample")
     df_sample = db_api.sql_pipeline_to_splink_dataframe(pipeline)
+    use_row_id = "__splink_row_id" in [c.unquote().name for c in df_sample.columns]
 
     pipeline = CTEPipeline(input_dataframes=[df_sample])
 
@@ -169,6 +170,7 @@ def estimate_u_values(linker: Linker, max_pairs: float, seed: int = None) -> Non
         link_type=linker._settings_obj._link_type,
         source_dataset_input_column=settings_obj.column_info_settings.source_dataset_input_column,
         unique_id_input_column=settings_obj.column_info_settings.unique_id_input_column,
+        use_row_id=use_row_id,
     )
     pipeline.enqueue_list_of_sqls(sql_infos)
     blocked_pairs = linker._db_api.sql_pipeline_to_splink_dataframe(pipeline)
@@ -182,6 +184,7 @@ def estimate_u_values(linker: Linker, max_pairs: float, seed: int = None) -> Non
         input_tablename_r="__splink__df_concat_sample",
         source_dataset_input_column=settings_obj.column_info_settings.source_dataset_input_column,
         unique_id_input_column=settings_obj.column_info_settings.unique_id_input_column,
+        use_row_id=use_row_id,
     )
 
     pipeline.enqueue_list_of_sqls(sqls)
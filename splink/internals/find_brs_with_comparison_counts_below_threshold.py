@@ -2,17 +2,19 @@ from __future__ import annotations
 
 import logging
 import string
-from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Set
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Set, Tuple
 
 import pandas as pd
 
 from splink.internals.blocking import BlockingRule
 from splink.internals.blocking_analysis import (
+    _count_comparisons_by_grouping_sets_sqls,
     _count_comparisons_generated_from_blocking_rule,
 )
 from splink.internals.blocking_rule_creator import BlockingRuleCreator
 from splink.internals.blocking_rule_library import CustomRule, block_on
 from splink.internals.database_api import DatabaseAPISubClass
+from splink.internals.pipeline import CTEPipeline
 
 from .input_column import InputColumn
 
@@ -84,23 +86,77 @@ def _generate_blocking_rule(
     return br.get_blocking_rule(db_api.sql_dialect.sql_dialect_str)
 
 
+def _count_comparisons_for_combinations(
+    linker: "Linker",
+    all_columns: List[str],
+    combinations: List[List[str]],
+) -> List[int]:
+    """Count the comparisons generated by blocking on each of a list of combinations
+    of columns, all of which contain the same number of columns.
+
+    Where the backend supports GROUPING SETS, all combinations are counted in a
+    single scan of the input data.  Otherwise, each is counted separately.
+    """
+    db_api = linker._db_api
+    link_type = linker._settings_obj._link_type
+
+    if not db_api.sql_dialect.supports_grouping_sets:
+        return [
+            int(
+                _count_comparisons_generated_from_blocking_rule(
+                    splink_df_dict=linker._input_tables_dict,
+                    blocking_rule=_generate_blocking_rule(db_api, combination),
+                    link_type=link_type,
+                    db_api=db_api,
+                    compute_post_filter_count=False,
+                    source_dataset_input_column=linker._settings_obj.column_info_settings.source_dataset_input_column,
+                    unique_id_input_column=linker._settings_obj.column_info_settings.unique_id_input_column,
+                )["number_of_comparisons_generated_pre_filter_conditions"]
+            )
+            for combination in combinations
+        ]
+
+    # The key expression for each column, as it appears in the blocking rule
+    key_expressions = [
+        _generate_blocking_rule(db_api, [c])._equi_join_conditions[0][0]
+        for c in all_columns
+    ]
+    combinations_as_indices = [
+        [all_columns.index(c) for c in combination] for combination in combinations
+    ]
+
+    pipeline = CTEPipeline()
+    sqls = _count_comparisons_by_grouping_sets_sqls(
+        linker._input_tables_dict,
+        key_expressions,
+        combinations_as_indices,
+        link_type,
+    )
+    pipeline.enqueue_list_of_sqls(sqls)
+    counts_df = db_api.sql_pipeline_to_splink_dataframe(pipeline)
+    counts_by_mask = {
+        int(r["key_mask"]): r["count_of_pairwise_comparisons_generated"]
+        for r in counts_df.as_record_dict()
+    }
+    counts_df.drop_table_from_database_and_remove_from_cache()
+
+    # A combination with no groups (e.g. all keys null) generates no comparisons
+    return [
+        int(counts_by_mask.get(sum(2**i for i in indices)) or 0)
+        for indices in combinations_as_indices
+    ]
+
+
 def _search_tree_for_blocking_rules_below_threshold_count(
     linker: "Linker",
     all_columns: List[str],
     threshold: int,
-    current_combination: List[str] = None,
-    already_visited: Set[frozenset[str]] = None,
-    results: List[Dict[str, str]] = None,
     max_results: Optional[int] = None,
 ) -> List[Dict[str, str]]:
     """
-    Recursively search combinations of fields to find ones that result in a count less
+    Search combinations of fields to find ones that result in a count less
     than the threshold.
 
-    Uses the new, fast counting function
-    linker._count_num_comparisons_from_blocking_rule_pre_filter_conditions
-    to count
-
     The full tree looks like this, where c1 c2 are columns:
     c1                    count_comparisons(c1)
     ├── c2                count_comparisons(c1, c2)
@@ -119,6 +175,13 @@ def _search_tree_for_blocking_rules_below_threshold_count(
           example, c2 -> c1 will not be evaluated because c1 -> c2 has already been
           counted
 
+    The tree is searched one level at a time, so that all the combinations of a
+    given number of fields are counted together, in a single scan of the data
+    (see _count_comparisons_for_combinations).  The results are returned in the
+    order of a depth first search of the tree, as above, and max_results keeps
+    the first results in that order.  Once max_results have been found, only the
+    combinations which come before the last of them are searched further.
+
     When a count is below the threshold, create a dictionary with the relevant stats
     like :
     {
@@ -139,76 +202,86 @@ def _search_tree_for_blocking_rules_below_threshold_count(
 
     Args:
         linker: splink.Linker
-        fields (List[str]): List of fields to combine.
+        all_columns (List[str]): List of fields to combine.
         threshold (float): The count threshold.
-        current_combination (List[str], optional): Current combination of fields.
-        already_visited (Set[frozenset], optional): Set of visited combinations.
-        results (List[Dict[str, str]], optional): List of results. Defaults to [].
+        max_results (int, optional): Maximum number of results to return.
 
     Returns:
         List[Dict]: List of results.  Each result is a dict with statistics like
             the number of comparisons, the blocking rule etc.
     """
-    if current_combination is None:
-        current_combination = []
-    if already_visited is None:
-        already_visited = set()
-    if results is None:
-        results = []
-
-    if max_results is not None and len(results) >= max_results:
-        return results
-
-    if len(current_combination) == len(all_columns):
-        return results  # All fields included, meaning we're at a leaf so exit recursion
-
-    br = _generate_blocking_rule(linker._db_api, current_combination)
-
-    comparison_count = _count_comparisons_generated_from_blocking_rule(
-        splink_df_dict=linker._input_tables_dict,
-        blocking_rule=br,
-        link_type=linker._settings_obj._link_type,
-        db_api=linker._db_api,
-        compute_post_filter_count=False,
-        source_dataset_input_column=linker._settings_obj.column_info_settings.source_dataset_input_column,
-        unique_id_input_column=linker._settings_obj.column_info_settings.unique_id_input_column,
-    )["number_of_comparisons_generated_pre_filter_conditions"]
-
-    already_visited.add(frozenset(current_combination))
-
-    # int just to satisfy mypy
-    comparison_count = int(comparison_count)
-    if comparison_count > threshold:
-        # Generate all valid combinations and continue the search
-        combinations = _generate_combinations(
-            all_columns, current_combination, already_visited
+    # Results with their position in a depth first search of the tree
+    results: List[Tuple[Tuple[int, ...], Dict[str, str]]] = []
+    already_visited: Set[frozenset[str]] = set()
+
+    def depth_first_position(combination: List[str]) -> Tuple[int, ...]:
+        return tuple(all_columns.index(col) for col in combination)
+
+    level: List[List[str]] = [[]]
+    counts = [
+        int(
+            _count_comparisons_generated_from_blocking_rule(
+                splink_df_dict=linker._input_tables_dict,
+                blocking_rule=_generate_blocking_rule(linker._db_api, []),
+                link_type=linker._settings_obj._link_type,
+                db_api=linker._db_api,
+                compute_post_filter_count=False,
+                source_dataset_input_column=linker._settings_obj.column_info_settings.source_dataset_input_column,
+                unique_id_input_column=linker._settings_obj.column_info_settings.unique_id_input_column,
+            )["number_of_comparisons_generated_pre_filter_conditions"]
         )
-        for next_combination in combinations:
-            _search_tree_for_blocking_rules_below_threshold_count(
-                linker,
+    ]
+
+    # Leaves (all fields included) are not counted
+    while level and len(level[0]) < len(all_columns):
+        combinations_above_threshold = []
+
+        for current_combination, comparison_count in zip(level, counts):
+            already_visited.add(frozenset(current_combination))
+
+            if comparison_count > threshold:
+                combinations_above_threshold.append(current_combination)
+                continue
+
+            row = _generate_output_combinations_table_row(
+                current_combination,
+                _generate_blocking_rule(linker._db_api, current_combination),
+                comparison_count,
                 all_columns,
-                threshold,
-                next_combination,
-                already_visited,
-                results,
-                max_results=max_results,
             )
-    else:
-        row = _generate_output_combinations_table_row(
-            current_combination,
-            br,
-            comparison_count,
-            all_columns,
-        )
-        results.append(row)
+            results.append((depth_first_position(current_combination), row))
 
-        b_cols = row["blocking_columns_sanitised"]
-        count = f"{row['comparison_count']:,.0f}"
-        logger.info(
-            f"--\nFound BR with blocking columns: {b_cols}\nComparison count: {count}"
-        )
+            b_cols = row["blocking_columns_sanitised"]
+            count = f"{row['comparison_count']:,.0f}"
+            logger.info(
+                f"--\nFound BR with blocking columns: {b_cols}\n"
+                f"Comparison count: {count}"
+            )
+
+        if max_results is not None and len(results) >= max_results:
+            # Combinations further down the tree come after the combination they
+            # extend, so there is no need to extend those after the last result
+            results = sorted(results, key=lambda result: result[0])[:max_results]
+            last_position = results[-1][0]
+            combinations_above_threshold = [
+                combination
+                for combination in combinations_above_threshold
+                if depth_first_position(combination) < last_position
+            ]
 
-    return results
+        # Generate all valid combinations and continue the search
+        level = []
+        for current_combination in combinations_above_threshold:
+            for next_combination in _generate_combinations(
+                all_columns, current_combination, already_visited
+            ):
+                already_visited.add(frozenset(next_combination))
+                level.append(next_combination)
+
+        if level and len(level[0]) < len(all_columns):
+            counts = _count_comparisons_for_combinations(linker, all_columns, level)
+
+    return [row for _, row in sorted(results, key=lambda result: result[0])]
 
 
 def find_blocking_rules_below_threshold_comparison_count(
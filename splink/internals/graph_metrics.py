@@ -126,6 +126,7 @@ def _node_mapping_table_sql(
     sql = f"""
         SELECT
             composite_unique_id,
+            cluster_id,
             row_number() OVER(ORDER BY 1) - 1 AS new_id
         FROM
             {nodes_table_name}
@@ -144,17 +145,20 @@ def _edges_for_igraph_sql(
 ) -> dict[str, str]:
     """
     Generate SQL to relabel an edges table using the node relabelling as
-    generated by table specified by `_node_mapping_table_sql`
+    generated by table specified by `_node_mapping_table_sql`, keeping the
+    cluster of the left-hand node
     """
     node_mapping_table_name = df_node_mappings.physical_name
     sql = f"""
         SELECT
             edges_left_mapped.node_l,
-            m.new_id AS node_r
+            m.new_id AS node_r,
+            edges_left_mapped.cluster_id
         FROM (
             SELECT
                 m.new_id AS node_l,
-                e.{composite_uid_edges_r} AS node_r
+                e.{composite_uid_edges_r} AS node_r,
+                m.cluster_id
             FROM
                 {truncated_edges_table_name} e
             LEFT JOIN
@@ -172,6 +176,79 @@ def _edges_for_igraph_sql(
     return sql_info
 
 
+def _cluster_edge_counts_sql(edges_for_igraph_table_name: str) -> dict[str, str]:
+    """
+    Generate SQL to count the edges in each cluster of a table generated by
+    `_edges_for_igraph_sql`
+    """
+    sql = f"""
+        SELECT
+            cluster_id,
+            count(*) AS n_edges
+        FROM
+            {edges_for_igraph_table_name}
+        GROUP BY
+            cluster_id
+    """
+    sql_info = {"sql": sql, "output_table_name": "__splink__cluster_edge_counts"}
+    return sql_info
+
+
+def _edges_for_igraph_chunked_sql(
+    edges_for_igraph_table_name: str,
+    cluster_chunks_table_name: str,
+) -> dict[str, str]:
+    """
+    Generate SQL to label each edge of a table generated by `_edges_for_igraph_sql`
+    with the chunk of its cluster, as given by a table of cluster_id and chunk_id
+    """
+    sql = f"""
+        SELECT
+            e.node_l,
+            e.node_r,
+            c.chunk_id
+        FROM
+            {edges_for_igraph_table_name} e
+        INNER JOIN
+            {cluster_chunks_table_name} c
+        ON
+            e.cluster_id = c.cluster_id
+    """
+    sql_info = {"sql": sql, "output_table_name": "__splink__edges_for_igraph_chunked"}
+    return sql_info
+
+
+def _edges_of_chunk_sql(
+    edges_for_igraph_chunked_table_name: str, chunk_id: int
+) -> dict[str, str]:
+    """
+    Generate SQL to select the edges of one chunk of a table generated by
+    `_edges_for_igraph_chunked_sql`
+    """
+    sql = f"""
+        SELECT
+            node_l,
+            node_r
+        FROM
+            {edges_for_igraph_chunked_table_name}
+        WHERE
+            chunk_id = {chunk_id}
+    """
+    sql_info = {"sql": sql, "output_table_name": "__splink__edges_of_chunk"}
+    return sql_info
+
+
+def _union_bridges_sql(bridges_table_names: list[str]) -> dict[str, str]:
+    """
+    Generate SQL to union the tables of bridges found for each chunk of edges
+    """
+    sql = " UNION ALL ".join(
+        f"SELECT node_l, node_r FROM {table_name}" for table_name in bridges_table_names
+    )
+    sql_info = {"sql": sql, "output_table_name": "__splink__bridges"}
+    return sql_info
+
+
 def _bridges_from_igraph_sql(
     df_node_mappings: SplinkDataFrame,
     df_bridges: SplinkDataFrame,
@@ -49,10 +49,12 @@ from splink.internals.settings_validation.valid_types import (
     _validate_dialect,
 )
 from splink.internals.splink_dataframe import SplinkDataFrame
+from splink.internals.term_frequency_store import TermFrequencyStore
 from splink.internals.unique_id_concat import (
     _composite_unique_id_from_edges_sql,
 )
 from splink.internals.vertically_concatenate import (
+    _df_concat_with_tf_has_row_id,
     compute_df_concat_with_tf,
     concat_table_column_names,
 )
@@ -174,6 +176,7 @@ class Linker:
         self._em_training_sessions: list[EMTrainingSession] = []
 
         self._debug_mode = False
+        self._term_frequency_store: Optional[TermFrequencyStore] = None
 
         self.clustering: "LinkerClustering" = LinkerClustering(self)
         self.evaluation: "LinkerEvalution" = LinkerEvalution(self)
@@ -553,6 +556,7 @@ class Linker:
 
         pipeline = CTEPipeline()
         nodes_with_tf = compute_df_concat_with_tf(self, pipeline)
+        use_row_id = _df_concat_with_tf_has_row_id(self)
 
         pipeline = CTEPipeline([nodes_with_tf])
 
@@ -563,6 +567,7 @@ class Linker:
             link_type="self_link",
             source_dataset_input_column=settings.column_info_settings.source_dataset_input_column,
             unique_id_input_column=settings.column_info_settings.unique_id_input_column,
+            use_row_id=use_row_id,
         )
         pipeline.enqueue_list_of_sqls(sqls)
 
@@ -577,6 +582,7 @@ class Linker:
             input_tablename_r="__splink__df_concat_with_tf",
             source_dataset_input_column=settings.column_info_settings.source_dataset_input_column,
             unique_id_input_column=settings.column_info_settings.unique_id_input_column,
+            use_row_id=use_row_id,
         )
         pipeline.enqueue_list_of_sqls(sqls)
 
@@ -631,7 +637,7 @@ class Linker:
         """Find blocking rules for prediction below some given threshold of the
         maximum number of comparisons that can be generated per blocking rule
         (max_comparisons_per_rule).
-        Uses a heuristic cost algorithm to identify the 'best' set of blocking rules
+        Uses a cost optimiser to identify the 'best' set of blocking rules
         Args:
             max_comparisons_per_rule (int): The maximum number of comparisons that
                 each blocking rule is allowed to generate
@@ -643,9 +649,10 @@ class Linker:
                 of those expressions.
             min_freedom (int, optional): The minimum amount of freedom any column should
                 be allowed.
-            num_runs (int, optional): Each run selects rows using a heuristic and costs
-                them. The more runs, the more likely you are to find the best rule.
-                Defaults to 5.
+            num_runs (int, optional): The maximum number of candidate rules from
+                which to start the (deterministic) optimiser. The best result is
+                then proved optimal or improved upon by a bounded exact search.
+                Defaults to 200.
             num_equi_join_weight (int, optional): Weight allocated to number of equi
                 joins in the blocking rules.
                 Defaults to 0 since this is cost better captured by other criteria.
@@ -715,15 +722,16 @@ class Linker:
         """Find blocking rules for EM training below some given threshold of the
         maximum number of comparisons that can be generated per blocking rule
         (max_comparisons_per_rule).
-        Uses a heuristic cost algorithm to identify the 'best' set of blocking rules
+        Uses a cost optimiser to identify the 'best' set of blocking rules
         Args:
             max_comparisons_per_rule (int): The maximum number of comparisons that
                 each blocking rule is allowed to generate
             min_freedom (int, optional): The minimum amount of freedom any column should
                 be allowed.
-            num_runs (int, optional): Each run selects rows using a heuristic and costs
-                them.  The more runs, the more likely you are to find the best rule.
-                Defaults to 5.
+            num_runs (int, optional): The maximum number of candidate rules from
+                which to start the (deterministic) optimiser. The best result is
+                then proved optimal or improved upon by a bounded exact search.
+                Defaults to 200.
             num_equi_join_weight (int, optional): Weight allocated to number of equi
                 joins in the blocking rules.
                 Defaults to 0 since this is cost better captured by other criteria.
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, List, Optional
+from typing import TYPE_CHECKING, List, Literal, Optional
 
 from splink.internals.connected_components import (
     solve_connected_components,
@@ -45,6 +45,7 @@ class LinkerClustering:
         df_predict: SplinkDataFrame,
         threshold_match_probability: Optional[float] = None,
         threshold_match_weight: Optional[float] = None,
+        engine: Literal["sql", "sql_pointer_jumping", "in_memory"] = "sql",
     ) -> SplinkDataFrame:
         """Clusters the pairwise match predictions that result from
         `linker.inference.predict()` into groups of connected record using the connected
@@ -62,6 +63,12 @@ class LinkerClustering:
             threshold_match_weight (float, optional): Pairwise comparisons with a
                 `match_weight` at or above this threshold are matched. Only one of
                 threshold_match_probability or threshold_match_weight should be provided
+            engine (str, optional): "sql" to solve connected components in the
+                database, "sql_pointer_jumping" to do so in far fewer iterations on
+                graphs with long chains of edges, or "in_memory" to pull the
+                matching edges into memory and solve them using union-find, which is
+                much faster if they fit in memory.  All give identical clusters.
+                Defaults to "sql".
 
         Returns:
             SplinkDataFrame: A SplinkDataFrame containing a list of all IDs, clustered
@@ -145,6 +152,7 @@ class LinkerClustering:
             edge_id_column_name_right="node_id_r",
             db_api=db_api,
             threshold_match_probability=threshold_match_probability,
+            engine=engine,
         )
 
         edges_table_with_composite_ids.drop_table_from_database_and_remove_from_cache()
@@ -154,8 +162,10 @@ class LinkerClustering:
         enqueue_df_concat(linker, pipeline)
 
         columns = concat_table_column_names(self._linker)
-        # don't want to include salting column in output if present
-        columns_without_salt = filter(lambda x: x != "__splink_salt", columns)
+        # don't want to include salting or row id columns in output
+        columns_without_salt = filter(
+            lambda x: x not in ("__splink_salt", "__splink_row_id"), columns
+        )
 
         select_columns_sql = ", ".join(columns_without_salt)
 
@@ -186,6 +196,7 @@ class LinkerClustering:
         duplicate_free_datasets: List[str],
         threshold_match_probability: Optional[float] = None,
         threshold_match_weight: Optional[float] = None,
+        engine: Literal["sql", "in_memory"] = "sql",
     ) -> SplinkDataFrame:
         """
         Clusters the pairwise match predictions that result from
@@ -209,6 +220,12 @@ class LinkerClustering:
             threshold_match_weight (float, optional): Pairwise comparisons with a
                 `match_weight` at or above this threshold are matched. Only one of
                 threshold_match_probability or threshold_match_weight should be provided
+            engine (str, optional): "sql" to cluster in the database, in rounds of
+                merging mutually best links, or "in_memory" to pull the matching
+                edges into memory and merge them in a single pass in descending
+                order of match probability, which is much faster if they fit in
+                memory.  Both give identical clusters, unless match probabilities
+                tie.  Defaults to "sql".
 
         Returns:
             SplinkDataFrame: A SplinkDataFrame containing a list of all IDs, clustered
@@ -299,6 +316,7 @@ class LinkerClustering:
             duplicate_free_datasets=duplicate_free_datasets,
             db_api=db_api,
             threshold_match_probability=threshold_match_probability,
+            engine=engine,
         )
 
         edges_table_with_composite_ids.drop_table_from_database_and_remove_from_cache()
@@ -308,8 +326,10 @@ class LinkerClustering:
         enqueue_df_concat(linker, pipeline)
 
         columns = concat_table_column_names(self._linker)
-        # don't want to include salting column in output if present
-        columns_without_salt = filter(lambda x: x != "__splink_salt", columns)
+        # don't want to include salting or row id columns in output
+        columns_without_salt = filter(
+            lambda x: x not in ("__splink_salt", "__splink_row_id"), columns
+        )
 
         select_columns_sql = ", ".join(columns_without_salt)
 
@@ -397,6 +417,8 @@ class LinkerClustering:
         df_predict: SplinkDataFrame,
         df_clustered: SplinkDataFrame,
         threshold_match_probability: float,
+        max_edges_per_chunk: int = 1_000_000,
+        max_workers: int = 1,
     ) -> SplinkDataFrame:
         """
         Internal function for computing edge-level metrics.
@@ -427,6 +449,8 @@ class LinkerClustering:
             df_predict,
             df_clustered,
             threshold_match_probability,
+            max_edges_per_chunk=max_edges_per_chunk,
+            max_workers=max_workers,
         )
         df_edge_metrics.metadata["threshold_match_probability"] = (
             threshold_match_probability
@@ -483,6 +507,8 @@ class LinkerClustering:
         df_clustered: SplinkDataFrame,
         *,
         threshold_match_probability: float = None,
+        max_edges_per_chunk: int = 1_000_000,
+        max_workers: int = 1,
     ) -> GraphMetricsResults:
         """
         Generates tables containing graph metrics (for nodes, edges and clusters),
@@ -497,6 +523,13 @@ class LinkerClustering:
                 match_probability at or above this threshold. If not provided, the value
                 will be taken from metadata on `df_clustered`. If no such metadata is
                 available, this value _must_ be provided.
+            max_edges_per_chunk (int, optional): Bridges are computed for chunks of
+                whole clusters with at most this many edges (unless a single
+                cluster has more), so that the graph of all the edges is never
+                built at once. Defaults to 1,000,000.
+            max_workers (int, optional): If more than 1, the chunks are processed
+                by a pool of this many worker processes, rather than in this
+                process. Defaults to 1.
 
         Returns:
             GraphMetricsResult: A data class containing SplinkDataFrames
@@ -540,6 +573,8 @@ class LinkerClustering:
             df_predict,
             df_clustered,
             threshold_match_probability,
+            max_edges_per_chunk=max_edges_per_chunk,
+            max_workers=max_workers,
         )
         # don't need edges as information is baked into node metrics
         df_cluster_metrics = self._compute_metrics_clusters(df_node_metrics)
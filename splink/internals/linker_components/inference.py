@@ -2,13 +2,19 @@ from __future__ import annotations
 
 import logging
 import time
+from copy import copy
 from typing import TYPE_CHECKING, Any
 
 from splink.internals.accuracy import _select_found_by_blocking_rules
 from splink.internals.blocking import (
     BlockingRule,
+    ExplodingBlockingRule,
+    backend_link_type_options,
     block_using_rules_sqls,
+    input_fingerprint_sql,
     materialise_exploded_id_tables,
+    materialise_salting_hot_key_tables,
+    persisted_blocked_pairs_table_name,
 )
 from splink.internals.blocking_rule_creator import BlockingRuleCreator
 from splink.internals.blocking_rule_creator_utils import to_blocking_rule_creator
@@ -34,7 +40,10 @@ from splink.internals.term_frequencies import (
 )
 from splink.internals.unique_id_concat import _composite_unique_id_from_edges_sql
 from splink.internals.vertically_concatenate import (
+    _df_concat_with_tf_has_row_id,
     compute_df_concat_with_tf,
+    concat_table_column_names,
+    enqueue_df_concat,
     enqueue_df_concat_with_tf,
     split_df_concat_with_tf_into_two_tables_sqls,
 )
@@ -114,11 +123,19 @@ class LinkerInference:
             link_type=link_type,
             blocking_rules=self._linker._settings_obj._blocking_rules_to_generate_predictions,
             db_api=self._linker._db_api,
-            splink_df_dict=self._linker._input_tables_dict,
+            df_concat=df_concat_with_tf,
             source_dataset_input_column=self._linker._settings_obj.column_info_settings.source_dataset_input_column,
             unique_id_input_column=self._linker._settings_obj.column_info_settings.unique_id_input_column,
         )
 
+        adaptive_salted_br_with_hot_keys = materialise_salting_hot_key_tables(
+            link_type=link_type,
+            blocking_rules=self._linker._settings_obj._blocking_rules_to_generate_predictions,
+            db_api=self._linker._db_api,
+            splink_df_dict=self._linker._input_tables_dict,
+        )
+
+        use_row_id = _df_concat_with_tf_has_row_id(self._linker)
         sqls = block_using_rules_sqls(
             input_tablename_l=blocking_input_tablename_l,
             input_tablename_r=blocking_input_tablename_r,
@@ -126,6 +143,7 @@ class LinkerInference:
             link_type=link_type,
             source_dataset_input_column=self._linker._settings_obj.column_info_settings.source_dataset_input_column,
             unique_id_input_column=self._linker._settings_obj.column_info_settings.unique_id_input_column,
+            use_row_id=use_row_id,
         )
         pipeline.enqueue_list_of_sqls(sqls)
         blocked_pairs = self._linker._db_api.sql_pipeline_to_splink_dataframe(pipeline)
@@ -139,6 +157,7 @@ class LinkerInference:
             input_tablename_r="__splink__df_concat_with_tf",
             source_dataset_input_column=self._linker._settings_obj.column_info_settings.source_dataset_input_column,
             unique_id_input_column=self._linker._settings_obj.column_info_settings.unique_id_input_column,
+            use_row_id=use_row_id,
         )
         pipeline.enqueue_list_of_sqls(sqls)
 
@@ -148,6 +167,10 @@ class LinkerInference:
         deterministic_link_df.metadata["is_deterministic_link"] = True
 
         [b.drop_materialised_id_pairs_dataframe() for b in exploding_br_with_id_tables]
+        [
+            b.drop_materialised_hot_keys_dataframe()
+            for b in adaptive_salted_br_with_hot_keys
+        ]
         blocked_pairs.drop_table_from_database_and_remove_from_cache()
 
         return deterministic_link_df
@@ -158,6 +181,7 @@ class LinkerInference:
         threshold_match_weight: float = None,
         materialise_after_computing_term_frequencies: bool = True,
         materialise_blocked_pairs: bool = True,
+        cache_blocked_pairs: bool = False,
     ) -> SplinkDataFrame:
         """Create a dataframe of scored pairwise comparisons using the parameters
         of the linkage model.
@@ -180,6 +204,12 @@ class LinkerInference:
                 computed as part of a large CTE pipeline.   Defaults to True
             materialise_blocked_pairs: In the blocking phase, materialise the table
                 of pairs of records that will be scored
+            cache_blocked_pairs (bool): If True, keep the table of blocked pairs
+                in the database, named by the blocking rules, link type and a
+                fingerprint of the input data.  Later calls to predict, including
+                by other linkers using the same database, reuse it while these are
+                unchanged, so that e.g. rescoring after retraining the model skips
+                blocking entirely.  Defaults to False.
 
         Examples:
             ```py
@@ -199,9 +229,16 @@ class LinkerInference:
 
         # In duckdb, calls to random() in a CTE pipeline cause problems:
         # https://gist.github.com/RobinL/d329e7004998503ce91b68479aa41139
+        # Exploding blocking rules derive their pairs from the materialised table,
+        # so that they share its row ids
+        has_exploding_blocking_rules = any(
+            isinstance(br, ExplodingBlockingRule)
+            for br in self._linker._settings_obj._blocking_rules_to_generate_predictions
+        )
         if (
             materialise_after_computing_term_frequencies
             or self._linker._sql_dialect.sql_dialect_str == "duckdb"
+            or has_exploding_blocking_rules
         ):
             df_concat_with_tf = compute_df_concat_with_tf(self._linker, pipeline)
             pipeline = CTEPipeline([df_concat_with_tf])
@@ -228,38 +265,92 @@ class LinkerInference:
             blocking_input_tablename_r = "__splink__df_concat_with_tf_right"
             link_type = "two_dataset_link_only"
 
-        # If exploded blocking rules exist, we need to materialise
-        # the tables of ID pairs
+        use_row_id = _df_concat_with_tf_has_row_id(self._linker)
 
-        exploding_br_with_id_tables = materialise_exploded_id_tables(
-            link_type=link_type,
-            blocking_rules=self._linker._settings_obj._blocking_rules_to_generate_predictions,
-            db_api=self._linker._db_api,
-            splink_df_dict=self._linker._input_tables_dict,
-            source_dataset_input_column=self._linker._settings_obj.column_info_settings.source_dataset_input_column,
-            unique_id_input_column=self._linker._settings_obj.column_info_settings.unique_id_input_column,
-        )
+        if cache_blocked_pairs and not materialise_blocked_pairs:
+            raise ValueError(
+                "cache_blocked_pairs requires materialise_blocked_pairs=True"
+            )
 
-        sqls = block_using_rules_sqls(
-            input_tablename_l=blocking_input_tablename_l,
-            input_tablename_r=blocking_input_tablename_r,
-            blocking_rules=self._linker._settings_obj._blocking_rules_to_generate_predictions,
-            link_type=link_type,
-            source_dataset_input_column=self._linker._settings_obj.column_info_settings.source_dataset_input_column,
-            unique_id_input_column=self._linker._settings_obj.column_info_settings.unique_id_input_column,
-        )
+        blocked_pairs = None
+        persisted_blocked_pairs_name = None
+        if cache_blocked_pairs:
+            # Row ids which depend on how the input data is partitioned may
+            # differ in a later session, so the cached pairs use unique ids
+            sql_dialect = self._linker._sql_dialect
+            blocking_rules = (
+                self._linker._settings_obj._blocking_rules_to_generate_predictions
+            )
+            if not sql_dialect.row_ids_are_deterministic:
+                if any(isinstance(br, ExplodingBlockingRule) for br in blocking_rules):
+                    raise ValueError(
+                        "cache_blocked_pairs is not supported with exploding "
+                        f"blocking rules using the {sql_dialect.sql_dialect_str} "
+                        "backend, whose row ids may differ between sessions"
+                    )
+                use_row_id = False
+            persisted_blocked_pairs_name = self._persisted_blocked_pairs_table_name(
+                link_type, use_row_id
+            )
+            if self._linker._db_api.table_exists_in_database(
+                persisted_blocked_pairs_name
+            ):
+                logger.info("Reusing blocked pairs cached by a previous predict()")
+                blocked_pairs = self._linker._db_api.table_to_splink_dataframe(
+                    "__splink__blocked_id_pairs", persisted_blocked_pairs_name
+                )
+                pipeline.append_input_dataframe(blocked_pairs)
+
+        exploding_br_with_id_tables = []
+        adaptive_salted_br_with_hot_keys = []
+        if blocked_pairs is None:
+            # If exploded blocking rules exist, we need to materialise
+            # the tables of ID pairs
+
+            exploding_br_with_id_tables = materialise_exploded_id_tables(
+                link_type=link_type,
+                blocking_rules=self._linker._settings_obj._blocking_rules_to_generate_predictions,
+                db_api=self._linker._db_api,
+                df_concat=df_concat_with_tf,
+                source_dataset_input_column=self._linker._settings_obj.column_info_settings.source_dataset_input_column,
+                unique_id_input_column=self._linker._settings_obj.column_info_settings.unique_id_input_column,
+            )
 
-        pipeline.enqueue_list_of_sqls(sqls)
+            adaptive_salted_br_with_hot_keys = materialise_salting_hot_key_tables(
+                link_type=link_type,
+                blocking_rules=self._linker._settings_obj._blocking_rules_to_generate_predictions,
+                db_api=self._linker._db_api,
+                splink_df_dict=self._linker._input_tables_dict,
+            )
 
-        if materialise_blocked_pairs:
-            blocked_pairs = self._linker._db_api.sql_pipeline_to_splink_dataframe(
-                pipeline
+            sqls = block_using_rules_sqls(
+                input_tablename_l=blocking_input_tablename_l,
+                input_tablename_r=blocking_input_tablename_r,
+                blocking_rules=self._linker._settings_obj._blocking_rules_to_generate_predictions,
+                link_type=link_type,
+                source_dataset_input_column=self._linker._settings_obj.column_info_settings.source_dataset_input_column,
+                unique_id_input_column=self._linker._settings_obj.column_info_settings.unique_id_input_column,
+                use_row_id=use_row_id,
             )
 
-            pipeline = CTEPipeline([blocked_pairs, df_concat_with_tf])
-            blocking_time = time.time() - start_time
-            logger.info(f"Blocking time: {blocking_time:.2f} seconds")
-            start_time = time.time()
+            pipeline.enqueue_list_of_sqls(sqls)
+
+            if persisted_blocked_pairs_name is not None:
+                blocked_pairs = (
+                    self._linker._db_api.sql_pipeline_to_persisted_splink_dataframe(
+                        pipeline, persisted_blocked_pairs_name
+                    )
+                )
+            elif materialise_blocked_pairs:
+                blocked_pairs = self._linker._db_api.sql_pipeline_to_splink_dataframe(
+                    pipeline
+                )
+
+            if blocked_pairs is not None:
+                pipeline = CTEPipeline([blocked_pairs, df_concat_with_tf])
+                blocking_time = time.time() - start_time
+                logger.info(f"Blocking time: {blocking_time:.2f} seconds")
+                start_time = time.time()
 
         sqls = compute_comparison_vector_values_from_id_pairs_sqls(
             self._linker._settings_obj._columns_to_select_for_blocking,
@@ -268,6 +359,7 @@ class LinkerInference:
             input_tablename_r="__splink__df_concat_with_tf",
             source_dataset_input_column=self._linker._settings_obj.column_info_settings.source_dataset_input_column,
             unique_id_input_column=self._linker._settings_obj.column_info_settings.unique_id_input_column,
+            use_row_id=use_row_id,
         )
         pipeline.enqueue_list_of_sqls(sqls)
 
@@ -287,11 +379,49 @@ class LinkerInference:
         self._linker._predict_warning()
 
         [b.drop_materialised_id_pairs_dataframe() for b in exploding_br_with_id_tables]
-        if materialise_blocked_pairs:
+        [
+            b.drop_materialised_hot_keys_dataframe()
+            for b in adaptive_salted_br_with_hot_keys
+        ]
+        if materialise_blocked_pairs and not cache_blocked_pairs:
             blocked_pairs.drop_table_from_database_and_remove_from_cache()
 
         return predictions
 
+    def _persisted_blocked_pairs_table_name(
+        self, link_type: backend_link_type_options, use_row_id: bool
+    ) -> str:
+        """The name under which blocked pairs are cached by
+        `predict(cache_blocked_pairs=True)`, which changes if the blocking rules,
+        link type or input data change"""
+        settings = self._linker._settings_obj
+        uid_cols = settings.column_info_settings.unique_id_input_columns
+
+        pipeline = enqueue_df_concat(self._linker, CTEPipeline())
+        fingerprinted_columns = [
+            c
+            for c in concat_table_column_names(self._linker)
+            if c not in ("__splink_salt", "__splink_row_id")
+        ]
+        sql = input_fingerprint_sql(
+            "__splink__df_concat", fingerprinted_columns, self._linker._sql_dialect
+        )
+        pipeline.enqueue_sql(sql, "__splink__df_concat_fingerprint")
+        fingerprint_df = self._linker._db_api.sql_pipeline_to_splink_dataframe(
+            pipeline, use_cache=False
+        )
+        fingerprint = fingerprint_df.as_record_dict()[0]
+        fingerprint_df.drop_table_from_database_and_remove_from_cache()
+
+        return persisted_blocked_pairs_table_name(
+            blocking_rules=settings._blocking_rules_to_generate_predictions,
+            link_type=link_type,
+            unique_id_column_names=[c.unquote().name for c in uid_cols],
+            use_row_id=use_row_id,
+            input_columns=fingerprinted_columns,
+            input_fingerprint=fingerprint,
+        )
+
     def _score_missing_cluster_edges(
         self,
         df_clusters: SplinkDataFrame,
@@ -511,11 +641,6 @@ class LinkerInference:
             SplinkDataFrame: The pairwise comparisons.
         """
 
-        original_blocking_rules = (
-            self._linker._settings_obj._blocking_rules_to_generate_predictions
-        )
-        original_link_type = self._linker._settings_obj._link_type
-
         blocking_rule_list = ensure_is_list(blocking_rules)
 
         if not isinstance(records_or_tablename, str):
@@ -548,9 +673,10 @@ class LinkerInference:
         for n, br in enumerate(blocking_rule_list):
             br.add_preceding_rules(blocking_rule_list[:n])
 
-        self._linker._settings_obj._blocking_rules_to_generate_predictions = (
-            blocking_rule_list
-        )
+        # Work on a copy of the settings so that the linker is not mutated, which
+        # allows this method to be called concurrently from multiple threads
+        settings = copy(self._linker._settings_obj)
+        settings._blocking_rules_to_generate_predictions = blocking_rule_list
 
         pipeline = add_unique_id_and_source_dataset_cols_if_needed(
             self._linker,
@@ -559,7 +685,6 @@ class LinkerInference:
             in_tablename="__splink__df_new_records",
             out_tablename="__splink__df_new_records_uid_fix",
         )
-        settings = self._linker._settings_obj
         sqls = block_using_rules_sqls(
             input_tablename_l="__splink__df_concat_with_tf",
             input_tablename_r="__splink__df_new_records_uid_fix",
@@ -603,8 +728,8 @@ class LinkerInference:
         )
 
         sqls = compute_comparison_vector_values_from_id_pairs_sqls(
-            self._linker._settings_obj._columns_to_select_for_blocking,
-            self._linker._settings_obj._columns_to_select_for_comparison_vector_values,
+            settings._columns_to_select_for_blocking,
+            settings._columns_to_select_for_comparison_vector_values,
             input_tablename_l="__splink__df_concat_with_tf",
             input_tablename_r="__splink__df_new_records_with_tf",
             source_dataset_input_column=settings.column_info_settings.source_dataset_input_column,
@@ -614,7 +739,7 @@ class LinkerInference:
         pipeline.enqueue_list_of_sqls(sqls)
 
         sqls = predict_from_comparison_vectors_sqls_using_settings(
-            self._linker._settings_obj,
+            settings,
             sql_infinity_expression=self._linker._infinity_expression,
         )
         pipeline.enqueue_list_of_sqls(sqls)
@@ -630,11 +755,6 @@ class LinkerInference:
             pipeline, use_cache=False
         )
 
-        self._linker._settings_obj._blocking_rules_to_generate_predictions = (
-            original_blocking_rules
-        )
-        self._linker._settings_obj._link_type = original_link_type
-
         blocked_pairs.drop_table_from_database_and_remove_from_cache()
 
         return predictions
@@ -701,12 +821,11 @@ class LinkerInference:
 
         linker = self._linker
 
-        retain_matching_columns = linker._settings_obj._retain_matching_columns
-        retain_intermediate_calculation_columns = (
-            linker._settings_obj._retain_intermediate_calculation_columns
-        )
-        linker._settings_obj._retain_matching_columns = True
-        linker._settings_obj._retain_intermediate_calculation_columns = True
+        # Work on a copy of the settings so that the linker is not mutated, which
+        # allows this method to be called concurrently from multiple threads
+        settings = copy(linker._settings_obj)
+        settings._retain_matching_columns = True
+        settings._retain_intermediate_calculation_columns = True
 
         cache = linker._intermediate_table_cache
 
@@ -789,7 +908,7 @@ class LinkerInference:
             uid_str="_right",
         )
 
-        cols_to_select = self._linker._settings_obj._columns_to_select_for_blocking
+        cols_to_select = settings._columns_to_select_for_blocking
 
         select_expr = ", ".join(cols_to_select)
         sql = f"""
@@ -799,9 +918,7 @@ class LinkerInference:
         """
         pipeline.enqueue_sql(sql, "__splink__compare_two_records_blocked")
 
-        cols_to_select = (
-            linker._settings_obj._columns_to_select_for_comparison_vector_values
-        )
+        cols_to_select = settings._columns_to_select_for_comparison_vector_values
         select_expr = ", ".join(cols_to_select)
         sql = f"""
         select {select_expr}
@@ -810,13 +927,13 @@ class LinkerInference:
         pipeline.enqueue_sql(sql, "__splink__df_comparison_vectors")
 
         sqls = predict_from_comparison_vectors_sqls_using_settings(
-            linker._settings_obj,
+            settings,
             sql_infinity_expression=linker._infinity_expression,
         )
         pipeline.enqueue_list_of_sqls(sqls)
 
         if include_found_by_blocking_rules:
-            br_col = _select_found_by_blocking_rules(linker._settings_obj)
+            br_col = _select_found_by_blocking_rules(settings)
             sql = f"""
             select *, {br_col}
             from __splink__df_predict
@@ -828,9 +945,4 @@ class LinkerInference:
             pipeline, use_cache=False
         )
 
-        linker._settings_obj._retain_matching_columns = retain_matching_columns
-        linker._settings_obj._retain_intermediate_calculation_columns = (
-            retain_intermediate_calculation_columns
-        )
-
         return predictions
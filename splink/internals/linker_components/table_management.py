@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import logging
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
 from splink.internals.database_api import AcceptableInputTableType
 from splink.internals.input_column import InputColumn
@@ -12,10 +12,11 @@ from splink.internals.pipeline import CTEPipeline
 from splink.internals.splink_dataframe import SplinkDataFrame
 from splink.internals.term_frequencies import (
     colname_to_tf_tablename,
-    term_frequencies_for_single_column_sql,
+    update_term_frequencies_sql,
 )
+from splink.internals.term_frequency_store import TermFrequencyStore
 from splink.internals.vertically_concatenate import (
-    enqueue_df_concat,
+    compute_term_frequency_tables,
 )
 
 if TYPE_CHECKING:
@@ -32,7 +33,12 @@ class LinkerTableManagement:
     def __init__(self, linker: Linker):
         self._linker = linker
 
-    def compute_tf_table(self, column_name: str) -> SplinkDataFrame:
+    def compute_tf_table(
+        self,
+        column_name: str,
+        top_k: Optional[int] = None,
+        min_frequency: Optional[float] = None,
+    ) -> SplinkDataFrame:
         """Compute a term frequency table for a given column and persist to the database
 
         This method is useful if you want to pre-compute term frequency tables e.g.
@@ -60,34 +66,124 @@ class LinkerTableManagement:
             )
 
             ```
-
+            Approximate term frequencies for a high cardinality column
+            ```py
+            linker = Linker(df, settings, db_api)
+            linker.table_management.compute_tf_table("email", top_k=1000)
+            linker.inference.predict()
+            ```
 
         Args:
             column_name (str): The column name in the input table
+            top_k (int, optional): If provided, only the frequencies of the top_k
+                most common values are kept.  All other values share a single
+                default frequency, the mean of their frequencies.  This makes the
+                table much smaller for high cardinality columns, at little cost
+                to the accuracy of match weights.  Defaults to None.
+            min_frequency (float, optional): If provided, only the frequencies of
+                values with at least this frequency are kept, with all others
+                sharing a default frequency as for top_k.  Defaults to None.
 
         Returns:
             SplinkDataFrame: The resultant table as a splink data frame
         """
 
-        input_col = InputColumn(
-            column_name,
-            column_info_settings=self._linker._settings_obj.column_info_settings,
-            sqlglot_dialect_str=self._linker._settings_obj._sql_dialect_str,
+        return self.compute_tf_tables(
+            [column_name], top_k=top_k, min_frequency=min_frequency
+        )[0]
+
+    def compute_tf_tables(
+        self,
+        column_names: list[str],
+        top_k: Optional[int] = None,
+        min_frequency: Optional[float] = None,
+    ) -> list[SplinkDataFrame]:
+        """Compute term frequency tables for several columns and persist them to
+        the database
+
+        Where the backend supports it, the frequencies of all the columns are
+        counted in a single scan of the input data, so this is faster than calling
+        `compute_tf_table` once per column.
+
+        Examples:
+            ```py
+            linker = Linker(df, db_api)
+            df_first_name_tf, df_surname_tf = (
+                linker.table_management.compute_tf_tables(["first_name", "surname"])
+            )
+            ```
+
+        Args:
+            column_names (list[str]): The column names in the input table
+            top_k (int, optional): Keep only the frequencies of the top_k most
+                common values of each column, as in `compute_tf_table`.
+                Defaults to None.
+            min_frequency (float, optional): Keep only the frequencies of values
+                with at least this frequency, as in `compute_tf_table`.
+                Defaults to None.
+
+        Returns:
+            list[SplinkDataFrame]: The resultant tables as splink data frames, in
+                the same order as column_names
+        """
+        if top_k is not None and top_k < 1:
+            raise ValueError(f"top_k must be at least 1, got {top_k}")
+        if min_frequency is not None and not 0 < min_frequency <= 1:
+            raise ValueError(
+                f"min_frequency must be between 0 and 1, got {min_frequency}"
+            )
+
+        input_cols = [
+            InputColumn(
+                column_name,
+                column_info_settings=self._linker._settings_obj.column_info_settings,
+                sqlglot_dialect_str=self._linker._settings_obj._sql_dialect_str,
+            )
+            for column_name in column_names
+        ]
+        return compute_term_frequency_tables(
+            self._linker, input_cols, top_k=top_k, min_frequency=min_frequency
         )
-        tf_tablename = colname_to_tf_tablename(input_col)
-        cache = self._linker._intermediate_table_cache
 
-        if tf_tablename in cache:
-            tf_df = cache.get_with_logging(tf_tablename)
-        else:
-            pipeline = CTEPipeline()
-            pipeline = enqueue_df_concat(self._linker, pipeline)
-            sql = term_frequencies_for_single_column_sql(input_col)
-            pipeline.enqueue_sql(sql, tf_tablename)
-            tf_df = self._linker._db_api.sql_pipeline_to_splink_dataframe(pipeline)
-            self._linker._intermediate_table_cache[tf_tablename] = tf_df
+    def use_term_frequency_store(self, directory: str) -> None:
+        """Save term frequency tables to, and load them from, a directory of
+        Parquet files, so that they are computed only once for the same input data
+        rather than once per linker.
+
+        Each table is saved with a fingerprint of the column it was computed
+        from, made from the number of records and a hash of every record's unique
+        id and value.  When term frequencies are next needed, by this or any other
+        linker, a stored table is used only if its fingerprint matches the current
+        input data, and is otherwise recomputed and overwritten.
 
-        return tf_df
+        Requires a backend with a hash function which can write Parquet (DuckDB
+        or Spark).
+
+        Examples:
+            ```py
+            linker = Linker(df, settings, db_api)
+            linker.table_management.use_term_frequency_store("tf_tables")
+            # Computes the term frequency tables and saves them
+            linker.training.estimate_u_using_random_sampling(max_pairs=1e7)
+            >>>
+            # In a later session, the saved tables are loaded instead
+            linker = Linker(df, settings, db_api)
+            linker.table_management.use_term_frequency_store("tf_tables")
+            linker.inference.predict()
+            ```
+
+        Args:
+            directory (str): The directory in which to store the tables
+        """
+        sql_dialect = self._linker._db_api.sql_dialect
+        if not sql_dialect.supports_hash_function:
+            raise ValueError(
+                f"Dialect {sql_dialect.sql_dialect_str} is not supported for term "
+                "frequency stores, since it has no hash function with which to "
+                "fingerprint the input data"
+            )
+
+        self._linker._term_frequency_store = TermFrequencyStore(directory)
 
     def invalidate_cache(self):
         """Invalidate the Splink cache.  Any previously-computed tables
@@ -232,6 +328,125 @@ class LinkerTableManagement:
         splink_dataframe.templated_name = table_name_templated
         return splink_dataframe
 
+    def update_tf_table(
+        self,
+        column_name: str,
+        records_added: Optional[AcceptableInputTableType] = None,
+        records_removed: Optional[AcceptableInputTableType] = None,
+    ) -> SplinkDataFrame:
+        """Update the term frequency table for a column to account for records added
+        to, or removed from, the input data, without recomputing it from scratch.
+
+        The raw counts of the values in the records added and removed are applied to
+        the `tf_count` column of the current term frequency table, and the
+        frequencies are renormalised.  Only the records added and removed are
+        scanned, so this is much faster than recomputing the table when the change
+        is small relative to the input data.
+
+        The current table must either have been computed by Splink, e.g. by
+        `compute_tf_table`, or registered with `register_term_frequency_lookup`
+        from a table Splink computed, so that it has a `tf_count` column.
+        Approximate tables computed with `top_k` or `min_frequency` cannot be
+        updated.
+
+        Examples:
+            ```py
+            # Yesterday's term frequencies, saved from a previous run
+            tf_surname = pd.read_parquet("tf_surname.parquet")
+            linker.table_management.register_term_frequency_lookup(
+                tf_surname, "surname"
+            )
+            updated_tf_surname = linker.table_management.update_tf_table(
+                "surname", records_added=df_todays_records
+            )
+            updated_tf_surname.to_parquet("tf_surname.parquet", overwrite=True)
+            ```
+
+        Args:
+            column_name (str): The column name in the input table
+            records_added (AcceptableInputTableType, optional): Records added to the
+                input data.  Defaults to None.
+            records_removed (AcceptableInputTableType, optional): Records removed
+                from the input data.  Defaults to None.
+
+        Returns:
+            SplinkDataFrame: The updated term frequency table, which replaces the
+                current one in the cache
+        """
+        input_col = InputColumn(
+            column_name,
+            column_info_settings=self._linker._settings_obj.column_info_settings,
+            sqlglot_dialect_str=self._linker._settings_obj._sql_dialect_str,
+        )
+        tf_tablename = colname_to_tf_tablename(input_col)
+        cache = self._linker._intermediate_table_cache
+        db_api = self._linker._db_api
+
+        if tf_tablename not in cache:
+            raise ValueError(
+                f"There is no term frequency table for {column_name} to update. "
+                "Compute one with `compute_tf_table`, or register one with "
+                "`register_term_frequency_lookup`"
+            )
+        tf_table = cache.get_with_logging(tf_tablename)
+
+        if "tf_count" not in [c.unquote().name for c in tf_table.columns]:
+            raise ValueError(
+                f"The term frequency table for {column_name} has no `tf_count` "
+                "column of raw counts, so cannot be updated"
+            )
+
+        pipeline = CTEPipeline([tf_table])
+        sql = f"""
+        select count(*) as count_default_rows
+        from {tf_tablename}
+        where {input_col.name} is null
+        """
+        pipeline.enqueue_sql(sql, "__splink__df_tf_default_rows")
+        default_rows = db_api.sql_pipeline_to_splink_dataframe(pipeline)
+        count_default_rows = default_rows.as_record_dict()[0]["count_default_rows"]
+        default_rows.drop_table_from_database_and_remove_from_cache()
+        if count_default_rows > 0:
+            raise ValueError(
+                f"The term frequency table for {column_name} is approximate, so "
+                "cannot be updated.  Recompute it with `compute_tf_table`"
+            )
+
+        records_tables = {}
+        for templated_name, records in [
+            ("__splink__df_tf_records_added", records_added),
+            ("__splink__df_tf_records_removed", records_removed),
+        ]:
+            if records is not None:
+                records_table = self.register_table(
+                    records, f"{templated_name}_{ascii_uid(8)}"
+                )
+                records_table.templated_name = templated_name
+                records_tables[templated_name] = records_table
+
+        pipeline = CTEPipeline([tf_table, *records_tables.values()])
+        sql = update_term_frequencies_sql(
+            input_col,
+            tf_tablename,
+            records_added_tablename=(
+                "__splink__df_tf_records_added" if records_added is not None else None
+            ),
+            records_removed_tablename=(
+                "__splink__df_tf_records_removed"
+                if records_removed is not None
+                else None
+            ),
+        )
+        pipeline.enqueue_sql(sql, f"{tf_tablename}_updated")
+        updated_tf_table = db_api.sql_pipeline_to_splink_dataframe(pipeline)
+        updated_tf_table.templated_name = tf_tablename
+
+        cache[tf_tablename] = updated_tf_table
+        # The term frequencies joined onto the input data are now out of date
+        cache.pop("__splink__df_concat_with_tf", None)
+
+        return updated_tf_table
+
     def register_labels_table(self, input_data, overwrite=False):
         table_name_physical = "__splink__df_labels_" + ascii_uid(8)
         splink_dataframe = self.register_table(
@@ -11,7 +11,10 @@ from splink.internals.expectation_maximisation import (
     compute_proportions_for_new_parameters,
 )
 from splink.internals.pipeline import CTEPipeline
-from splink.internals.vertically_concatenate import compute_df_concat_with_tf
+from splink.internals.vertically_concatenate import (
+    _df_concat_with_tf_has_row_id,
+    compute_df_concat_with_tf,
+)
 
 from .m_u_records_to_parameters import (
     append_m_probability_to_comparison_level_trained_probabilities,
@@ -39,6 +42,7 @@ def estimate_m_values_from_label_column(linker: "Linker", label_colname: str) ->
 
     pipeline = CTEPipeline()
     nodes_with_tf = compute_df_concat_with_tf(linker, pipeline)
+    use_row_id = _df_concat_with_tf_has_row_id(linker)
 
     pipeline = CTEPipeline([nodes_with_tf])
 
@@ -49,6 +53,7 @@ def estimate_m_values_from_label_column(linker: "Linker", label_colname: str) ->
         link_type=settings_obj._link_type,
         source_dataset_input_column=settings_obj.column_info_settings.source_dataset_input_column,
         unique_id_input_column=settings_obj.column_info_settings.unique_id_input_column,
+        use_row_id=use_row_id,
     )
     pipeline.enqueue_list_of_sqls(sqls)
 
@@ -63,6 +68,7 @@ def estimate_m_values_from_label_column(linker: "Linker", label_colname: str) ->
         input_tablename_r="__splink__df_concat_with_tf",
         source_dataset_input_column=training_linker._settings_obj.column_info_settings.source_dataset_input_column,
         unique_id_input_column=training_linker._settings_obj.column_info_settings.unique_id_input_column,
+        use_row_id=use_row_id,
     )
 
     pipeline.enqueue_list_of_sqls(sqls)
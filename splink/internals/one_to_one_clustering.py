@@ -2,15 +2,175 @@ from __future__ import annotations
 
 import logging
 import time
-from typing import List, Optional
+from typing import List, Literal, Optional
 
+import numpy as np
+import pandas as pd
+
+from splink.internals.connected_components import (
+    _dense_labels,
+    _descending_edge_chunks,
+    _roots,
+)
 from splink.internals.database_api import DatabaseAPISubClass
+from splink.internals.misc import ascii_uid
 from splink.internals.pipeline import CTEPipeline
 from splink.internals.splink_dataframe import SplinkDataFrame
 
 logger = logging.getLogger(__name__)
 
 
+def _greedy_one_to_one_representatives(
+    num_nodes: int,
+    dataset_bits: np.ndarray,
+    edges_l: np.ndarray,
+    edges_r: np.ndarray,
+    match_probability: np.ndarray,
+    max_edges_per_chunk: int = 1_000_000,
+) -> np.ndarray:
+    """For nodes numbered 0 to num_nodes - 1, the lowest numbered node in the
+    one to one cluster of each node.
+
+    dataset_bits has a bit set for the duplicate free dataset each node belongs
+    to, if any.  Edges are processed in descending order of match_probability
+    through a union-find whose roots hold the bits of every dataset in their
+    cluster, and two clusters are merged unless they share a bit.
+
+    This gives the same clusters as the rounds of mutually best links in SQL: an
+    edge which is the best remaining link for both of its clusters cannot have
+    either cluster change before it is reached in descending order, and clusters
+    that conflict never stop conflicting as they grow.
+
+    Whether an edge merges its clusters depends on the edges before it, so this
+    loops over edges in Python.  The edges are taken in chunks of at most
+    max_edges_per_chunk (see `_descending_edge_chunks`), so only the edges of a
+    chunk which join different clusters at its start are looped over, and only
+    they are held in Python lists.  With sparse edges that is still close to one
+    step of the loop per edge.
+    """
+    parent = np.arange(num_nodes)
+    contains = dataset_bits.astype(np.int64)
+
+    for roots, local_l, local_r, _ in _descending_edge_chunks(
+        parent, edges_l, edges_r, match_probability, max_edges_per_chunk
+    ):
+        # A union-find over the roots touched by the chunk, in which the lower
+        # numbered root, as the roots are sorted, is also the lower numbered node
+        local_parent = list(range(len(roots)))
+        local_contains = contains[roots].tolist()
+        for a, b in zip(local_l.tolist(), local_r.tolist()):
+            while local_parent[a] != a:
+                local_parent[a] = local_parent[local_parent[a]]
+                a = local_parent[a]
+            while local_parent[b] != b:
+                local_parent[b] = local_parent[local_parent[b]]
+                b = local_parent[b]
+            if a == b or local_contains[a] & local_contains[b]:
+                continue
+            if b < a:
+                a, b = b, a
+            local_parent[b] = a
+            local_contains[a] |= local_contains[b]
+
+        local_roots = _roots(np.array(local_parent), np.arange(len(roots)))
+        parent[roots] = roots[local_roots]
+        contains[roots] = np.array(local_contains, dtype=np.int64)
+
+    return _roots(parent, np.arange(num_nodes))
+
+
+def one_to_one_clustering_in_memory(
+    nodes_table: SplinkDataFrame,
+    edges_table: SplinkDataFrame,
+    node_id_column_name: str,
+    source_dataset_column_name: str,
+    edge_id_column_name_left: str,
+    edge_id_column_name_right: str,
+    duplicate_free_datasets: List[str],
+    db_api: DatabaseAPISubClass,
+    threshold_match_probability: Optional[float],
+) -> SplinkDataFrame:
+    """One to one clustering, solved in memory rather than in SQL.
+
+    The nodes and the edges at or above the threshold are pulled into NumPy
+    arrays and clustered with `_greedy_one_to_one_representatives`, in a single
+    pass over the edges rather than one ranking of every edge per iteration.  As
+    in the SQL algorithm, the cluster_id of each node is the lowest node id in its
+    cluster.  Where match probabilities tie, each algorithm breaks the tie
+    arbitrarily, so the clusters may differ.
+    """
+    match_prob_expr = f"where match_probability >= {threshold_match_probability}"
+    if threshold_match_probability is None:
+        match_prob_expr = ""
+
+    pipeline = CTEPipeline([nodes_table])
+    sql = f"""
+    select
+        {node_id_column_name} as node_id,
+        {source_dataset_column_name} as source_dataset
+    from {nodes_table.templated_name}
+    """
+    pipeline.enqueue_sql(sql, "__splink__df_node_ids")
+    nodes_df = db_api.sql_pipeline_to_splink_dataframe(pipeline)
+    nodes = nodes_df.as_pandas_dataframe().sort_values("node_id")
+    nodes_df.drop_table_from_database_and_remove_from_cache()
+
+    pipeline = CTEPipeline([edges_table])
+    sql = f"""
+    select
+        {edge_id_column_name_left} as node_id_l,
+        {edge_id_column_name_right} as node_id_r,
+        match_probability
+    from {edges_table.templated_name}
+    {match_prob_expr}
+    """
+    pipeline.enqueue_sql(sql, "__splink__df_edge_ids")
+    edges_df = db_api.sql_pipeline_to_splink_dataframe(pipeline)
+    edges = edges_df.as_pandas_dataframe()
+    edges_df.drop_table_from_database_and_remove_from_cache()
+
+    sorted_node_ids = nodes["node_id"].to_numpy()
+    dataset_bits = np.zeros(len(sorted_node_ids), dtype=np.int64)
+    for i, sd in enumerate(duplicate_free_datasets):
+        dataset_bits[(nodes["source_dataset"] == sd).to_numpy()] |= 1 << i
+
+    edges_l, in_nodes_l = _dense_labels(sorted_node_ids, edges["node_id_l"])
+    edges_r, in_nodes_r = _dense_labels(sorted_node_ids, edges["node_id_r"])
+    in_nodes = in_nodes_l & in_nodes_r
+
+    representatives = _greedy_one_to_one_representatives(
+        len(sorted_node_ids),
+        dataset_bits,
+        edges_l[in_nodes],
+        edges_r[in_nodes],
+        edges["match_probability"].to_numpy(dtype=float)[in_nodes],
+    )
+    logger.info(
+        f"Solved one to one clustering in memory for {len(sorted_node_ids)} nodes"
+    )
+
+    clusters = db_api.register_table(
+        pd.DataFrame(
+            {
+                "node_id": sorted_node_ids,
+                "cluster_id": sorted_node_ids[representatives],
+            }
+        ),
+        f"__splink__df_in_memory_clusters_{ascii_uid(8)}",
+    )
+
+    pipeline = CTEPipeline([clusters])
+    sql = f"""
+    select node_id as {node_id_column_name}, cluster_id
+    from {clusters.templated_name}
+    """
+    pipeline.enqueue_sql(sql, "__splink__clustering_output_final")
+    final_result = db_api.sql_pipeline_to_splink_dataframe(pipeline)
+    clusters.drop_table_from_database_and_remove_from_cache(force_non_splink_table=True)
+
+    return final_result
+
+
 def one_to_one_clustering(
     nodes_table: SplinkDataFrame,
     edges_table: SplinkDataFrame,
@@ -21,14 +181,35 @@ def one_to_one_clustering(
     duplicate_free_datasets: List[str],
     db_api: DatabaseAPISubClass,
     threshold_match_probability: Optional[float],
+    engine: Literal["sql", "in_memory"] = "sql",
 ) -> SplinkDataFrame:
     """One to one clustering algorithm.
 
     This function clusters together records so that at most one record from each
     dataset is in each cluster.
 
+    engine is "sql" to solve in the database, or "in_memory" to solve with
+    `one_to_one_clustering_in_memory`.
     """
 
+    if engine == "in_memory":
+        return one_to_one_clustering_in_memory(
+            nodes_table=nodes_table,
+            edges_table=edges_table,
+            node_id_column_name=node_id_column_name,
+            source_dataset_column_name=source_dataset_column_name,
+            edge_id_column_name_left=edge_id_column_name_left,
+            edge_id_column_name_right=edge_id_column_name_right,
+            duplicate_free_datasets=duplicate_free_datasets,
+            db_api=db_api,
+            threshold_match_probability=threshold_match_probability,
+        )
+    if engine != "sql":
+        raise ValueError(
+            f"Unknown one to one clustering engine '{engine}'. "
+            "Use 'sql' or 'in_memory'"
+        )
+
     pipeline = CTEPipeline([edges_table])
 
     match_prob_expr = f"where match_probability >= {threshold_match_probability}"
@@ -1,36 +1,18 @@
 from __future__ import annotations
 
 import logging
-from random import randint
-from typing import TypeVar
+from concurrent.futures import ThreadPoolExecutor
 
+import numpy as np
 import pandas as pd
 
-from splink.internals.cost_of_blocking_rules import calculate_cost_of_combination_of_brs
+from splink.internals.cost_of_blocking_rules import (
+    FIELD_FREEDOM_COSTS_BY_COUNT,
+    calculate_cost_of_combination_of_brs,
+)
 
 logger = logging.getLogger(__name__)
 
-T = TypeVar("T")
-
-
-def localised_shuffle(lst: list[T], window_percent: float) -> list[T]:
-    """
-    Performs a localised shuffle on a list.
-
-    This is used to choose semi-randomly from a list of
-    sorted rows, so you tend to pick from items towards the top
-
-    Args:
-        lst (list): The list to shuffle.
-        window_percent (float): The window percent for shuffle e.g. 0.3 for shuffle
-            within 30% of orig position
-
-    Returns:
-        list: A shuffled copy of the original list.
-    """
-    window_size = max(1, int(window_percent * len(lst)))
-    return sorted(lst, key=lambda x: lst.index(x) + randint(-window_size, window_size))
-
 
 def check_field_freedom(candidate_set, field_names, min_field_freedom):
     """
@@ -54,32 +36,263 @@ def check_field_freedom(candidate_set, field_names, min_field_freedom):
     return all(count >= min_field_freedom for count in covered_fields.values())
 
 
-def heuristic_select_brs_that_have_min_freedom(data, field_names, min_field_freedom):
+def _field_freedom_cost_lookup(max_count: int) -> np.ndarray:
+    """Field freedom cost, indexed by the number of rules that let a field vary.
+
+    Matches calculate_field_freedom_cost, so the vectorised costs computed here
+    agree with calculate_cost_of_combination_of_brs
     """
-    A heuristic algorithm to select blocking rules that between them
-    ensure that each field is allowed to vary at least 'min_field_freedom' times.
+    return np.array(
+        [FIELD_FREEDOM_COSTS_BY_COUNT.get(c, 0) / 10 for c in range(max_count + 1)],
+        dtype=float,
+    )
 
-    Args:
-        data (list): The data rows.
-        field_names (list): The list of field names.
-        min_field_freedom (int): The minimum field freedom.
 
-    Returns:
-        list: The candidate set of rows.
+class _BlockingRuleSelectionProblem:
+    """Vectorised representation of the blocking rule selection problem.
+
+    Each candidate rule has an additive cost (equi joins, comparison count and
+    the per-rule cost of adding a rule) plus a contribution to the field
+    freedom of each column.  Holding this as numpy arrays means every move in
+    the neighbourhood of a solution can be costed in a single pass.
     """
-    data_sorted_randomised = localised_shuffle(data, 0.5)
-    candidate_rows = []
 
-    for row in data_sorted_randomised:
-        candidate_rows.append(row)
-        if check_field_freedom(candidate_rows, field_names, min_field_freedom):
-            break
+    def __init__(
+        self,
+        blocks_found_recs,
+        field_names,
+        min_freedom,
+        max_comparison_count,
+        num_equi_join_weight,
+        field_freedom_weight,
+        num_brs_weight,
+        num_comparison_weight,
+    ):
+        self.min_freedom = min_freedom
+        self.field_freedom_weight = field_freedom_weight
+        # varies[i, j] is 1 if rule i allows field j to vary
+        self.varies = np.array(
+            [[int(row[f] == 0) for f in field_names] for row in blocks_found_recs],
+            dtype=np.int64,
+        ).reshape(len(blocks_found_recs), len(field_names))
+        self.rule_costs = np.array(
+            [
+                num_equi_join_weight * row["num_equi_joins"]
+                + num_comparison_weight * row["comparison_count"] / max_comparison_count
+                + num_brs_weight
+                for row in blocks_found_recs
+            ],
+            dtype=float,
+        )
+        self.num_rules = len(blocks_found_recs)
+        self.lookup = _field_freedom_cost_lookup(self.num_rules)
+
+        # The branch and bound decides on rules in ascending order of cost, so
+        # the cheapest remaining rules are always a suffix of this order
+        self._order = np.argsort(self.rule_costs, kind="stable")
+        self._cumulative_costs = np.concatenate(
+            [[0.0], np.cumsum(self.rule_costs[self._order])]
+        )
+        self._remaining_varies = np.cumsum(
+            np.vstack([self.varies[self._order], np.zeros_like(self.varies[:1])])[::-1],
+            axis=0,
+        )[::-1]
+
+    def deficit(self, freedom):
+        return np.maximum(self.min_freedom - freedom, 0).sum(axis=-1)
+
+    def cost(self, selected, freedom):
+        return (
+            self.rule_costs[selected].sum()
+            + self.field_freedom_weight * self.lookup[freedom].sum()
+        )
+
+    def greedy(self, forced_rule):
+        """Weighted greedy set cover of the per-field freedom requirement.
+
+        Repeatedly adds the rule with the largest reduction in freedom deficit
+        per unit of cost, breaking ties on the (deterministic) candidate order.
+        """
+        selected = np.zeros(self.num_rules, dtype=bool)
+        selected[forced_rule] = True
+        freedom = self.varies[forced_rule].copy()
+
+        while self.deficit(freedom) > 0:
+            gain = self.deficit(freedom) - self.deficit(freedom + self.varies)
+            gain[selected] = 0
+            if gain.max() <= 0:
+                # No remaining rule helps; return best effort
+                break
+            score = gain / np.maximum(self.rule_costs, 1e-9)
+            score[gain <= 0] = -np.inf
+            best = int(np.argmax(score))
+            selected[best] = True
+            freedom = freedom + self.varies[best]
+
+        return selected
+
+    def _moves(self, selected):
+        """All add, drop, swap and two-for-one moves from the current selection.
+
+        Each move is a row (drop_1, drop_2, add) of rule indices, where an index
+        of num_rules refers to a padding 'no rule'.
+        """
+        none = self.num_rules
+        inside = np.flatnonzero(selected)
+        outside = np.append(np.flatnonzero(~selected), none)
+
+        drops = [(i, none) for i in inside] + [(none, none)]
+        drops += [(i, j) for a, i in enumerate(inside) for j in inside[a + 1 :]]
+        drops = np.array(drops, dtype=np.int64).reshape(-1, 2)
+
+        moves = np.column_stack(
+            [
+                np.repeat(drops, len(outside), axis=0),
+                np.tile(outside, len(drops)),
+            ]
+        )
+        # Exclude the null move, and two-for-two moves (drops of two, add none)
+        is_null = (moves == none).all(axis=1)
+        return moves[~is_null]
+
+    def local_search(self, selected, max_iterations=1000):
+        """Best-improvement local search over add, drop, swap and two-for-one moves.
+
+        Moves are only accepted if they keep (or make) the solution feasible,
+        so the result is a local optimum which satisfies the freedom constraint
+        whenever the greedy start did.
+        """
+        # Pad with a 'no rule' row so every move can be costed the same way
+        varies = np.vstack([self.varies, np.zeros_like(self.varies[:1])])
+        rule_costs = np.append(self.rule_costs, 0.0)
+
+        freedom = self.varies[selected].sum(axis=0)
+        current_cost = self.cost(selected, freedom)
+
+        for _ in range(max_iterations):
+            moves = self._moves(selected)
+            new_freedom = (
+                freedom
+                + varies[moves[:, 2]]
+                - varies[moves[:, 0]]
+                - varies[moves[:, 1]]
+            )
+            new_cost = (
+                current_cost
+                + rule_costs[moves[:, 2]]
+                - rule_costs[moves[:, 0]]
+                - rule_costs[moves[:, 1]]
+                + self.field_freedom_weight
+                * (self.lookup[new_freedom].sum(axis=1) - self.lookup[freedom].sum())
+            )
+            new_size = (
+                selected.sum()
+                + (moves[:, 2] < self.num_rules)
+                - (moves[:, :2] < self.num_rules).sum(axis=1)
+            )
+            new_deficit = self.deficit(new_freedom)
+            new_cost[new_size < 1] = np.inf
+
+            if self.deficit(freedom) == 0:
+                new_cost[new_deficit > 0] = np.inf
+                improving = new_cost < current_cost - 1e-9
+            else:
+                # Until feasible, prioritise reducing the deficit
+                improving = new_deficit < self.deficit(freedom)
+                new_cost = np.where(improving, new_deficit, np.inf)
+
+            if not improving.any():
+                break
+
+            drop_1, drop_2, add = moves[int(np.argmin(new_cost))]
+            selected[[r for r in (drop_1, drop_2) if r < self.num_rules]] = False
+            if add < self.num_rules:
+                selected[add] = True
+
+            freedom = self.varies[selected].sum(axis=0)
+            current_cost = self.cost(selected, freedom)
+
+        return selected
+
+    def _bound(self, depth, freedom, partial_cost, num_selected):
+        """A lower bound on the cost of any feasible completion of a partial
+        selection, which has decided on the first `depth` rules in cost order.
+
+        A completion which adds e more rules costs at least the e cheapest
+        remaining additive rule costs, and since the field freedom cost never
+        increases as a field is allowed to vary more, at least the field freedom
+        cost of every field varying in all e of the added rules.
+        """
+        if np.any(freedom + self._remaining_varies[depth] < self.min_freedom):
+            return np.inf
+
+        extra = np.arange(self.num_rules - depth + 1)
+        # Each rule lets a field vary at most once
+        min_extra = max(self.min_freedom - freedom.min(), 1 - num_selected, 0)
+        extra = extra[extra >= min_extra]
+        if len(extra) == 0:
+            return np.inf
+
+        rule_costs = (
+            self._cumulative_costs[depth + extra] - self._cumulative_costs[depth]
+        )
+        field_costs = self.lookup[freedom[None, :] + extra[:, None]].sum(axis=1)
+        return (
+            partial_cost + (rule_costs + self.field_freedom_weight * field_costs).min()
+        )
 
-    sorted_candidate_rows = sorted(
-        candidate_rows, key=lambda x: x["blocking_columns_sanitised"]
-    )
+    def lower_bound(self):
+        """A lower bound on the cost of any feasible combination of rules"""
+        return self._bound(0, np.zeros(self.varies.shape[1], dtype=np.int64), 0.0, 0)
 
-    return sorted_candidate_rows
+    def branch_and_bound(self, incumbent, max_nodes=100_000):
+        """Depth first branch and bound, seeded with the best local search result.
+
+        Returns the best selection found and whether the search completed within
+        max_nodes, in which case the selection is optimal.
+        """
+        best = incumbent.copy()
+        best_freedom = self.varies[best].sum(axis=0)
+        best_cost = (
+            self.cost(best, best_freedom) if self.deficit(best_freedom) == 0 else np.inf
+        )
+
+        stack = [(0, np.zeros(self.varies.shape[1], dtype=np.int64), 0.0, ())]
+        num_nodes = 0
+        while stack:
+            num_nodes += 1
+            if num_nodes > max_nodes:
+                return best, False
+
+            depth, freedom, partial_cost, chosen = stack.pop()
+            if chosen and self.deficit(freedom) == 0:
+                cost = partial_cost + self.field_freedom_weight * (
+                    self.lookup[freedom].sum()
+                )
+                if cost < best_cost - 1e-9:
+                    best_cost = cost
+                    best = np.zeros(self.num_rules, dtype=bool)
+                    best[list(chosen)] = True
+
+            if depth == self.num_rules:
+                continue
+            bound = self._bound(depth, freedom, partial_cost, len(chosen))
+            if bound >= best_cost - 1e-9:
+                continue
+
+            # Push the exclusion branch first so that inclusion is explored first
+            rule = self._order[depth]
+            stack.append((depth + 1, freedom, partial_cost, chosen))
+            stack.append(
+                (
+                    depth + 1,
+                    freedom + self.varies[rule],
+                    partial_cost + self.rule_costs[rule],
+                    chosen + (rule,),
+                )
+            )
+
+        return best, True
 
 
 def get_block_on_string(br_rows):
@@ -128,27 +341,43 @@ def suggest_blocking_rules(
     field_freedom_weight=1,
     num_brs_weight=10,
     num_comparison_weight=10,
+    max_workers=None,
 ):
     """Use a cost optimiser to suggest blocking rules
 
+    The optimiser is deterministic.  Each run starts from a different one of the
+    candidate rules, completes it into a combination which satisfies the field
+    freedom constraint using a weighted greedy set cover, and then improves it
+    with a local search over adding, dropping and swapping rules.  Runs are
+    evaluated in parallel.  The best result is then used to seed a bounded
+    branch and bound search which either proves it optimal or improves on it.
+
     Args:
         df_block_stats: Dataframe returned by find_blocking_rules_below_threshold
         min_freedom (int, optional): Each column should have at least this many
             opportunities to vary amongst the blocking rules. Defaults to 1.
-        num_runs (int, optional): How many random combinations of
-            rules to try.  The best will be selected. Defaults to 5.
+        num_runs (int, optional): The maximum number of starting rules from which
+            to run the optimiser.  The best result will be selected.
+            Defaults to 100.
         num_equi_join_weight (int, optional): The weight for number of equi joins.
             Defaults to 0.
         field_freedom_weight (int, optional): The weight for field freedom. Defaults to
-            10.
+            1.
         num_brs_weight (int, optional): The weight for the number of blocking rules
             found. Defaults to 10.
+        num_comparison_weight (int, optional): The weight for the number of
+            comparisons generated by the rules. Defaults to 10.
+        max_workers (int, optional): The maximum number of threads used to evaluate
+            runs in parallel.  Defaults to None, meaning the ThreadPoolExecutor
+            default.
 
     Returns:
         pd.DataFrame: A DataFrame containing the results of the blocking rules
             suggestion. It includes columns such as
             'suggested_blocking_rules_for_prediction',
-            'suggested_EM_training_statements', and various cost information
+            'suggested_EM_training_statements', various cost information,
+            and 'cost_lower_bound' and 'optimality_gap', which report how far
+            each suggestion is at most from the optimal combination
 
     """
     if len(df_block_stats) == 0:
@@ -156,19 +385,61 @@ def suggest_blocking_rules(
 
     max_comparison_count = df_block_stats["comparison_count"].max()
 
-    df_block_stats = df_block_stats.sort_values(
-        by=["num_equi_joins", "comparison_count"], ascending=[True, False]
+    df_block_stats = df_block_stats.assign(
+        __sort_key=df_block_stats["blocking_columns_sanitised"].astype(str)
+    ).sort_values(
+        by=["num_equi_joins", "comparison_count", "__sort_key"],
+        ascending=[True, False, True],
+        kind="mergesort",
+    )
+    blocks_found_recs = df_block_stats.drop(columns="__sort_key").to_dict(
+        orient="records"
     )
-    blocks_found_recs = df_block_stats.to_dict(orient="records")
 
     blocking_cols = list(blocks_found_recs[0].keys())
     blocking_cols = [c for c in blocking_cols if c.startswith("__fixed__")]
 
+    problem = _BlockingRuleSelectionProblem(
+        blocks_found_recs,
+        blocking_cols,
+        min_freedom,
+        max_comparison_count,
+        num_equi_join_weight,
+        field_freedom_weight,
+        num_brs_weight,
+        num_comparison_weight,
+    )
+
+    def run_from(start_rule):
+        return problem.local_search(problem.greedy(start_rule))
+
+    num_starts = min(num_runs, len(blocks_found_recs))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        selections = list(executor.map(run_from, range(num_starts)))
+
+    # Try to prove the best local optimum is optimal, or improve on it
+    best_selection = min(
+        selections,
+        key=lambda s: (
+            problem.deficit(problem.varies[s].sum(axis=0)),
+            problem.cost(s, problem.varies[s].sum(axis=0)),
+        ),
+    )
+    best_selection, is_optimal = problem.branch_and_bound(best_selection)
+    selections.append(best_selection)
+
+    if is_optimal:
+        freedom = problem.varies[best_selection].sum(axis=0)
+        lower_bound = problem.cost(best_selection, freedom)
+    else:
+        lower_bound = problem.lower_bound()
+
     results = []
 
-    for run in range(num_runs):
-        selected_rows = heuristic_select_brs_that_have_min_freedom(
-            blocks_found_recs, blocking_cols, min_field_freedom=min_freedom
+    for run, selected in enumerate(selections):
+        selected_rows = sorted(
+            [row for row, s in zip(blocks_found_recs, selected) if s],
+            key=lambda x: x["blocking_columns_sanitised"],
         )
 
         cost_dict = {
@@ -187,9 +458,20 @@ def suggest_blocking_rules(
             num_comparison_weight,
         )
 
+        # The proportion of the cost which may be above the optimum
+        if not check_field_freedom(selected_rows, blocking_cols, min_freedom):
+            gap = np.nan
+        elif costs["cost"] > 0:
+            gap = max(costs["cost"] - lower_bound, 0) / costs["cost"]
+            gap = 0.0 if gap < 1e-9 else gap
+        else:
+            gap = 0.0
+
         cost_dict.update(costs)
         cost_dict.update(
             {
+                "cost_lower_bound": lower_bound,
+                "optimality_gap": gap,
                 "run_num": run,
                 "minimum_freedom_for_each_column": min_freedom,
                 "suggested_blocking_rules_as_splink_brs": [
@@ -200,6 +482,12 @@ def suggest_blocking_rules(
         results.append(cost_dict)
 
     results_df = pd.DataFrame(results)
+    if results_df["optimality_gap"].isna().all():
+        logger.warning(
+            "Unable to find a combination of blocking rules in which each "
+            f"column is allowed to vary at least {min_freedom} times"
+        )
+
     # easier to read if we normalise the cost so the best is 0
     min_ = results_df["field_freedom_cost"].min()
     results_df["field_freedom_cost"] = results_df["field_freedom_cost"] - min_
@@ -209,8 +497,9 @@ def suggest_blocking_rules(
         results_df["field_freedom_cost_weighted"] - min_
     )
     results_df["cost"] = results_df["cost"] - min_
+    results_df["cost_lower_bound"] = results_df["cost_lower_bound"] - min_
 
-    min_scores_df = results_df.sort_values("cost")
+    min_scores_df = results_df.sort_values("cost", kind="mergesort")
     min_scores_df = min_scores_df.drop_duplicates(
         "suggested_blocking_rules_for_prediction"
     )
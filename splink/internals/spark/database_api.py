@@ -233,6 +233,7 @@ class SparkAPI(DatabaseAPI[spark_df]):
             r"__splink__df_representatives",
             r"__splink__df_concat_with_tf_sample",
             r"__splink__df_concat_with_tf",
+            r"__splink__df_concat_with_row_ids",
             r"__splink__df_predict",
             r"__splink__blocked_id_pairs",
             r"__splink__nodes_in_play",
@@ -284,6 +285,7 @@ class SparkAPI(DatabaseAPI[spark_df]):
             r"__splink__df_comparison_vectors",
             r"__splink__df_concat_sample",
             r"__splink__df_concat_with_tf",
+            r"__splink__df_concat_with_row_ids",
             r"__splink__df_predict",
             r"__splink__df_tf_.+",
             r"__splink__df_representatives.*",
@@ -39,7 +39,8 @@ def term_frequencies_for_single_column_sql(
     select
     {col_name}, cast(count(*) as float8) / (select
         count({col_name}) as total from {table_name})
-            as {input_column.tf_name}
+            as {input_column.tf_name},
+    count(*) as tf_count
     from {table_name}
     where {col_name} is not null
     group by {col_name}
@@ -48,6 +49,270 @@ def term_frequencies_for_single_column_sql(
     return sql
 
 
+def term_frequencies_for_multiple_columns_sqls(
+    input_columns: list[InputColumn], table_name: str = "__splink__df_concat"
+) -> list[dict[str, str]]:
+    """Compute the term frequency tables of several columns from a single scan
+    of table_name, using one grouping set per column.
+
+    Within each grouping set, every other column is null, so the rows for a
+    given column are those in which that column is not null.
+    """
+    col_names = [c.name for c in input_columns]
+    grouping_sets = ", ".join(f"({c})" for c in col_names)
+
+    sqls = [
+        {
+            "sql": f"""
+            select {", ".join(col_names)}, count(*) as tf_count
+            from {table_name}
+            group by grouping sets ({grouping_sets})
+            """,
+            "output_table_name": "__splink__df_tf_counts",
+        }
+    ]
+
+    for input_column in input_columns:
+        col_name = input_column.name
+        sql = f"""
+        select
+        {col_name}, cast(tf_count as float8) / sum(tf_count) over ()
+            as {input_column.tf_name},
+        tf_count
+        from __splink__df_tf_counts
+        where {col_name} is not null
+        """
+        sqls.append(
+            {"sql": sql, "output_table_name": colname_to_tf_tablename(input_column)}
+        )
+
+    return sqls
+
+
+def heavy_hitter_term_frequencies_sqls(
+    input_column: InputColumn,
+    term_frequencies_sql: str,
+    top_k: Optional[int] = None,
+    min_frequency: Optional[float] = None,
+) -> list[dict[str, str]]:
+    """Reduce the output of term_frequencies_sql to the frequencies of the most
+    common values, which are those among the top_k most frequent and with a
+    frequency of at least min_frequency.
+
+    All other values share a single default frequency, the mean of their exact
+    frequencies, which is stored in a row whose value is null.
+
+    Values are ranked by count, then by value, without ordering all the values
+    at once: each value is ranked among those with the same count, and offset by
+    the number of values with a greater count, found from the (small) table of
+    distinct counts.  Only values which may be among the top_k are ranked.
+    """
+    col_name = input_column.name
+    tf_name = input_column.tf_name
+    tf_tablename = colname_to_tf_tablename(input_column)
+    exact_tablename = f"{tf_tablename}_exact"
+    ranked_tablename = exact_tablename
+
+    sqls = [{"sql": term_frequencies_sql, "output_table_name": exact_tablename}]
+
+    conditions = []
+    if top_k is not None:
+        top_k = int(top_k)
+        sql = f"""
+        select
+            tf_count,
+            coalesce(
+                sum(count(*)) over (
+                    order by tf_count desc
+                    rows between unbounded preceding and 1 preceding
+                ),
+                0
+            ) as num_more_frequent
+        from {exact_tablename}
+        group by tf_count
+        """
+        sqls.append(
+            {"sql": sql, "output_table_name": f"{tf_tablename}_num_more_frequent"}
+        )
+
+        ranked_tablename = f"{tf_tablename}_ranked"
+        sql = f"""
+        select
+            e.{col_name},
+            e.{tf_name},
+            e.tf_count,
+            n.num_more_frequent
+                + row_number() over (partition by e.tf_count order by e.{col_name})
+                as tf_rank
+        from {exact_tablename} as e
+        inner join {tf_tablename}_num_more_frequent as n
+        on e.tf_count = n.tf_count
+        where n.num_more_frequent < {top_k}
+
+        union all
+
+        select
+            e.{col_name},
+            e.{tf_name},
+            e.tf_count,
+            cast(null as bigint) as tf_rank
+        from {exact_tablename} as e
+        inner join {tf_tablename}_num_more_frequent as n
+        on e.tf_count = n.tf_count
+        where n.num_more_frequent >= {top_k}
+        """
+        sqls.append({"sql": sql, "output_table_name": ranked_tablename})
+        conditions.append(f"tf_rank <= {top_k}")
+
+    if min_frequency is not None:
+        conditions.append(f"{tf_name} >= cast({min_frequency} as float8)")
+    is_heavy_hitter = " and ".join(conditions)
+    value_or_null = f"case when {is_heavy_hitter} then {col_name} end"
+
+    sql = f"""
+    select
+        {value_or_null} as {col_name},
+        avg({tf_name}) as {tf_name},
+        sum(tf_count) as tf_count
+    from {ranked_tablename}
+    group by {value_or_null}
+    """
+    sqls.append({"sql": sql, "output_table_name": tf_tablename})
+
+    return sqls
+
+
+def term_frequencies_sqls(
+    input_columns: list[InputColumn],
+    supports_grouping_sets: bool,
+    table_name: str = "__splink__df_concat",
+    top_k: Optional[int] = None,
+    min_frequency: Optional[float] = None,
+) -> list[dict[str, str]]:
+    """SQL to compute the term frequency tables of input_columns, scanning
+    table_name only once where the dialect supports grouping sets.
+
+    If top_k or min_frequency are given, the tables are approximate, holding only
+    the frequencies of the most common values and a default for all others (see
+    heavy_hitter_term_frequencies_sqls).  Each table is then built by several
+    sqls, the last of which outputs the table"""
+    if supports_grouping_sets and len(input_columns) > 1:
+        sqls = term_frequencies_for_multiple_columns_sqls(input_columns, table_name)
+    else:
+        sqls = [
+            {
+                "sql": term_frequencies_for_single_column_sql(c, table_name),
+                "output_table_name": colname_to_tf_tablename(c),
+            }
+            for c in input_columns
+        ]
+
+    if top_k is None and min_frequency is None:
+        return sqls
+
+    input_columns_by_tablename = {colname_to_tf_tablename(c): c for c in input_columns}
+    heavy_hitter_sqls = []
+    for sql_info in sqls:
+        input_column = input_columns_by_tablename.get(sql_info["output_table_name"])
+        if input_column is None:
+            heavy_hitter_sqls.append(sql_info)
+        else:
+            heavy_hitter_sqls.extend(
+                heavy_hitter_term_frequencies_sqls(
+                    input_column, sql_info["sql"], top_k, min_frequency
+                )
+            )
+    return heavy_hitter_sqls
+
+
+def update_term_frequencies_sql(
+    input_column: InputColumn,
+    tf_tablename: str,
+    records_added_tablename: Optional[str] = None,
+    records_removed_tablename: Optional[str] = None,
+) -> str:
+    """Update the raw counts (tf_count) in a term frequency table by the values of
+    records added and removed, and renormalise the frequencies.
+
+    Only the records added and removed are scanned, rather than all records.
+    Values whose count falls to zero are removed.
+    """
+    col_name = input_column.name
+
+    counts = [f"select {col_name}, tf_count from {tf_tablename}"]
+    for tablename, sign in [
+        (records_added_tablename, ""),
+        (records_removed_tablename, "-"),
+    ]:
+        if tablename is not None:
+            counts.append(
+                f"""
+                select {col_name}, {sign}count(*) as tf_count
+                from {tablename}
+                where {col_name} is not null
+                group by {col_name}
+                """
+            )
+    counts_sql = " union all ".join(counts)
+
+    return f"""
+    select
+    {col_name}, cast(tf_count as float8) / sum(tf_count) over ()
+        as {input_column.tf_name},
+    tf_count
+    from (
+        select {col_name}, sum(tf_count) as tf_count
+        from ({counts_sql}) as tf_count_changes
+        group by {col_name}
+    ) as updated_tf_counts
+    where tf_count > 0
+    """
+
+
+def _tf_approximation(tf_df: SplinkDataFrame) -> tuple[Optional[int], Optional[float]]:
+    """The (top_k, min_frequency) a term frequency table was computed with.  Tables
+    registered by the user are taken to be exact"""
+    return tf_df.metadata.get("tf_approximation", (None, None))
+
+
+def _has_default_tf(linker: Linker, tf_tablename: str) -> bool:
+    """Whether the cached term frequency table tf_tablename was computed with a
+    top_k or min_frequency, and so holds a default frequency in its null row"""
+    cache = linker._intermediate_table_cache
+    return tf_tablename in cache and _tf_approximation(cache[tf_tablename]) != (
+        None,
+        None,
+    )
+
+
+def _tf_value_sql(
+    input_column: InputColumn,
+    table_name: str,
+    tf_tablename: str,
+    has_default_tf: bool = False,
+) -> str:
+    """The term frequency of each value of input_column in table_name, looked up
+    in the left joined tf_tablename.
+
+    If has_default_tf, values missing from the term frequency table take its
+    default frequency, held in a row whose value is null (see
+    heavy_hitter_term_frequencies_sqls).  Otherwise any null row of the table, as
+    may be in a lookup registered by the user, is ignored.  Null values have no
+    term frequency.
+    """
+    col_name = input_column.name
+    tf_name = input_column.tf_name
+    tf_value = f"{tf_tablename}.{tf_name}"
+    if has_default_tf:
+        default_tf = f"(select {tf_name} from {tf_tablename} where {col_name} is null)"
+        tf_value = f"coalesce({tf_value}, {default_tf})"
+    return f"""
+    case when {table_name}.{col_name} is null then null
+    else {tf_value} end
+    as {tf_name}
+    """
+
+
 def _join_tf_to_df_concat_sql(linker: Linker) -> str:
     settings_obj = linker._settings_obj
     tf_cols = settings_obj._term_frequency_columns
@@ -56,9 +321,13 @@ def _join_tf_to_df_concat_sql(linker: Linker) -> str:
 
     for col in tf_cols:
         tbl = colname_to_tf_tablename(col)
-        select_cols.append(f"{tbl}.{col.tf_name}")
+        select_cols.append(
+            _tf_value_sql(col, "__splink__df_concat", tbl, _has_default_tf(linker, tbl))
+        )
 
-    column_names_in_df_concat = linker._concat_table_column_names
+    # __splink__df_concat_with_tf is blocked, so is built from a concatenation
+    # with row ids
+    column_names_in_df_concat = linker._concat_table_column_names + ["__splink_row_id"]
 
     aliased_concat_column_names = [
         f"__splink__df_concat.{col} AS {col}" for col in column_names_in_df_concat
@@ -119,7 +388,9 @@ def _join_new_table_to_df_concat_with_tf_sql(
     for col in tf_cols_not_already_populated:
         tbl = colname_to_tf_tablename(col)
         if tbl in cache:
-            select_cols.append(f"{tbl}.{col.tf_name}")
+            select_cols.append(
+                _tf_value_sql(col, input_tablename, tbl, _has_default_tf(linker, tbl))
+            )
 
     template = "left join {tbl} on " + input_tablename + ".{col} = {tbl}.{col}"
     template_with_alias = (
@@ -170,8 +441,8 @@ def compute_all_term_frequencies_sqls(
             }
         ]
 
-    sqls = []
     cache = linker._intermediate_table_cache
+    tf_cols_to_compute = []
     for tf_col in tf_cols:
         tf_table_name = colname_to_tf_tablename(tf_col)
 
@@ -179,9 +450,11 @@ def compute_all_term_frequencies_sqls(
             tf_table = cache.get_with_logging(tf_table_name)
             pipeline.append_input_dataframe(tf_table)
         else:
-            sql = term_frequencies_for_single_column_sql(tf_col)
-            sql_info = {"sql": sql, "output_table_name": tf_table_name}
-            sqls.append(sql_info)
+            tf_cols_to_compute.append(tf_col)
+
+    sqls = term_frequencies_sqls(
+        tf_cols_to_compute, linker._db_api.sql_dialect.supports_grouping_sets
+    )
 
     sql = _join_tf_to_df_concat_sql(linker)
     sql_info = {
@@ -194,7 +467,8 @@ def compute_all_term_frequencies_sqls(
 
 
 def comparison_level_to_tf_chart_data(cl: dict[str, Any]) -> dict[str, Any]:
-    df = cl["df_tf"]
+    # Keep the value and its frequency, dropping the raw count if there is one
+    df = cl["df_tf"].iloc[:, :2]
     df.columns = ["value", "tf"]
     df = df[df.value.notnull()]
 
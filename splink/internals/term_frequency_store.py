@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+from typing import Any, Optional
+
+import pandas as pd
+
+from splink.internals.dialects import SplinkDialect
+from splink.internals.input_column import InputColumn
+from splink.internals.splink_dataframe import SplinkDataFrame
+from splink.internals.term_frequencies import colname_to_tf_tablename
+
+logger = logging.getLogger(__name__)
+
+
+def term_frequency_fingerprints_sql(
+    input_columns: list[InputColumn],
+    unique_id_input_columns: list[InputColumn],
+    sql_dialect: SplinkDialect,
+    table_name: str = "__splink__df_concat",
+) -> str:
+    """A fingerprint of each column's values which does not depend on the order
+    of the rows: the row count, and the xor of a hash of every record's unique id
+    and value.  Hashing the unique id stops repeated values cancelling out."""
+    hash_fn = sql_dialect.hash_function_name
+    uid_names = [c.name for c in unique_id_input_columns]
+
+    fingerprints = [
+        f"bit_xor({hash_fn}({', '.join(uid_names + [c.name])})) as fingerprint_{i}"
+        for i, c in enumerate(input_columns)
+    ]
+    return f"""
+    select count(*) as row_count, {", ".join(fingerprints)}
+    from {table_name}
+    """
+
+
+class TermFrequencyStore:
+    """A directory of term frequency tables, each saved as Parquet next to a
+    fingerprint of the column it was computed from, so that they can be reused
+    by any linker with the same input data"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def _paths(self, input_column: InputColumn) -> tuple[str, str]:
+        name = colname_to_tf_tablename(input_column)
+        return (
+            os.path.join(self.directory, f"{name}.parquet"),
+            os.path.join(self.directory, f"{name}.json"),
+        )
+
+    def load(
+        self, input_column: InputColumn, fingerprint: dict[str, Any]
+    ) -> Optional[pd.DataFrame]:
+        """The stored term frequency table for the column, or None if there is
+        none, or it was computed from different data"""
+        parquet_path, fingerprint_path = self._paths(input_column)
+
+        if not os.path.exists(fingerprint_path):
+            return None
+        with open(fingerprint_path, encoding="utf-8") as f:
+            stored_fingerprint = json.load(f)
+        if stored_fingerprint != fingerprint:
+            logger.info(
+                f"Stored term frequencies for {input_column.unquote().name} "
+                "are out of date and will be recomputed"
+            )
+            return None
+
+        logger.info(
+            f"Using stored term frequencies for {input_column.unquote().name} "
+            f"from {parquet_path}"
+        )
+        return pd.read_parquet(parquet_path)
+
+    def save(
+        self,
+        input_column: InputColumn,
+        fingerprint: dict[str, Any],
+        tf_table: SplinkDataFrame,
+    ) -> None:
+        parquet_path, fingerprint_path = self._paths(input_column)
+
+        # Remove the old fingerprint first, so that an interrupted write is
+        # never mistaken for a valid table
+        if os.path.exists(fingerprint_path):
+            os.remove(fingerprint_path)
+        tf_table.to_parquet(parquet_path, overwrite=True)
+        with open(fingerprint_path, "w", encoding="utf-8") as f:
+            json.dump(fingerprint, f)
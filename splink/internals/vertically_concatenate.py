@@ -1,13 +1,21 @@
 from __future__ import annotations
 
 import logging
-from typing import TYPE_CHECKING, Dict
+from typing import TYPE_CHECKING, Any, Dict, Optional
 
+from splink.internals.dialects import SplinkDialect
 from splink.internals.input_column import InputColumn
 from splink.internals.pipeline import CTEPipeline
 from splink.internals.splink_dataframe import SplinkDataFrame
+from splink.internals.unique_id_concat import _composite_unique_id_from_nodes_sql
 
-from .term_frequencies import compute_all_term_frequencies_sqls
+from .term_frequencies import (
+    _tf_approximation,
+    colname_to_tf_tablename,
+    compute_all_term_frequencies_sqls,
+    term_frequencies_sqls,
+)
+from .term_frequency_store import term_frequency_fingerprints_sql
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +28,8 @@ def vertically_concatenate_sql(
     input_tables: Dict[str, SplinkDataFrame],
     salting_required: bool,
     source_dataset_input_column: InputColumn = None,
+    unique_id_input_column: InputColumn = None,
+    sql_dialect: SplinkDialect = None,
 ) -> str:
     """
     Using `input_tables`, create a single table with the columns and
@@ -33,6 +43,17 @@ def vertically_concatenate_sql(
     is created.  This is used to uniquely identify rows in the vertical concatenation.
     Without it, ID collisions would be possible leading to ambiguity e.g. if several
     of the input tables have the same ID.
+
+    If `unique_id_input_column` is provided, an integer `__splink_row_id` column
+    is added by `sql_dialect.row_id_sql`, increasing in the order of the
+    (composite) unique id, so that pairs are oriented as they would be by unique
+    id.  Blocked pairs are identified and joined using this column, which is much
+    cheaper than building and joining on the composite unique id string.  The row
+    id is only needed by tables which are blocked, so is otherwise left out.
+
+    Separately computed concatenations of the same input tables only share row
+    ids if `sql_dialect.row_ids_are_deterministic`.  Otherwise, all the tables
+    blocked together must be derived from a single materialised concatenation.
     """
 
     # Use column order from first table in dict
@@ -79,9 +100,29 @@ def vertically_concatenate_sql(
             from {df_obj.physical_name}
             """
 
+    if unique_id_input_column:
+        if source_dataset_input_column:
+            uid_cols = [source_dataset_input_column, unique_id_input_column]
+        else:
+            uid_cols = [unique_id_input_column]
+        sql = sql_dialect.row_id_sql(sql, _composite_unique_id_from_nodes_sql(uid_cols))
+
     return sql
 
 
+def _df_concat_with_tf_has_row_id(linker: Linker) -> bool:
+    """Whether __splink__df_concat_with_tf has the `__splink_row_id` column.
+
+    This is always the case when Splink computes the table, but may not be if the
+    user has registered their own using `register_table_input_nodes_concat_with_tf`
+    """
+    cache = linker._intermediate_table_cache
+    if "__splink__df_concat_with_tf" not in cache:
+        return True
+    df = cache["__splink__df_concat_with_tf"]
+    return "__splink_row_id" in [c.unquote().name for c in df.columns]
+
+
 def enqueue_df_concat_with_tf(linker: Linker, pipeline: CTEPipeline) -> CTEPipeline:
     cache = linker._intermediate_table_cache
     if "__splink__df_concat_with_tf" in cache:
@@ -89,12 +130,18 @@ def enqueue_df_concat_with_tf(linker: Linker, pipeline: CTEPipeline) -> CTEPipel
         pipeline.append_input_dataframe(nodes_with_tf)
         return pipeline
 
+    if linker._term_frequency_store is not None:
+        _compute_missing_term_frequency_tables(linker)
+
     sds_ic = linker._settings_obj.column_info_settings.source_dataset_input_column
+    uid_ic = linker._settings_obj.column_info_settings.unique_id_input_column
 
     sql = vertically_concatenate_sql(
         input_tables=linker._input_tables_dict,
         salting_required=linker._settings_obj.salting_required,
         source_dataset_input_column=sds_ic,
+        unique_id_input_column=uid_ic,
+        sql_dialect=linker._sql_dialect,
     )
     pipeline.enqueue_sql(sql, "__splink__df_concat")
 
@@ -111,12 +158,18 @@ def compute_df_concat_with_tf(linker: Linker, pipeline: CTEPipeline) -> SplinkDa
     if "__splink__df_concat_with_tf" in cache:
         return cache.get_with_logging("__splink__df_concat_with_tf")
 
+    if linker._term_frequency_store is not None:
+        _compute_missing_term_frequency_tables(linker)
+
     sds_ic = linker._settings_obj.column_info_settings.source_dataset_input_column
+    uid_ic = linker._settings_obj.column_info_settings.unique_id_input_column
 
     sql = vertically_concatenate_sql(
         input_tables=linker._input_tables_dict,
         salting_required=linker._settings_obj.salting_required,
         source_dataset_input_column=sds_ic,
+        unique_id_input_column=uid_ic,
+        sql_dialect=linker._sql_dialect,
     )
     pipeline.enqueue_sql(sql, "__splink__df_concat")
 
@@ -128,7 +181,161 @@ def compute_df_concat_with_tf(linker: Linker, pipeline: CTEPipeline) -> SplinkDa
     return nodes_with_tf
 
 
-def enqueue_df_concat(linker: Linker, pipeline: CTEPipeline) -> CTEPipeline:
+def _compute_missing_term_frequency_tables(linker: Linker) -> None:
+    """Compute the term frequency tables of the settings that are not in the
+    cache, leaving any that are, including approximate tables, as they are"""
+    cache = linker._intermediate_table_cache
+    input_columns = [
+        c
+        for c in linker._settings_obj._term_frequency_columns
+        if colname_to_tf_tablename(c) not in cache
+    ]
+    if input_columns:
+        compute_term_frequency_tables(linker, input_columns)
+
+
+def _load_term_frequency_tables_from_store(
+    linker: Linker,
+    input_columns: list[InputColumn],
+    top_k: Optional[int] = None,
+    min_frequency: Optional[float] = None,
+) -> tuple[list[InputColumn], dict[str, dict[str, Any]]]:
+    """Register the tables in the linker's term frequency store whose fingerprint
+    matches the input data.  Returns the columns which still need computing, with
+    the fingerprints to save their tables under"""
+    store = linker._term_frequency_store
+    db_api = linker._db_api
+
+    pipeline = CTEPipeline()
+    pipeline = enqueue_df_concat(linker, pipeline)
+    sql = term_frequency_fingerprints_sql(
+        input_columns,
+        linker._settings_obj.column_info_settings.unique_id_input_columns,
+        db_api.sql_dialect,
+    )
+    pipeline.enqueue_sql(sql, "__splink__df_tf_fingerprints")
+    fingerprints_df = db_api.sql_pipeline_to_splink_dataframe(pipeline)
+    record = fingerprints_df.as_record_dict()[0]
+    fingerprints_df.drop_table_from_database_and_remove_from_cache()
+
+    input_columns_to_compute = []
+    fingerprints = {}
+    for i, input_column in enumerate(input_columns):
+        col_name = input_column.unquote().name
+        fingerprint = {
+            "column": col_name,
+            "row_count": int(record["row_count"]),
+            "fingerprint": int(record[f"fingerprint_{i}"]),
+            "top_k": top_k,
+            "min_frequency": min_frequency,
+        }
+        tf_table = store.load(input_column, fingerprint)
+        if tf_table is not None:
+            tf_df = linker.table_management.register_term_frequency_lookup(
+                tf_table, col_name, overwrite=True
+            )
+            tf_df.metadata["tf_approximation"] = (top_k, min_frequency)
+        else:
+            input_columns_to_compute.append(input_column)
+            fingerprints[colname_to_tf_tablename(input_column)] = fingerprint
+
+    return input_columns_to_compute, fingerprints
+
+
+def compute_term_frequency_tables(
+    linker: Linker,
+    input_columns: list[InputColumn],
+    top_k: Optional[int] = None,
+    min_frequency: Optional[float] = None,
+) -> list[SplinkDataFrame]:
+    """Materialise the term frequency tables of input_columns and add them to the
+    cache, counting all the columns in a single scan where the dialect supports
+    grouping sets.  If the linker has a term frequency store, tables are loaded
+    from it where possible, and any that are computed are saved to it.
+
+    If top_k or min_frequency are given, the tables hold exact frequencies only for
+    the most common values, and a default frequency for all others.  A cached
+    table is only reused if it was computed with the same top_k and
+    min_frequency, otherwise it is recomputed and replaced."""
+    cache = linker._intermediate_table_cache
+    db_api = linker._db_api
+    approximation = (top_k, min_frequency)
+
+    tf_dfs = {}
+    input_cols_to_compute = {}
+    for input_col in input_columns:
+        tf_tablename = colname_to_tf_tablename(input_col)
+        if tf_tablename in cache:
+            if _tf_approximation(cache[tf_tablename]) == approximation:
+                tf_dfs[tf_tablename] = cache.get_with_logging(tf_tablename)
+                continue
+            cache.pop(tf_tablename)
+            # The term frequencies joined onto the input data are now out of date
+            cache.pop("__splink__df_concat_with_tf", None)
+        input_cols_to_compute[tf_tablename] = input_col
+
+    fingerprints = {}
+    if input_cols_to_compute and linker._term_frequency_store is not None:
+        remaining_cols, fingerprints = _load_term_frequency_tables_from_store(
+            linker, list(input_cols_to_compute.values()), top_k, min_frequency
+        )
+        for tf_tablename in set(input_cols_to_compute) - set(fingerprints):
+            tf_dfs[tf_tablename] = cache.get_with_logging(tf_tablename)
+        input_cols_to_compute = {colname_to_tf_tablename(c): c for c in remaining_cols}
+
+    sqls = term_frequencies_sqls(
+        list(input_cols_to_compute.values()),
+        db_api.sql_dialect.supports_grouping_sets,
+        top_k=top_k,
+        min_frequency=min_frequency,
+    )
+
+    pipeline = CTEPipeline()
+    pipeline = enqueue_df_concat(linker, pipeline)
+    input_dataframes = []
+    if sqls and sqls[0]["output_table_name"] == "__splink__df_tf_counts":
+        # Materialise the counts of all columns once, then split them
+        # into the per-column tables
+        pipeline.enqueue_sql(**sqls.pop(0))
+        tf_counts = db_api.sql_pipeline_to_splink_dataframe(pipeline)
+        input_dataframes = [tf_counts]
+        pipeline = CTEPipeline(input_dataframes)
+
+    for sql_info in sqls:
+        pipeline.enqueue_sql(**sql_info)
+        tf_tablename = sql_info["output_table_name"]
+        if tf_tablename not in input_cols_to_compute:
+            # An intermediate step of an approximate table
+            continue
+
+        tf_df = db_api.sql_pipeline_to_splink_dataframe(pipeline)
+        tf_df.metadata["tf_approximation"] = approximation
+        cache[tf_tablename] = tf_df
+        tf_dfs[tf_tablename] = tf_df
+
+        if not input_dataframes:
+            pipeline = CTEPipeline()
+            pipeline = enqueue_df_concat(linker, pipeline)
+        else:
+            pipeline = CTEPipeline(input_dataframes)
+
+        if tf_tablename in fingerprints:
+            linker._term_frequency_store.save(
+                input_cols_to_compute[tf_tablename], fingerprints[tf_tablename], tf_df
+            )
+
+    for df in input_dataframes:
+        df.drop_table_from_database_and_remove_from_cache()
+
+    return [tf_dfs[colname_to_tf_tablename(c)] for c in input_columns]
+
+
+def enqueue_df_concat(
+    linker: Linker, pipeline: CTEPipeline, row_id: bool = False
+) -> CTEPipeline:
+    """Enqueue __splink__df_concat, or the cached table if there is one.  If
+    `row_id` is True and the table is computed, it includes `__splink_row_id`,
+    for blocking the table"""
     cache = linker._intermediate_table_cache
 
     if "__splink__df_concat" in cache:
@@ -145,11 +352,14 @@ def enqueue_df_concat(linker: Linker, pipeline: CTEPipeline) -> CTEPipeline:
         return pipeline
 
     sds_ic = linker._settings_obj.column_info_settings.source_dataset_input_column
+    uid_ic = linker._settings_obj.column_info_settings.unique_id_input_column
 
     sql = vertically_concatenate_sql(
         input_tables=linker._input_tables_dict,
         salting_required=linker._settings_obj.salting_required,
         source_dataset_input_column=sds_ic,
+        unique_id_input_column=uid_ic if row_id else None,
+        sql_dialect=linker._sql_dialect,
     )
     pipeline.enqueue_sql(sql, "__splink__df_concat")
 
@@ -181,18 +391,26 @@ def compute_df_concat(linker: Linker, pipeline: CTEPipeline) -> SplinkDataFrame:
     return nodes_with_tf
 
 
-def concat_table_column_names(linker: Linker) -> list[str]:
+def concat_table_column_names(linker: Linker, row_id: bool = False) -> list[str]:
     """
     Returns list of column names of the table __splink__df_concat,
-    without needing to instantiate the table.
+    without needing to instantiate the table.  `row_id` should be True if the
+    table was computed with `__splink_row_id`.
     """
-    source_dataset_input_column = (
-        linker._settings_obj.column_info_settings.source_dataset_input_column
+    return _concat_table_column_names(
+        linker._input_tables_dict,
+        salting_required=linker._settings_obj.salting_required,
+        source_dataset_input_column=linker._settings_obj.column_info_settings.source_dataset_input_column,
+        row_id=row_id,
     )
 
-    input_tables = linker._input_tables_dict
-    salting_required = linker._settings_obj.salting_required
 
+def _concat_table_column_names(
+    input_tables: Dict[str, SplinkDataFrame],
+    salting_required: bool,
+    source_dataset_input_column: Optional[InputColumn],
+    row_id: bool = False,
+) -> list[str]:
     df_obj = next(iter(input_tables.values()))
     columns = df_obj.columns_escaped
     if salting_required:
@@ -207,6 +425,8 @@ def concat_table_column_names(linker: Linker) -> list[str]:
             )
         if not source_dataset_column_already_exists:
             columns.append("source_dataset")
+    if row_id:
+        columns.append("__splink_row_id")
     return columns
 
 
@@ -25,7 +25,7 @@ def nodes_and_edges_from_graph(G):
     return nodes, edges
 
 
-def run_cc_implementation(nodes, edges):
+def run_cc_implementation(nodes, edges, engine="sql"):
     # finally, run our connected components algorithm
     db_api = DuckDBAPI()
     cc = cluster_pairwise_predictions_at_threshold(
@@ -36,6 +36,7 @@ def run_cc_implementation(nodes, edges):
         edge_id_column_name_left="unique_id_l",
         edge_id_column_name_right="unique_id_r",
         threshold_match_probability=None,
+        engine=engine,
     ).as_pandas_dataframe()
 
     cc = cc.rename(columns={"unique_id": "node_id", "cluster_id": "representative"})
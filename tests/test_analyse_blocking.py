@@ -2,6 +2,8 @@ import duckdb
 import pandas as pd
 
 import splink.blocking_rule_library as brl
+import splink.comparison_library as cl
+from splink import Linker, SettingsCreator
 from splink.blocking_analysis import (
     count_comparisons_from_blocking_rule,
     cumulative_comparisons_to_be_scored_from_blocking_rules_chart,
@@ -11,6 +13,9 @@ from splink.blocking_analysis import (
 from splink.internals.blocking import BlockingRule
 from splink.internals.blocking_rule_library import CustomRule, Or, block_on
 from splink.internals.duckdb.database_api import DuckDBAPI
+from splink.internals.find_brs_with_comparison_counts_below_threshold import (
+    find_blocking_rules_below_threshold_comparison_count,
+)
 
 from .decorator import mark_with_dialects_excluding, mark_with_dialects_including
 
@@ -601,6 +606,95 @@ def test_analyse_blocking_fast_methodology_edge_cases():
         )
 
 
+@mark_with_dialects_including("duckdb")
+def test_analyse_blocking_estimate_from_sample():
+    df = pd.read_csv("./tests/datasets/fake_1000_from_splink_demos.csv")
+    df_l = df.iloc[::2].copy()
+    df_r = df.iloc[1::2].copy()
+
+    db_api = DuckDBAPI()
+
+    for table_or_tables, link_type in [
+        (df, "dedupe_only"),
+        ([df_l, df_r], "link_only"),
+        ([df_l, df_r], "link_and_dedupe"),
+    ]:
+        args = {
+            "table_or_tables": table_or_tables,
+            "blocking_rule": block_on("first_name"),
+            "link_type": link_type,
+            "db_api": db_api,
+        }
+        exact = count_comparisons_from_blocking_rule(**args)
+        exact_count = exact["number_of_comparisons_generated_pre_filter_conditions"]
+
+        # Sampling everything recovers the exact count
+        res = count_comparisons_from_blocking_rule(**args, sample_proportion=1.0)
+        assert (
+            res["number_of_comparisons_generated_pre_filter_conditions"] == exact_count
+        )
+        assert res["pre_filter_count_standard_error"] == 0
+
+        res = count_comparisons_from_blocking_rule(
+            **args, sample_proportion=0.5, seed=1
+        )
+        assert (
+            res["number_of_comparisons_to_be_scored_post_filter_conditions"]
+            == "not computed"
+        )
+        # generous bounds so that the test is not flaky
+        se = res["pre_filter_count_standard_error"]
+        estimate = res["number_of_comparisons_generated_pre_filter_conditions"]
+        assert se > 0
+        assert abs(estimate - exact_count) < 4 * se
+        assert (
+            res["pre_filter_count_95pc_lower_bound"]
+            <= estimate
+            <= res["pre_filter_count_95pc_upper_bound"]
+        )
+
+
+@mark_with_dialects_including("duckdb")
+def test_analyse_blocking_estimate_from_sample_asymmetric_rule():
+    df = pd.read_csv("./tests/datasets/fake_1000_from_splink_demos.csv")
+    df_l = df.iloc[::2].copy()
+    df_r = df.iloc[1::2].copy()
+
+    db_api = DuckDBAPI()
+
+    for table_or_tables, link_type in [
+        (df, "dedupe_only"),
+        ([df_l, df_r], "link_and_dedupe"),
+    ]:
+        for blocking_rule in [
+            "l.first_name = r.surname",
+            "l.first_name = r.surname and l.city = r.city",
+        ]:
+            args = {
+                "table_or_tables": table_or_tables,
+                "blocking_rule": blocking_rule,
+                "link_type": link_type,
+                "db_api": db_api,
+            }
+            exact = count_comparisons_from_blocking_rule(**args)
+            exact_count = exact["number_of_comparisons_generated_pre_filter_conditions"]
+
+            res = count_comparisons_from_blocking_rule(**args, sample_proportion=1.0)
+            assert (
+                res["number_of_comparisons_generated_pre_filter_conditions"]
+                == exact_count
+            )
+            assert res["pre_filter_count_standard_error"] == 0
+
+            res = count_comparisons_from_blocking_rule(
+                **args, sample_proportion=0.5, seed=1
+            )
+            se = res["pre_filter_count_standard_error"]
+            estimate = res["number_of_comparisons_generated_pre_filter_conditions"]
+            assert se > 0
+            assert abs(estimate - exact_count) < 4 * se
+
+
 def test_blocking_rule_accepts_different_dialects():
     br = "l.first_name = r.first_name"
     br = BlockingRule(br, sql_dialect_str="spark")
@@ -901,3 +995,137 @@ def test_blocking_rule_parentheses_equivalence():
     for result in [result_brl, result_with_parens, result_without_parens]:
         assert result["number_of_comparisons_generated_pre_filter_conditions"] == 6
         assert result["number_of_comparisons_to_be_scored_post_filter_conditions"] == 1
+
+
+@mark_with_dialects_excluding()
+def test_find_blocking_rules_below_threshold_counts(test_helpers, dialect):
+    helper = test_helpers[dialect]
+
+    df = pd.read_csv("./tests/datasets/fake_1000_from_splink_demos.csv")
+    df_l = helper.convert_frame(df.iloc[::2].copy())
+    df_r = helper.convert_frame(df.iloc[1::2].copy())
+
+    columns = ["first_name", "surname", "dob", "city", "substr(email, 1, 3)"]
+    settings = SettingsCreator(
+        link_type="dedupe_only",
+        comparisons=[cl.ExactMatch(c) for c in ["first_name", "surname", "dob"]],
+    )
+
+    for table_or_tables, link_type in [
+        (helper.convert_frame(df), "dedupe_only"),
+        ([df_l, df_r], "link_only"),
+        ([df_l, df_r], "link_and_dedupe"),
+    ]:
+        db_api = helper.DatabaseAPI(**helper.db_api_args())
+        settings.link_type = link_type
+        linker = Linker(table_or_tables, settings, db_api)
+
+        results = find_blocking_rules_below_threshold_comparison_count(
+            linker, 2_000, columns
+        )
+        assert len(results) > 0
+
+        # Each level of the search is counted in one go, which should agree
+        # with counting each blocking rule individually
+        for br, count in zip(
+            results["splink_blocking_rule"], results["comparison_count"]
+        ):
+            expected = count_comparisons_from_blocking_rule(
+                table_or_tables=table_or_tables,
+                blocking_rule=br.blocking_rule_sql,
+                link_type=link_type,
+                db_api=db_api,
+            )["number_of_comparisons_generated_pre_filter_conditions"]
+            assert count == expected
+            assert count <= 2_000
+
+
+@mark_with_dialects_excluding()
+def test_find_blocking_rules_below_threshold_depth_first_order(test_helpers, dialect):
+    helper = test_helpers[dialect]
+
+    df = pd.read_csv("./tests/datasets/fake_1000_from_splink_demos.csv")
+    columns = ["first_name", "surname", "dob", "city", "substr(email, 1, 3)"]
+    settings = SettingsCreator(
+        link_type="dedupe_only",
+        comparisons=[cl.ExactMatch(c) for c in ["first_name", "surname", "dob"]],
+    )
+    db_api = helper.DatabaseAPI(**helper.db_api_args())
+    linker = Linker(helper.convert_frame(df), settings, db_api)
+
+    results = find_blocking_rules_below_threshold_comparison_count(
+        linker, 5_000, columns
+    )
+    # Rules are in the order of a depth first search of the combinations of
+    # columns, which is the order of the positions of their columns
+    sanitised = [c.replace("(", "").replace(")", "") for c in columns]
+    sanitised = [c.replace(",", "").replace(" ", "") for c in sanitised]
+    positions = [
+        tuple(sanitised.index(c) for c in cols)
+        for cols in results["blocking_columns_sanitised"]
+    ]
+    assert len(positions) > 3
+    assert positions == sorted(positions)
+
+    # and max_results keeps the first of them
+    first_results = find_blocking_rules_below_threshold_comparison_count(
+        linker, 5_000, columns, max_results=3
+    )
+    assert list(first_results["blocking_columns_sanitised"]) == list(
+        results["blocking_columns_sanitised"][:3]
+    )
+
+
+@mark_with_dialects_excluding()
+def test_cumulative_comparisons_estimated_from_key_frequencies(test_helpers, dialect):
+    helper = test_helpers[dialect]
+
+    df = pd.read_csv("./tests/datasets/fake_1000_from_splink_demos.csv")
+    df_1 = helper.convert_frame(df.iloc[::2].copy())
+    df_2 = helper.convert_frame(df.iloc[1::2].copy())
+    df_3 = helper.convert_frame(df.iloc[::3].copy())
+
+    blocking_rules = [
+        block_on("first_name"),
+        block_on("surname", "dob"),
+        "1=1 and l.city = r.city",
+        block_on("substr(email, 1, 3)", "first_name"),
+        block_on("dob"),
+    ]
+
+    for table_or_tables, link_type in [
+        (helper.convert_frame(df), "dedupe_only"),
+        ([df_1, df_2], "link_only"),
+        ([df_1, df_2, df_3], "link_only"),
+        ([df_1, df_2, df_3], "link_and_dedupe"),
+    ]:
+        args = {
+            "table_or_tables": table_or_tables,
+            "link_type": link_type,
+            "db_api": helper.DatabaseAPI(**helper.db_api_args()),
+        }
+        exact = cumulative_comparisons_to_be_scored_from_blocking_rules_data(
+            blocking_rules=blocking_rules, **args
+        )
+        estimate = cumulative_comparisons_to_be_scored_from_blocking_rules_data(
+            blocking_rules=blocking_rules,
+            estimate_from_key_frequencies=True,
+            **args,
+        )
+        # Without filter conditions, the estimate is exact
+        pd.testing.assert_frame_equal(exact, estimate)
+
+        # Filter conditions are ignored, giving upper bounds on the cumulative counts
+        rules_with_filter = blocking_rules + [
+            "l.first_name = r.first_name and l.city < r.city",
+            "l.surname = r.surname and l.dob <> r.dob",
+        ]
+        exact = cumulative_comparisons_to_be_scored_from_blocking_rules_data(
+            blocking_rules=rules_with_filter, **args
+        )
+        estimate = cumulative_comparisons_to_be_scored_from_blocking_rules_data(
+            blocking_rules=rules_with_filter,
+            estimate_from_key_frequencies=True,
+            **args,
+        )
+        assert (estimate["cumulative_rows"] >= exact["cumulative_rows"]).all()
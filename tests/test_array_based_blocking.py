@@ -3,6 +3,7 @@ import random
 import pandas as pd
 
 import splink.internals.comparison_library as cl
+from splink import block_on
 from tests.decorator import mark_with_dialects_including
 
 
@@ -256,3 +257,101 @@ def test_link_only_unique_id_ambiguity(test_helpers, dialect):
 
     all_tuples = rule1_tuples.union(rule2_tuples)
     assert actual_triples == all_tuples
+
+
+@mark_with_dialects_including("duckdb", pass_dialect=True)
+def test_max_array_element_frequency_and_shared_unnested_table(test_helpers, dialect):
+    helper = test_helpers[dialect]
+    # "common" appears in every record's tokens, so would pair every record
+    df = pd.DataFrame(
+        [
+            {"unique_id": 1, "first_name": "a", "tokens": ["x", "common"]},
+            {"unique_id": 2, "first_name": "a", "tokens": ["x", "common"]},
+            {"unique_id": 3, "first_name": "b", "tokens": ["y", "common"]},
+            {"unique_id": 4, "first_name": "b", "tokens": ["y", "z", "common"]},
+            {"unique_id": 5, "first_name": "c", "tokens": ["z", "common"]},
+        ]
+    )
+    settings = {
+        "link_type": "dedupe_only",
+        "blocking_rules_to_generate_predictions": [
+            block_on(
+                "tokens",
+                "first_name",
+                arrays_to_explode=["tokens"],
+                max_array_element_frequency=4,
+            ),
+            block_on(
+                "tokens", arrays_to_explode=["tokens"], max_array_element_frequency=4
+            ),
+        ],
+        "comparisons": [cl.ExactMatch("first_name")],
+    }
+
+    linker = helper.Linker(df, settings, **helper.extra_linker_args())
+
+    def predicted_pairs():
+        df_predict = linker.inference.predict().as_pandas_dataframe()
+        return set(
+            zip(df_predict.unique_id_l, df_predict.unique_id_r, df_predict.match_key)
+        )
+
+    expected = {(1, 2, "0"), (3, 4, "0"), (4, 5, "1")}
+    assert predicted_pairs() == expected
+
+    cache = linker._intermediate_table_cache
+    unnested_tables = [
+        t for t in cache.values() if t.templated_name == "__splink__df_concat_unnested"
+    ]
+    # Both rules explode the same array, so share one slim unnested table
+    assert len(unnested_tables) == 1
+    unnested_colnames = {c.unquote().name for c in unnested_tables[0].columns}
+    assert unnested_colnames == {"__splink_row_id", "tokens", "first_name"}
+
+    # ...which is reused by later calls
+    executed_before = len(cache.executed_queries)
+    assert predicted_pairs() == expected
+    assert not any(
+        t.templated_name == "__splink__df_concat_unnested"
+        for t in cache.executed_queries[executed_before:]
+    )
+
+
+@mark_with_dialects_including("duckdb", "spark", pass_dialect=True)
+def test_exploded_pairs_match_unique_id_pairs(test_helpers, dialect):
+    # The exploded pairs are joined to the input data by row id, so must use the
+    # same row ids as it, however the input data is partitioned
+    helper = test_helpers[dialect]
+    input_data_l, input_data_r = generate_array_based_datasets_helper(
+        n_rows=200, n_array_based_columns=1, n_distinct_values=100
+    )
+    input_data = pd.concat(
+        [
+            input_data_l.assign(unique_id=[f"{c}-0" for c in input_data_l.cluster]),
+            input_data_r.assign(unique_id=[f"{c}-1" for c in input_data_r.cluster]),
+        ]
+    )
+    settings = {
+        "link_type": "dedupe_only",
+        "blocking_rules_to_generate_predictions": [
+            {
+                "blocking_rule": "l.array_column_0 = r.array_column_0",
+                "arrays_to_explode": ["array_column_0"],
+            },
+        ],
+        "comparisons": [cl.ArrayIntersectAtSizes("array_column_0", [1])],
+    }
+    df = helper.convert_frame(input_data)
+    if dialect == "spark":
+        df = df.repartition(4)
+    linker = helper.Linker(df, settings, **helper.extra_linker_args())
+    df_predict = linker.inference.predict().as_pandas_dataframe()
+
+    # Pairs are oriented by unique id
+    exploded = input_data[["unique_id", "array_column_0"]].explode("array_column_0")
+    expected = exploded.merge(exploded, on="array_column_0", suffixes=("_l", "_r"))
+    expected = expected[expected.unique_id_l < expected.unique_id_r]
+    expected_pairs = set(zip(expected.unique_id_l, expected.unique_id_r))
+
+    assert len(df_predict) == len(expected_pairs)
+    assert set(zip(df_predict.unique_id_l, df_predict.unique_id_r)) == expected_pairs
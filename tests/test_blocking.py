@@ -1,11 +1,31 @@
-from splink.internals.blocking import BlockingRule, blocking_rule_to_obj
-from splink.internals.blocking_rule_library import block_on
+import pandas as pd
+
+import splink.internals.comparison_library as cl
+from splink import DuckDBAPI
+from splink.internals.blocking import (
+    BlockingRule,
+    _pair_deduplication_strategy,
+    blocking_rule_to_obj,
+)
+from splink.internals.blocking_rule_library import (
+    BandRule,
+    CustomRule,
+    MinHashLSHRule,
+    SortedNeighbourhoodRule,
+    TokenRule,
+    block_on,
+)
 from splink.internals.input_column import _get_dialect_quotes
 from splink.internals.linker import Linker
+from splink.internals.pipeline import CTEPipeline
 from splink.internals.settings_creator import SettingsCreator
+from splink.internals.vertically_concatenate import (
+    compute_df_concat,
+    compute_df_concat_with_tf,
+)
 
 from .basic_settings import get_settings_dict
-from .decorator import mark_with_dialects_excluding
+from .decorator import mark_with_dialects_excluding, mark_with_dialects_including
 
 
 @mark_with_dialects_excluding()
@@ -73,3 +93,335 @@ def test_simple_end_to_end(test_helpers, dialect):
     linker.training.estimate_parameters_using_expectation_maximisation(block_on("dob"))
 
     linker.inference.predict()
+
+
+@mark_with_dialects_including("duckdb")
+def test_sorted_neighbourhood_blocking():
+    df = pd.read_csv("./tests/datasets/fake_1000_from_splink_demos.csv")
+    window_size = 4
+
+    settings = get_settings_dict()
+    settings["blocking_rules_to_generate_predictions"] = [
+        block_on("dob"),
+        SortedNeighbourhoodRule("surname", window_size=window_size),
+        block_on("first_name"),
+    ]
+    linker = Linker(df, settings, DuckDBAPI())
+    df_predict = linker.inference.predict().as_pandas_dataframe()
+    found = {
+        (id_l, id_r): mk
+        for id_l, id_r, mk in zip(
+            df_predict["unique_id_l"],
+            df_predict["unique_id_r"],
+            df_predict["match_key"],
+        )
+    }
+    assert len(found) == len(df_predict)
+
+    def pairs_matching(col):
+        df_nn = df[df[col].notnull()]
+        m = df_nn.merge(df_nn, on=col)
+        m = m[m["unique_id_x"] < m["unique_id_y"]]
+        return set(zip(m["unique_id_x"], m["unique_id_y"]))
+
+    sorted_ids = list(
+        df[df["surname"].notnull()].sort_values(["surname", "unique_id"])["unique_id"]
+    )
+    sn_pairs = {
+        (min(a, b), max(a, b))
+        for i, a in enumerate(sorted_ids)
+        for b in sorted_ids[i + 1 : i + window_size]
+    }
+
+    expected = {}
+    for mk, pairs in enumerate(
+        [pairs_matching("dob"), sn_pairs, pairs_matching("first_name")]
+    ):
+        for pair in pairs:
+            expected.setdefault(pair, str(mk))
+
+    assert found == expected
+
+
+@mark_with_dialects_including("duckdb")
+def test_minhash_lsh_blocking():
+    df = pd.read_csv("./tests/datasets/fake_1000_from_splink_demos.csv")
+
+    settings = get_settings_dict()
+    settings["blocking_rules_to_generate_predictions"] = [
+        block_on("dob"),
+        MinHashLSHRule("surname", num_bands=10, rows_per_band=2),
+    ]
+    linker = Linker(df, settings, DuckDBAPI())
+    df_predict = linker.inference.predict().as_pandas_dataframe()
+    assert not df_predict.duplicated(["unique_id_l", "unique_id_r"]).any()
+
+    def shingles(s):
+        return {s[i : i + 3] for i in range(max(len(s) - 2, 1))}
+
+    # Identical surnames always share every band
+    df_nn = df[df["surname"].notnull()]
+    m = df_nn.merge(df_nn, on="surname")
+    m = m[m["unique_id_x"] < m["unique_id_y"]]
+    found = set(zip(df_predict["unique_id_l"], df_predict["unique_id_r"]))
+    assert set(zip(m["unique_id_x"], m["unique_id_y"])) <= found
+
+    # Pairs from the LSH rule must be new, and share at least one shingle
+    lsh = df_predict[df_predict["match_key"] == "1"]
+    assert len(lsh) > 0
+    assert (lsh["dob_l"] != lsh["dob_r"]).all()
+    for surname_l, surname_r in zip(lsh["surname_l"], lsh["surname_r"]):
+        assert shingles(surname_l) & shingles(surname_r)
+
+
+@mark_with_dialects_including("duckdb")
+def test_blocking_on_integer_row_ids():
+    df = pd.read_csv("./tests/datasets/fake_1000_from_splink_demos.csv")
+    df_l = df.iloc[:600].copy()
+    df_r = df.iloc[400:].copy()
+
+    settings = get_settings_dict()
+    settings["link_type"] = "link_and_dedupe"
+    settings["blocking_rules_to_generate_predictions"] = [
+        block_on("dob"),
+        block_on("first_name", salting_partitions=3),
+    ]
+
+    linker = Linker([df_l, df_r], settings, DuckDBAPI())
+    df_concat_with_tf = compute_df_concat_with_tf(
+        linker, CTEPipeline()
+    ).as_pandas_dataframe()
+    row_ids = df_concat_with_tf["__splink_row_id"]
+    assert row_ids.is_unique
+    assert sorted(row_ids) == list(range(1, len(df_concat_with_tf) + 1))
+
+    # Only tables which are blocked have row ids
+    df_concat = compute_df_concat(
+        Linker([df_l, df_r], settings, DuckDBAPI()), CTEPipeline()
+    )
+    assert "__splink_row_id" not in [c.unquote().name for c in df_concat.columns]
+    assert "__splink_row_id" not in linker._concat_table_column_names
+
+    cols = ["source_dataset_l", "unique_id_l", "source_dataset_r", "unique_id_r"]
+    with_row_id = linker.inference.predict().as_pandas_dataframe()
+
+    # A registered table without row ids falls back to joining on composite ids
+    linker_composite = Linker([df_l, df_r], settings, DuckDBAPI())
+    linker_composite.table_management.register_table_input_nodes_concat_with_tf(
+        df_concat_with_tf.drop(columns=["__splink_row_id"])
+    )
+    with_composite_id = linker_composite.inference.predict().as_pandas_dataframe()
+
+    assert len(with_row_id) == len(with_composite_id)
+    pd.testing.assert_frame_equal(
+        with_row_id.sort_values(cols).reset_index(drop=True),
+        with_composite_id.sort_values(cols).reset_index(drop=True),
+    )
+
+
+@mark_with_dialects_including("duckdb")
+def test_pair_deduplication_by_aggregation():
+    df = pd.read_csv("./tests/datasets/fake_1000_from_splink_demos.csv")
+    df["first_name_2"] = df["first_name"].str[:2]
+    df["surname_2"] = df["surname"].str[:2]
+    df["dob_year"] = df["dob"].str[:4]
+
+    # More than ten rules, so that match_key '10' must not be taken to be lower
+    # than '2'.  The broad rules are last, so most of their pairs are duplicates.
+    rule_cols = [
+        ["first_name", "surname"],
+        ["dob"],
+        ["email"],
+        ["first_name", "dob_year"],
+        ["surname", "dob_year"],
+        ["city", "first_name_2"],
+        ["city", "surname_2"],
+        ["first_name"],
+        ["surname"],
+        ["dob_year", "first_name_2"],
+        ["city", "dob_year"],
+    ]
+    settings = get_settings_dict()
+    settings["blocking_rules_to_generate_predictions"] = [
+        block_on(*cols) for cols in rule_cols
+    ]
+    linker = Linker(df, settings, DuckDBAPI())
+    blocking_rules = linker._settings_obj._blocking_rules_to_generate_predictions
+    assert _pair_deduplication_strategy(blocking_rules) == "aggregation"
+    assert _pair_deduplication_strategy(blocking_rules[:3]) == "exclusion"
+
+    df_predict = linker.inference.predict().as_pandas_dataframe()
+    found = {
+        (id_l, id_r): mk
+        for id_l, id_r, mk in zip(
+            df_predict["unique_id_l"],
+            df_predict["unique_id_r"],
+            df_predict["match_key"],
+        )
+    }
+    assert len(found) == len(df_predict)
+
+    expected = {}
+    for mk, cols in enumerate(rule_cols):
+        df_nn = df.dropna(subset=cols)
+        m = df_nn.merge(df_nn, on=cols)
+        m = m[m["unique_id_x"] < m["unique_id_y"]]
+        for pair in zip(m["unique_id_x"], m["unique_id_y"]):
+            expected.setdefault(pair, str(mk))
+
+    assert found == expected
+
+
+@mark_with_dialects_including("duckdb")
+def test_token_blocking():
+    df = pd.DataFrame(
+        [
+            {"unique_id": 1, "name": "ACME WIDGETS LTD", "city": "Leeds"},
+            {"unique_id": 2, "name": "ACME LTD", "city": "York"},
+            {"unique_id": 3, "name": "BOLT  WIDGETS LTD", "city": "Leeds"},
+            {"unique_id": 4, "name": "CROWN LTD", "city": "Hull"},
+            {"unique_id": 5, "name": None, "city": "Hull"},
+        ]
+    )
+    settings = {
+        "link_type": "dedupe_only",
+        "blocking_rules_to_generate_predictions": [
+            block_on("city"),
+            TokenRule("name", max_token_frequency=3, tokenise=True),
+        ],
+        "comparisons": [cl.ExactMatch("city")],
+    }
+    linker = Linker(df, settings, DuckDBAPI())
+    df_predict = linker.inference.predict().as_pandas_dataframe()
+    found = set(
+        zip(
+            df_predict["unique_id_l"],
+            df_predict["unique_id_r"],
+            df_predict["match_key"],
+        )
+    )
+
+    # 'LTD' is in four records so is skipped; (1, 3) shares WIDGETS but is
+    # already generated by the first rule
+    assert found == {(1, 3, "0"), (4, 5, "0"), (1, 2, "1")}
+
+
+@mark_with_dialects_including("duckdb")
+def test_cache_blocked_pairs():
+    df = pd.read_csv("./tests/datasets/fake_1000_from_splink_demos.csv")
+    db_api = DuckDBAPI()
+
+    settings = get_settings_dict()
+    settings["blocking_rules_to_generate_predictions"] = [
+        block_on("dob"),
+        block_on("first_name"),
+    ]
+
+    def blocked_pairs_executed(linker, since):
+        return [
+            t
+            for t in linker._intermediate_table_cache.executed_queries[since:]
+            if t.templated_name == "__splink__blocked_id_pairs"
+        ]
+
+    linker = Linker(df, settings, db_api)
+    expected = linker.inference.predict().as_pandas_dataframe()
+    expected = expected.sort_values(["unique_id_l", "unique_id_r"]).reset_index(
+        drop=True
+    )
+
+    def check_predictions(linker, computes_blocked_pairs):
+        executed_before = len(linker._intermediate_table_cache.executed_queries)
+        df_predict = linker.inference.predict(cache_blocked_pairs=True)
+        assert bool(blocked_pairs_executed(linker, executed_before)) == (
+            computes_blocked_pairs
+        )
+        df_predict = df_predict.as_pandas_dataframe()
+        pd.testing.assert_frame_equal(
+            df_predict.sort_values(["unique_id_l", "unique_id_r"]).reset_index(
+                drop=True
+            ),
+            expected,
+        )
+
+    check_predictions(linker, computes_blocked_pairs=True)
+    check_predictions(linker, computes_blocked_pairs=False)
+
+    # A new linker on the same database and data reuses the pairs, even once
+    # the cache of intermediate tables has been cleared...
+    linker_2 = Linker(df.copy(), settings, db_api)
+    linker_2.table_management.invalidate_cache()
+    check_predictions(linker_2, computes_blocked_pairs=False)
+
+    # ...but not if the data changes
+    df_changed = df.copy()
+    df_changed.loc[0, "first_name"] = "Zebedee"
+    linker_3 = Linker(df_changed, settings, db_api)
+    linker_3.table_management.invalidate_cache()
+    executed_before = len(linker_3._intermediate_table_cache.executed_queries)
+    linker_3.inference.predict(cache_blocked_pairs=True)
+    assert blocked_pairs_executed(linker_3, executed_before)
+
+
+@mark_with_dialects_excluding()
+def test_band_blocking(test_helpers, dialect):
+    helper = test_helpers[dialect]
+
+    df = pd.read_csv("./tests/datasets/fake_1000_from_splink_demos.csv")
+    # Include negative values and nulls, and values on band boundaries
+    df["amount"] = (df["unique_id"] * 7919 % 1000) / 20 - 10
+    df.loc[df["unique_id"] % 50 == 0, "amount"] = None
+
+    def predicted_pairs(band_rule):
+        settings = {
+            "link_type": "dedupe_only",
+            "blocking_rules_to_generate_predictions": [
+                block_on("surname"),
+                band_rule,
+                block_on("first_name"),
+            ],
+            "comparisons": [cl.ExactMatch("city")],
+        }
+        db_api = helper.DatabaseAPI(**helper.db_api_args())
+        linker = Linker(helper.convert_frame(df), settings, db_api)
+        df_predict = linker.inference.predict().as_pandas_dataframe()
+        return set(
+            zip(
+                df_predict["unique_id_l"],
+                df_predict["unique_id_r"],
+                df_predict["match_key"],
+            )
+        )
+
+    expected = predicted_pairs(CustomRule("abs(l.amount - r.amount) <= 2.5"))
+    found = predicted_pairs(BandRule("amount", band_width=2.5))
+
+    assert found == expected
+    assert any(match_key == "1" for _, _, match_key in found)
+
+    br = BandRule("amount", band_width=2.5).get_blocking_rule(dialect)
+    assert blocking_rule_to_obj(br.as_dict()).as_dict() == br.as_dict()
+
+
+@mark_with_dialects_including("duckdb")
+def test_band_blocking_on_dates():
+    df = pd.read_csv("./tests/datasets/fake_1000_from_splink_demos.csv")
+    df["dob"] = pd.to_datetime(df["dob"], errors="coerce")
+
+    def predicted_pairs(band_rule):
+        settings = {
+            "link_type": "dedupe_only",
+            "blocking_rules_to_generate_predictions": [band_rule],
+            "comparisons": [cl.ExactMatch("city")],
+        }
+        linker = Linker(df, settings, DuckDBAPI())
+        df_predict = linker.inference.predict().as_pandas_dataframe()
+        return set(zip(df_predict["unique_id_l"], df_predict["unique_id_r"]))
+
+    expected = predicted_pairs(
+        CustomRule("abs(epoch(l.dob) - epoch(r.dob)) <= 30 * 24 * 60 * 60")
+    )
+    found = predicted_pairs(BandRule("dob", band_width=30, metric="day"))
+
+    assert found == expected
+    assert len(found) > 0
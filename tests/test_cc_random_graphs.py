@@ -1,4 +1,8 @@
 # python3 -m pytest tests/test_cc_random_graphs.py
+import logging
+import random
+
+import networkx as nx
 import pytest
 
 from tests.cc_testing_utils import (
@@ -10,16 +14,46 @@ from tests.cc_testing_utils import (
 
 
 @pytest.mark.parametrize("execution_number", range(20))
-def test_small_erdos_renyi_graph(execution_number):
+@pytest.mark.parametrize("engine", ["sql", "sql_pointer_jumping", "in_memory"])
+def test_small_erdos_renyi_graph(execution_number, engine):
     g = generate_random_graph(graph_size=500)
     df_nodes, df_edges = nodes_and_edges_from_graph(g)
 
-    cc_df = run_cc_implementation(df_nodes, df_edges)
+    cc_df = run_cc_implementation(df_nodes, df_edges, engine=engine)
+    nx_df = networkx_solve(g)
+
+    assert (cc_df.values == nx_df.values).all()
+
+
+@pytest.mark.parametrize("engine", ["sql", "sql_pointer_jumping", "in_memory"])
+def test_long_chains(engine):
+    # Chains are the worst case for the SQL algorithm's iteration count
+    g = nx.disjoint_union_all([nx.path_graph(n) for n in [1, 2, 50, 200]])
+    relabel = dict(zip(g.nodes, random.Random(1).sample(list(g.nodes), len(g))))
+    g = nx.relabel_nodes(g, relabel)
+    df_nodes, df_edges = nodes_and_edges_from_graph(g)
+
+    cc_df = run_cc_implementation(df_nodes, df_edges, engine=engine)
     nx_df = networkx_solve(g)
 
     assert (cc_df.values == nx_df.values).all()
 
 
+def test_pointer_jumping_iterations_are_logarithmic(caplog):
+    g = nx.path_graph(2_000)
+    relabel = dict(zip(g.nodes, random.Random(2).sample(list(g.nodes), len(g))))
+    g = nx.relabel_nodes(g, relabel)
+    df_nodes, df_edges = nodes_and_edges_from_graph(g)
+
+    with caplog.at_level(logging.INFO, logger="splink"):
+        cc_df = run_cc_implementation(df_nodes, df_edges, engine="sql_pointer_jumping")
+    nx_df = networkx_solve(g)
+    assert (cc_df.values == nx_df.values).all()
+
+    iterations = [r for r in caplog.messages if r.startswith("Completed iteration")]
+    assert len(iterations) <= 20
+
+
 @pytest.mark.skip(reason="Slow")
 @pytest.mark.parametrize("execution_number", range(10))
 def test_medium_erdos_renyi_graph(execution_number):
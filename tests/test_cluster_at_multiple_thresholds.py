@@ -5,6 +5,7 @@ import pytest
 from splink.internals.clustering import (
     cluster_pairwise_predictions_at_multiple_thresholds,
     cluster_pairwise_predictions_at_threshold,
+    compute_cluster_dendrogram,
 )
 from tests.cc_testing_utils import generate_random_graph, nodes_and_edges_from_graph
 
@@ -155,3 +156,74 @@ def test_cluster_at_multiple_thresholds_mw_prob_equivalence(test_helpers, dialec
     pd.testing.assert_series_equal(
         cc_prob_summary_pd["avg_cluster_size"], cc_weight_summary_pd["avg_cluster_size"]
     )
+
+
+@mark_with_dialects_excluding()
+def test_cluster_at_multiple_thresholds_in_memory_engine(test_helpers, dialect):
+    helper = test_helpers[dialect]
+    db_api = helper.DatabaseAPI(**helper.db_api_args())
+
+    G = generate_random_graph(300, density=0.01, seed=3)
+    nodes, edges = nodes_and_edges_from_graph(G)
+    edges["match_probability"] = np.random.default_rng(3).uniform(0, 1, len(edges))
+
+    thresholds = [0.2, 0.5, 0.7, 0.9]
+
+    for output_cluster_summary_stats in [False, True]:
+        results = {
+            engine: cluster_pairwise_predictions_at_multiple_thresholds(
+                nodes,
+                edges,
+                node_id_column_name="unique_id",
+                db_api=db_api,
+                match_probability_thresholds=list(thresholds),
+                output_cluster_summary_stats=output_cluster_summary_stats,
+                engine=engine,
+            ).as_pandas_dataframe()
+            for engine in ["sql", "in_memory"]
+        }
+        sort_col = (
+            "threshold_match_probability"
+            if output_cluster_summary_stats
+            else "unique_id"
+        )
+        sql_pd, in_memory_pd = (
+            df.sort_values(sort_col).reset_index(drop=True) for df in results.values()
+        )
+        pd.testing.assert_frame_equal(
+            sql_pd, in_memory_pd, check_dtype=False, check_exact=False
+        )
+
+
+@mark_with_dialects_excluding()
+def test_compute_cluster_dendrogram(test_helpers, dialect):
+    helper = test_helpers[dialect]
+    db_api = helper.DatabaseAPI(**helper.db_api_args())
+
+    nodes = [{"my_id": i} for i in range(1, 8)]
+    edges = [
+        {"my_id_l": 1, "my_id_r": 2, "match_probability": 0.8},
+        {"my_id_l": 3, "my_id_r": 2, "match_probability": 0.9},
+        {"my_id_l": 1, "my_id_r": 3, "match_probability": 0.7},
+        {"my_id_l": 4, "my_id_r": 5, "match_probability": 0.99},
+        {"my_id_l": 5, "my_id_r": 1, "match_probability": 0.6},
+        {"my_id_l": 6, "my_id_r": 7, "match_probability": 0.1},
+    ]
+
+    dendrogram = compute_cluster_dendrogram(
+        nodes,
+        edges,
+        node_id_column_name="my_id",
+        db_api=db_api,
+        threshold_match_probability=0.5,
+    ).as_pandas_dataframe()
+    dendrogram = dendrogram.sort_values("merge_order")
+
+    # The 1-3 edge is within an existing cluster, so is not a merge, and the 6-7
+    # edge is below the threshold
+    assert dendrogram[["cluster_id_l", "cluster_id_r", "cluster_size"]].astype(
+        int
+    ).values.tolist() == [[4, 5, 2], [2, 3, 2], [1, 2, 3], [1, 4, 5]]
+    assert dendrogram["match_probability"].tolist() == pytest.approx(
+        [0.99, 0.9, 0.8, 0.6]
+    )
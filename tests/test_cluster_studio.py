@@ -1,6 +1,11 @@
 import pandas as pd
+import pytest
 
-from splink.internals.cluster_studio import _get_lowest_density_clusters
+from splink.internals.cluster_studio import (
+    _get_cluster_ids,
+    _get_lowest_density_clusters,
+    compute_cluster_index,
+)
 from splink.internals.duckdb.database_api import DuckDBAPI
 from splink.internals.linker import Linker
 
@@ -49,3 +54,92 @@ def test_density_sample():
     ]
 
     assert result == expect
+
+
+def test_cluster_index_and_sampling(tmp_path):
+    df = pd.DataFrame({"person_id": range(1, 8)})
+    settings = {
+        "link_type": "dedupe_only",
+        "unique_id_column_name": "person_id",
+    }
+    linker = Linker(df, settings, db_api=DuckDBAPI())
+
+    # Clusters {1, 2, 3}, {4, 5, 6, 7} and a singleton {8}
+    pd_predictions = pd.DataFrame(
+        [
+            {"person_id_l": 1, "person_id_r": 2, "match_probability": 0.9},
+            {"person_id_l": 2, "person_id_r": 3, "match_probability": 0.7},
+            {"person_id_l": 1, "person_id_r": 3, "match_probability": 0.6},
+            {"person_id_l": 4, "person_id_r": 5, "match_probability": 0.95},
+            {"person_id_l": 5, "person_id_r": 6, "match_probability": 0.8},
+            {"person_id_l": 6, "person_id_r": 7, "match_probability": 0.85},
+            # Below the threshold, or between clusters
+            {"person_id_l": 4, "person_id_r": 7, "match_probability": 0.2},
+            {"person_id_l": 3, "person_id_r": 8, "match_probability": 0.3},
+        ]
+    )
+    pd_clusters = pd.DataFrame(
+        {
+            "cluster_id": [1, 1, 1, 4, 4, 4, 4, 8],
+            "person_id": range(1, 9),
+        }
+    )
+    df_predict = linker.table_management.register_table(
+        pd_predictions, "predictions", overwrite=True
+    )
+    df_clustered = linker.table_management.register_table(
+        pd_clusters, "clusters", overwrite=True
+    )
+    df_clustered.metadata["threshold_match_probability"] = 0.5
+
+    # Sampling at random or by size needs only the node index, not the edges
+    cluster_ids, _ = _get_cluster_ids(
+        linker, df_predict, df_clustered, "random", 3, sample_seed=1
+    )
+    assert sorted(cluster_ids) == [1, 4, 8]
+
+    cluster_ids, cluster_names = _get_cluster_ids(
+        linker, df_predict, df_clustered, "by_cluster_size", 10, sample_seed=None
+    )
+    assert sorted(cluster_ids) == [1, 4]
+    assert "cluster_index_nodes" in df_clustered.metadata
+    assert "cluster_index" not in df_clustered.metadata
+
+    cluster_index = compute_cluster_index(linker, df_predict, df_clustered)
+    index = (
+        cluster_index.as_pandas_dataframe()
+        .sort_values("cluster_id")
+        .set_index("cluster_id")
+    )
+    assert index["n_nodes"].tolist() == [3, 4, 1]
+    assert index["n_edges"].tolist() == [3, 3, 0]
+    assert index.loc[1, "density"] == pytest.approx(1.0)
+    assert index.loc[4, "density"] == pytest.approx(0.5)
+    assert pd.isna(index.loc[8, "density"])
+    assert index.loc[1, "min_match_probability"] == pytest.approx(0.6)
+    assert index.loc[4, "max_match_probability"] == pytest.approx(0.95)
+
+    # The index is built once per clustering output and predictions
+    assert compute_cluster_index(linker, df_predict, df_clustered) is cluster_index
+
+    # and rebuilt for different predictions
+    df_predict_other = linker.table_management.register_table(
+        pd_predictions.iloc[:4], "predictions_other", overwrite=True
+    )
+    other_index = compute_cluster_index(linker, df_predict_other, df_clustered)
+    assert other_index is not cluster_index
+    other_n_edges = (
+        other_index.as_pandas_dataframe().sort_values("cluster_id")["n_edges"].tolist()
+    )
+    assert other_n_edges == [3, 1, 0]
+
+    # Densities come from the index when no cluster metrics are provided
+    cluster_ids, cluster_names = _get_cluster_ids(
+        linker,
+        df_predict,
+        df_clustered,
+        "lowest_density_clusters_by_size",
+        10,
+        sample_seed=None,
+    )
+    assert sorted(cluster_ids) == [1, 4]
@@ -1,4 +1,6 @@
+import numpy as np
 import pandas as pd
+import pytest
 
 import splink.comparison_library as cl
 from splink import Linker, SettingsCreator, block_on
@@ -9,7 +11,8 @@ from .decorator import mark_with_dialects_excluding
 # See https://www.robinlinacre.com/graphPlayground/ with this data:
 # https://gist.github.com/RobinL/a022c16ada1892035b1f3f7838f80db0#file-example_1-json
 @mark_with_dialects_excluding()
-def test_single_best_links_correctness_example_1(test_helpers, dialect):
+@pytest.mark.parametrize("engine", ["sql", "in_memory"])
+def test_single_best_links_correctness_example_1(test_helpers, dialect, engine):
     helper = test_helpers[dialect]
 
     df = pd.DataFrame(
@@ -45,6 +48,7 @@ def test_single_best_links_correctness_example_1(test_helpers, dialect):
         df_predict,
         duplicate_free_datasets=["a", "b", "c"],
         threshold_match_probability=0.5,
+        engine=engine,
     )
 
     result = df_clusters.as_pandas_dataframe().sort_values("unique_id")
@@ -76,7 +80,8 @@ def test_single_best_links_correctness_example_1(test_helpers, dialect):
 # See https://www.robinlinacre.com/graphPlayground/ with this data:
 # https://gist.github.com/RobinL/a022c16ada1892035b1f3f7838f80db0#file-example_2-json
 @mark_with_dialects_excluding()
-def test_single_best_links_example_2(test_helpers, dialect):
+@pytest.mark.parametrize("engine", ["sql", "in_memory"])
+def test_single_best_links_example_2(test_helpers, dialect, engine):
     helper = test_helpers[dialect]
 
     df = pd.DataFrame(
@@ -112,6 +117,7 @@ def test_single_best_links_example_2(test_helpers, dialect):
         df_predict,
         duplicate_free_datasets=["a", "b", "d"],
         threshold_match_probability=0.5,
+        engine=engine,
     )
 
     result = df_clusters.as_pandas_dataframe().sort_values("unique_id")
@@ -141,7 +147,8 @@ def test_single_best_links_example_2(test_helpers, dialect):
 # See https://www.robinlinacre.com/graphPlayground/ with this data:
 # https://gist.github.com/RobinL/a022c16ada1892035b1f3f7838f80db0#file-example_3-json
 @mark_with_dialects_excluding()
-def test_single_best_links_example_3(test_helpers, dialect):
+@pytest.mark.parametrize("engine", ["sql", "in_memory"])
+def test_single_best_links_example_3(test_helpers, dialect, engine):
     helper = test_helpers[dialect]
 
     df = pd.DataFrame(
@@ -177,6 +184,7 @@ def test_single_best_links_example_3(test_helpers, dialect):
         df_predict,
         duplicate_free_datasets=["a", "b", "c"],
         threshold_match_probability=0.5,
+        engine=engine,
     )
 
     result = df_clusters.as_pandas_dataframe().sort_values("unique_id")
@@ -204,7 +212,8 @@ def test_single_best_links_example_3(test_helpers, dialect):
 
 
 @mark_with_dialects_excluding()
-def test_single_best_links_ties(test_helpers, dialect):
+@pytest.mark.parametrize("engine", ["sql", "in_memory"])
+def test_single_best_links_ties(test_helpers, dialect, engine):
     helper = test_helpers[dialect]
 
     df = pd.DataFrame(
@@ -237,7 +246,10 @@ def test_single_best_links_ties(test_helpers, dialect):
     )
 
     df_clusters = linker.clustering.cluster_using_single_best_links(
-        df_predict, duplicate_free_datasets=["a", "b"], threshold_match_probability=0.5
+        df_predict,
+        duplicate_free_datasets=["a", "b"],
+        threshold_match_probability=0.5,
+        engine=engine,
     )
 
     result = df_clusters.as_pandas_dataframe()
@@ -300,3 +312,54 @@ def test_single_best_links_one_to_one(test_helpers, dialect):
 
     count = result["count"][0]
     assert count == 0
+
+
+@mark_with_dialects_excluding()
+def test_single_best_links_in_memory_engine_matches_sql(test_helpers, dialect):
+    helper = test_helpers[dialect]
+    rng = np.random.default_rng(0)
+
+    num_records = 300
+    df = pd.DataFrame(
+        {
+            "unique_id": range(num_records),
+            "source_dataset": rng.choice(["a", "b", "c", "d"], num_records),
+        }
+    )
+    num_edges = 600
+    predictions = pd.DataFrame(
+        {
+            "unique_id_l": rng.integers(0, num_records, num_edges),
+            "unique_id_r": rng.integers(0, num_records, num_edges),
+            "match_probability": rng.permutation(num_edges) / num_edges,
+        }
+    )
+    predictions = predictions[predictions["unique_id_l"] < predictions["unique_id_r"]]
+    for side in ["l", "r"]:
+        predictions[f"source_dataset_{side}"] = df["source_dataset"].to_numpy()[
+            predictions[f"unique_id_{side}"]
+        ]
+
+    settings = SettingsCreator(
+        link_type="link_and_dedupe",
+        comparisons=[],
+        blocking_rules_to_generate_predictions=[],
+    )
+    linker = Linker(df, settings, **helper.extra_linker_args())
+    df_predict = linker.table_management.register_table_predict(
+        predictions, overwrite=True
+    )
+
+    def clusters(engine):
+        df_clusters = linker.clustering.cluster_using_single_best_links(
+            df_predict,
+            duplicate_free_datasets=["a", "b", "c"],
+            threshold_match_probability=0.2,
+            engine=engine,
+        ).as_pandas_dataframe()
+        df_clusters = df_clusters.sort_values("unique_id").reset_index(drop=True)
+        return df_clusters[["unique_id", "cluster_id"]]
+
+    clusters_sql = clusters("sql")
+    assert clusters_sql["cluster_id"].nunique() < num_records
+    pd.testing.assert_frame_equal(clusters_sql, clusters("in_memory"))
@@ -126,3 +126,41 @@ def test_clustering_no_edges(test_helpers, dialect):
     # due to blocking rules, df_predict will be empty
     df_predict = linker.inference.predict()
     linker.clustering.cluster_pairwise_predictions_at_threshold(df_predict, 0.95)
+
+
+@mark_with_dialects_excluding()
+@mark.parametrize("link_type", ["dedupe_only", "link_and_dedupe"])
+def test_clustering_in_memory_engine_matches_sql(test_helpers, dialect, link_type):
+    helper = test_helpers[dialect]
+
+    df = pd.read_csv("./tests/datasets/fake_1000_from_splink_demos.csv")
+    input_pd_tables = [df] if link_type == "dedupe_only" else [df, df]
+
+    settings = SettingsCreator(
+        link_type=link_type,
+        comparisons=[
+            cl.ExactMatch("first_name"),
+            cl.ExactMatch("surname"),
+            cl.ExactMatch("dob"),
+            cl.ExactMatch("city"),
+        ],
+        blocking_rules_to_generate_predictions=[
+            block_on("surname"),
+            block_on("dob"),
+        ],
+    )
+    linker_input = list(map(helper.convert_frame, input_pd_tables))
+    linker = Linker(linker_input, settings, **helper.extra_linker_args())
+    df_predict = linker.inference.predict()
+
+    def clusters(engine):
+        df_clusters = linker.clustering.cluster_pairwise_predictions_at_threshold(
+            df_predict, 0.5, engine=engine
+        ).as_pandas_dataframe()
+        sort_cols = [c for c in ["source_dataset", "unique_id"] if c in df_clusters]
+        return df_clusters.sort_values(sort_cols).reset_index(drop=True)
+
+    clusters_sql = clusters("sql")
+    clusters_in_memory = clusters("in_memory")
+    assert clusters_sql["cluster_id"].nunique() < len(clusters_sql)
+    pd.testing.assert_frame_equal(clusters_sql, clusters_in_memory)
@@ -1,16 +1,17 @@
 import datetime
+from concurrent.futures import ThreadPoolExecutor
 
 import numpy as np
 import pandas as pd
 import pytest
 
 import splink.internals.comparison_library as cl
-from splink import SettingsCreator
+from splink import DuckDBAPI, Linker, SettingsCreator
 from splink.internals.blocking_rule_library import block_on
 from splink.internals.pipeline import CTEPipeline
 from splink.internals.vertically_concatenate import compute_df_concat_with_tf
 
-from .decorator import mark_with_dialects_excluding
+from .decorator import mark_with_dialects_excluding, mark_with_dialects_including
 
 
 @mark_with_dialects_excluding("sqlite")
@@ -165,3 +166,55 @@ def test_compare_two_records_2(test_helpers, dialect):
     assert res_pd["tf_city_r"].iloc[0] == 0.2
     assert res_pd["tf_first_name_l"].iloc[0] == 0.3
     assert res_pd["tf_first_name_r"].iloc[0] == 0.4
+
+
+@mark_with_dialects_including("duckdb")
+def test_compare_two_records_thread_safe_duckdb():
+    df = pd.read_parquet(
+        "./tests/datasets/fake_1000_from_splink_demos_strip_datetypes.parquet"
+    )
+
+    settings = SettingsCreator(
+        link_type="dedupe_only",
+        comparisons=[
+            cl.ExactMatch("first_name").configure(term_frequency_adjustments=True),
+            cl.ExactMatch("surname"),
+            cl.ExactMatch("city"),
+        ],
+        blocking_rules_to_generate_predictions=[block_on("first_name")],
+    )
+
+    db_api = DuckDBAPI(thread_safe=True)
+    linker = Linker(df, settings, db_api)
+
+    pipeline = CTEPipeline()
+    compute_df_concat_with_tf(linker, pipeline)
+
+    records = df.head(20).to_dict(orient="records")
+    pairs = list(zip(records[:10], records[10:]))
+
+    def compare(pair):
+        res = linker.inference.compare_two_records(*pair)
+        return res.as_pandas_dataframe()["match_weight"].iloc[0]
+
+    expected = [compare(p) for p in pairs]
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(compare, pairs * 3))
+
+    assert results == pytest.approx(expected * 3)
+    # the linker's settings have not been mutated
+    assert not linker._settings_obj._retain_intermediate_calculation_columns
+
+    def find_matches(record):
+        res = linker.inference.find_matches_to_new_records(
+            [record], blocking_rules=[block_on("surname")]
+        )
+        return len(res.as_pandas_dataframe())
+
+    expected_counts = [find_matches(r) for r in records[:5]]
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        counts = list(executor.map(find_matches, records[:5]))
+
+    assert counts == expected_counts
+    assert len(linker._settings_obj._blocking_rules_to_generate_predictions) == 1
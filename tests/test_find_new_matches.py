@@ -79,7 +79,7 @@ def test_tf_tables_init_works(test_helpers, dialect):
 
 
 @mark_with_dialects_excluding()
-def test_matches_work(test_helpers, dialect):
+def test_matches_work(test_helpers, dialect, tmp_path):
     helper = test_helpers[dialect]
     Linker = helper.Linker
 
@@ -89,7 +89,7 @@ def test_matches_work(test_helpers, dialect):
 
     # Train our model to get more reasonable outputs...
     linker.training.estimate_u_using_random_sampling(max_pairs=1e6)
-    linker.visualisations.match_weights_chart().save("mwc.html")
+    linker.visualisations.match_weights_chart().save(str(tmp_path / "mwc.html"))
 
     blocking_rule = block_on("first_name", "surname")
     linker.training.estimate_parameters_using_expectation_maximisation(blocking_rule)
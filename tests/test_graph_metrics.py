@@ -1,11 +1,17 @@
 from unittest.mock import patch
 
+import networkx as nx
+import numpy as np
 import pandas as pd
 from pandas.testing import assert_frame_equal
 from pytest import approx, raises
 
 from splink.internals.comparison_library import ExactMatch
 from splink.internals.duckdb.database_api import DuckDBAPI
+from splink.internals.edge_metrics import (
+    _cluster_chunk_boundaries,
+    compute_igraph_metrics,
+)
 from splink.internals.linker import Linker
 
 from .decorator import mark_with_dialects_excluding
@@ -363,8 +369,12 @@ def test_is_bridge(dialect, test_helpers):
     )
 
     # linker.debug_mode = True
+    # small chunks, so that each cluster is bridged separately
     cm = linker.clustering.compute_graph_metrics(
-        df_predict, df_clustered, threshold_match_probability=0.95
+        df_predict,
+        df_clustered,
+        threshold_match_probability=0.95,
+        max_edges_per_chunk=5,
     )
     df_em = cm.edges.as_pandas_dataframe()
 
@@ -388,6 +398,80 @@ def test_is_bridge(dialect, test_helpers):
             )
 
 
+def test_is_bridge_in_chunks():
+    # Clusters of random trees with extra edges, so some edges are bridges
+    rng = np.random.default_rng(0)
+    edges = []
+    for cluster_start in range(0, 200, 20):
+        g = nx.Graph()
+        for i in range(1, 20):
+            g.add_edge(cluster_start + int(rng.integers(0, i)), cluster_start + i)
+        for _ in range(3):
+            u, v = rng.choice(20, 2, replace=False) + cluster_start
+            g.add_edge(int(u), int(v))
+        bridges = {frozenset(e) for e in nx.bridges(g)}
+        edges.extend(
+            {
+                "unique_id_l": min(u, v),
+                "unique_id_r": max(u, v),
+                "match_probability": 0.99,
+                "is_bridge": frozenset((u, v)) in bridges,
+            }
+            for u, v in g.edges
+        )
+    df_e = pd.DataFrame(edges)
+    df_c = pd.DataFrame({"unique_id": range(200), "cluster_id": np.arange(200) // 20})
+
+    linker = Linker(
+        pd.DataFrame({"unique_id": range(200)}),
+        {"link_type": "dedupe_only"},
+        DuckDBAPI(),
+    )
+    df_predict = linker.table_management.register_table(df_e, "br_predict")
+    df_clustered = linker.table_management.register_table(df_c, "br_clusters")
+    df_node_metrics = linker.clustering._compute_metrics_nodes(
+        df_predict, df_clustered, 0.95
+    )
+
+    # Chunks of a cluster or two each, bridged in this process, and in two
+    # worker processes
+    for max_workers in [1, 2]:
+        df_em = compute_igraph_metrics(
+            linker,
+            df_node_metrics,
+            df_predict,
+            df_clustered,
+            0.95,
+            max_edges_per_chunk=50,
+            max_workers=max_workers,
+        ).as_pandas_dataframe()
+
+        df_em = df_em.merge(
+            df_e,
+            left_on=["composite_unique_id_l", "composite_unique_id_r"],
+            right_on=["unique_id_l", "unique_id_r"],
+            suffixes=("", "_expected"),
+        )
+        assert len(df_em) == len(df_e)
+        assert df_em["is_bridge"].any() and not df_em["is_bridge"].all()
+        assert (df_em["is_bridge"] == df_em["is_bridge_expected"]).all()
+
+
+def test_cluster_chunk_boundaries():
+    # Clusters are packed greedily, never splitting one, so chunks are full
+    # unless the next cluster would overflow them, or a single cluster has more
+    # than the maximum
+    counts = np.array([3, 4, 2, 12, 1, 1, 5, 5])
+    assert _cluster_chunk_boundaries(counts, 10) == [
+        (0, 9),
+        (9, 21),
+        (21, 28),
+        (28, 33),
+    ]
+    assert _cluster_chunk_boundaries(counts, 100) == [(0, 33)]
+    assert _cluster_chunk_boundaries(np.array([], dtype=np.int64), 10) == []
+
+
 unpatched_import = __import__
 
 
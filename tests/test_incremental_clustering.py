@@ -0,0 +1,187 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from splink.internals.clustering import (
+    cluster_pairwise_predictions_at_threshold,
+    update_clusters_from_edge_deltas,
+)
+from tests.cc_testing_utils import generate_random_graph, nodes_and_edges_from_graph
+
+from .decorator import mark_with_dialects_excluding
+
+
+def _sorted(df):
+    return df.sort_values("unique_id").reset_index(drop=True)
+
+
+@pytest.mark.parametrize("graph_size", [100, 1000])
+@mark_with_dialects_excluding()
+def test_update_clusters_matches_full_reclustering(test_helpers, dialect, graph_size):
+    helper = test_helpers[dialect]
+    db_api = helper.DatabaseAPI(**helper.db_api_args())
+
+    if dialect == "spark" and graph_size > 100:
+        pytest.skip("Skipping large graph sizes for Spark dialect")
+
+    rng = np.random.default_rng(graph_size)
+    G = generate_random_graph(graph_size, density=2 / graph_size, seed=graph_size)
+    nodes, edges = nodes_and_edges_from_graph(G)
+    edges["match_probability"] = rng.uniform(0, 1, len(edges))
+
+    clusters = cluster_pairwise_predictions_at_threshold(
+        nodes,
+        edges,
+        node_id_column_name="unique_id",
+        db_api=db_api,
+        threshold_match_probability=0.5,
+    )
+
+    removed = rng.random(len(edges)) < 0.05
+    edges_removed = edges[removed]
+    num_added = graph_size // 20
+    edges_added = pd.DataFrame(
+        {
+            "unique_id_l": rng.integers(0, graph_size, num_added),
+            # Some edges link to new nodes
+            "unique_id_r": rng.integers(0, graph_size + 5, num_added),
+            "match_probability": rng.uniform(0, 1, num_added),
+        }
+    )
+    new_edges = pd.concat([edges[~removed], edges_added])
+    new_nodes = pd.DataFrame(
+        {
+            "unique_id": pd.concat(
+                [nodes["unique_id"], edges_added["unique_id_r"]]
+            ).unique()
+        }
+    )
+
+    updated_clusters, change_log = update_clusters_from_edge_deltas(
+        clusters,
+        new_edges,
+        node_id_column_name="unique_id",
+        db_api=db_api,
+        edges_added=edges_added,
+        edges_removed=edges_removed,
+    )
+
+    expected = cluster_pairwise_predictions_at_threshold(
+        new_nodes,
+        new_edges,
+        node_id_column_name="unique_id",
+        db_api=db_api,
+        threshold_match_probability=0.5,
+    )
+
+    pd.testing.assert_frame_equal(
+        _sorted(updated_clusters.as_pandas_dataframe()[["unique_id", "cluster_id"]]),
+        _sorted(expected.as_pandas_dataframe()[["unique_id", "cluster_id"]]),
+    )
+    assert len(change_log.as_pandas_dataframe()) > 0
+
+
+@mark_with_dialects_excluding()
+def test_update_clusters_change_log(test_helpers, dialect):
+    helper = test_helpers[dialect]
+    db_api = helper.DatabaseAPI(**helper.db_api_args())
+
+    nodes = pd.DataFrame({"unique_id": range(1, 8)})
+    edges = pd.DataFrame(
+        [
+            {"unique_id_l": 1, "unique_id_r": 2, "match_probability": 0.9},
+            {"unique_id_l": 2, "unique_id_r": 3, "match_probability": 0.9},
+            {"unique_id_l": 4, "unique_id_r": 5, "match_probability": 0.9},
+            {"unique_id_l": 6, "unique_id_r": 7, "match_probability": 0.9},
+        ]
+    )
+    clusters = cluster_pairwise_predictions_at_threshold(
+        nodes,
+        edges,
+        node_id_column_name="unique_id",
+        db_api=db_api,
+        threshold_match_probability=0.5,
+    )
+
+    # Split {1, 2, 3} into {1} and {2, 3}, merge {4, 5} with {6, 7}, and add 8
+    # to {6, 7}.  The edge to 9 is below the threshold, so 9 is a new singleton
+    edges_removed = edges[edges["unique_id_l"] == 1]
+    edges_added = pd.DataFrame(
+        [
+            {"unique_id_l": 5, "unique_id_r": 6, "match_probability": 0.8},
+            {"unique_id_l": 7, "unique_id_r": 8, "match_probability": 0.8},
+            {"unique_id_l": 7, "unique_id_r": 9, "match_probability": 0.1},
+        ]
+    )
+    new_edges = pd.concat([edges[edges["unique_id_l"] != 1], edges_added])
+
+    updated_clusters, change_log = update_clusters_from_edge_deltas(
+        clusters,
+        new_edges,
+        node_id_column_name="unique_id",
+        db_api=db_api,
+        edges_added=edges_added,
+        edges_removed=edges_removed,
+    )
+
+    updated = _sorted(updated_clusters.as_pandas_dataframe())
+    assert updated["cluster_id"].tolist() == [1, 2, 2, 4, 4, 4, 4, 4, 9]
+
+    change_log_pd = change_log.as_pandas_dataframe()
+    change_log_pd = change_log_pd.astype(
+        {"is_merge": bool, "is_split": bool, "node_count": int}
+    )
+    moves = {
+        (
+            None if pd.isna(r["previous_cluster_id"]) else r["previous_cluster_id"],
+            r["cluster_id"],
+        ): (r["node_count"], r["is_merge"], r["is_split"])
+        for r in change_log_pd.to_dict(orient="records")
+    }
+    assert moves == {
+        (1, 1): (1, False, True),
+        (1, 2): (2, False, True),
+        (4, 4): (2, True, False),
+        (6, 4): (2, True, False),
+        (None, 4): (1, True, False),
+        (None, 9): (1, False, False),
+    }
+
+
+@mark_with_dialects_excluding()
+def test_update_clusters_requires_known_threshold(test_helpers, dialect):
+    helper = test_helpers[dialect]
+    db_api = helper.DatabaseAPI(**helper.db_api_args())
+
+    edges = pd.DataFrame(
+        [{"unique_id_l": 1, "unique_id_r": 2, "match_probability": 0.9}]
+    )
+    # Clusters not computed by cluster_pairwise_predictions_at_threshold have no
+    # record of their threshold
+    clusters = db_api.register_table(
+        pd.DataFrame({"unique_id": [1, 2, 3], "cluster_id": [1, 1, 3]}),
+        "__splink__test_clusters",
+    )
+    edges_added = pd.DataFrame(
+        [{"unique_id_l": 2, "unique_id_r": 3, "match_probability": 0.8}]
+    )
+
+    with pytest.raises(ValueError, match="threshold"):
+        update_clusters_from_edge_deltas(
+            clusters,
+            pd.concat([edges, edges_added]),
+            node_id_column_name="unique_id",
+            db_api=db_api,
+            edges_added=edges_added,
+        )
+
+    updated_clusters, _ = update_clusters_from_edge_deltas(
+        clusters,
+        pd.concat([edges, edges_added]),
+        node_id_column_name="unique_id",
+        db_api=db_api,
+        edges_added=edges_added,
+        threshold_match_probability=0.5,
+    )
+    updated = _sorted(updated_clusters.as_pandas_dataframe())
+    assert updated["cluster_id"].tolist() == [1, 1, 1]
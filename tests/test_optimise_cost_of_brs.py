@@ -0,0 +1,87 @@
+from itertools import combinations
+
+import pandas as pd
+import pytest
+
+from splink.internals.cost_of_blocking_rules import calculate_cost_of_combination_of_brs
+from splink.internals.optimise_cost_of_brs import (
+    check_field_freedom,
+    suggest_blocking_rules,
+)
+
+COLUMNS = ["first_name", "surname", "dob", "city", "email"]
+
+
+def _block_stats():
+    counts = {
+        ("first_name", "surname"): 120,
+        ("first_name", "dob"): 80,
+        ("surname", "dob"): 95,
+        ("dob", "city"): 400,
+        ("email",): 900,
+        ("first_name", "city"): 650,
+        ("surname", "email"): 30,
+        ("city", "email"): 60,
+        ("dob",): 1_000,
+    }
+    rows = []
+    for cols, count in counts.items():
+        row = {f"__fixed__{c}": int(c in cols) for c in COLUMNS}
+        row.update(
+            {
+                "blocking_columns_sanitised": list(cols),
+                "num_equi_joins": len(cols),
+                "comparison_count": count,
+                "splink_blocking_rule": " and ".join(cols),
+            }
+        )
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def _brute_force_min_cost(df_block_stats, min_freedom):
+    recs = df_block_stats.to_dict(orient="records")
+    field_names = [c for c in recs[0] if c.startswith("__fixed__")]
+    max_comparison_count = df_block_stats["comparison_count"].max()
+    costs = [
+        calculate_cost_of_combination_of_brs(
+            list(combination), max_comparison_count, 0, 1, 10, 10
+        )["cost"]
+        for k in range(1, len(recs) + 1)
+        for combination in combinations(recs, k)
+        if check_field_freedom(combination, field_names, min_freedom)
+    ]
+    return min(costs)
+
+
+def test_suggest_blocking_rules_is_deterministic_and_optimal():
+    df_block_stats = _block_stats()
+    field_names = [f"__fixed__{c}" for c in COLUMNS]
+
+    for min_freedom in [1, 2, 3]:
+        results = suggest_blocking_rules(df_block_stats, min_freedom=min_freedom)
+
+        # Shuffling the candidates should not change the suggestion
+        shuffled = df_block_stats.sample(frac=1, random_state=min_freedom)
+        results_shuffled = suggest_blocking_rules(shuffled, min_freedom=min_freedom)
+        best = results.iloc[0]
+        assert (
+            best["suggested_blocking_rules_for_prediction"]
+            == results_shuffled.iloc[0]["suggested_blocking_rules_for_prediction"]
+        )
+
+        selected_rows = df_block_stats[
+            df_block_stats["splink_blocking_rule"].isin(
+                best["suggested_blocking_rules_as_splink_brs"]
+            )
+        ].to_dict(orient="records")
+        assert check_field_freedom(selected_rows, field_names, min_freedom)
+
+        # The problem is small enough to be solved exactly, so the
+        # optimiser should prove its suggestion optimal
+        cost = calculate_cost_of_combination_of_brs(
+            selected_rows, df_block_stats["comparison_count"].max(), 0, 1, 10, 10
+        )["cost"]
+        assert cost == pytest.approx(_brute_force_min_cost(df_block_stats, min_freedom))
+        assert best["optimality_gap"] == 0
+        assert (results["optimality_gap"] >= 0).all()
@@ -1,5 +1,6 @@
 import pytest
 
+from splink.internals.blocking import materialise_salting_hot_key_tables
 from splink.internals.blocking_rule_library import block_on
 from splink.internals.linker import Linker
 from tests.basic_settings import get_settings_dict
@@ -83,3 +84,58 @@ def test_salting_spark(spark, spark_api):
 
     check_same_ids(df1, df2)
     check_answer(df1, df2)
+
+
+@mark_with_dialects_including("duckdb")
+def test_adaptive_salting_duckdb():
+    # Only the hot keys are salted, but the pairs generated should be identical
+    # to those generated without salting
+    import pandas as pd
+
+    from splink import DuckDBAPI
+
+    df = pd.read_csv("./tests/datasets/fake_1000_from_splink_demos.csv")
+
+    blocking_rules_no_salt = [
+        "l.surname = r.surname",
+        "l.first_name = r.first_name",
+        "l.dob = r.dob",
+    ]
+
+    blocking_rules_salted = [
+        block_on("surname", salting_partitions=3, salting_block_size_threshold=20),
+        {
+            "blocking_rule": "l.first_name = r.first_name",
+            "salting_partitions": 7,
+            "salting_block_size_threshold": 10,
+        },
+        "l.dob = r.dob",
+    ]
+
+    df1 = generate_linker_output(
+        df=df, spark_api=DuckDBAPI(), blocking_rules=blocking_rules_no_salt
+    )
+    df2 = generate_linker_output(
+        df=df, spark_api=DuckDBAPI(), blocking_rules=blocking_rules_salted
+    )
+
+    check_same_ids(df1, df2)
+    check_answer(df1, df2)
+    assert (df1["match_key"] == df2["match_key"]).all()
+
+    # Only keys generating blocks larger than the threshold are salted, into
+    # ceil(block_size / threshold) partitions capped at salting_partitions
+    db_api = DuckDBAPI()
+    linker = Linker(df, {**get_settings_dict(), "link_type": "dedupe_only"}, db_api)
+    br = block_on(
+        "surname", salting_partitions=3, salting_block_size_threshold=20
+    ).get_blocking_rule("duckdb")
+    materialise_salting_hot_key_tables(
+        "dedupe_only", [br], db_api, linker._input_tables_dict
+    )
+    hot_keys = br.hot_keys_table.as_pandas_dataframe()
+    counts = df["surname"].value_counts()
+    expected = counts[counts * counts > 20]
+    assert set(hot_keys["key_0"]) == set(expected.index)
+    for key, n in zip(hot_keys["key_0"], hot_keys["__splink_salting_partitions"]):
+        assert n == min(3, -(-(expected[key] ** 2) // 20))
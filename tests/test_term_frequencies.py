@@ -1,8 +1,13 @@
 import pandas as pd
 import pytest
 
+import splink.internals.comparison_library as cl
 from splink.internals.duckdb.database_api import DuckDBAPI
 from splink.internals.linker import Linker
+from splink.internals.pipeline import CTEPipeline
+from splink.internals.vertically_concatenate import compute_df_concat_with_tf
+
+from .decorator import mark_with_dialects_excluding, mark_with_dialects_including
 
 
 def get_data():
@@ -223,3 +228,265 @@ def test_weightand_clamp():
     # Adjustment would be 10/5.0 = 2 if no weighting was applied
 
     assert pytest.approx(bf) == bf_no_adj * 2**0.5
+
+
+@mark_with_dialects_excluding()
+def test_compute_all_tf_tables_in_one_pass(test_helpers, dialect):
+    helper = test_helpers[dialect]
+
+    df = pd.read_csv("./tests/datasets/fake_1000_from_splink_demos.csv")
+    tf_cols = ["first_name", "surname", "city"]
+
+    settings = {
+        "link_type": "dedupe_only",
+        "comparisons": [
+            cl.ExactMatch(c).configure(term_frequency_adjustments=True) for c in tf_cols
+        ],
+    }
+
+    def expected_tf(col):
+        counts = df[col].value_counts()
+        return (counts / counts.sum()).to_dict()
+
+    db_api = helper.DatabaseAPI(**helper.db_api_args())
+    linker = Linker(helper.convert_frame(df), settings, db_api)
+    df_concat_with_tf = compute_df_concat_with_tf(linker, CTEPipeline())
+    records = df_concat_with_tf.as_pandas_dataframe()
+
+    for col in tf_cols:
+        expected = expected_tf(col)
+        actual = records.dropna(subset=[col])
+        assert dict(zip(actual[col], actual[f"tf_{col}"])) == pytest.approx(expected)
+        assert records[records[col].isnull()][f"tf_{col}"].isnull().all()
+
+    db_api = helper.DatabaseAPI(**helper.db_api_args())
+    linker = Linker(helper.convert_frame(df), settings, db_api)
+    tf_tables = linker.table_management.compute_tf_tables(tf_cols)
+
+    for col, tf_table in zip(tf_cols, tf_tables):
+        tf_df = tf_table.as_pandas_dataframe()
+        assert dict(zip(tf_df[col], tf_df[f"tf_{col}"])) == pytest.approx(
+            expected_tf(col)
+        )
+        # The tables are cached, so are reused rather than recomputed
+        assert (
+            linker.table_management.compute_tf_table(col).physical_name
+            == tf_table.physical_name
+        )
+
+
+@mark_with_dialects_including("sqlite")
+def test_term_frequency_store_unsupported_dialect(test_helpers, tmp_path):
+    helper = test_helpers["sqlite"]
+    df = helper.load_frame_from_csv("./tests/datasets/fake_1000_from_splink_demos.csv")
+    db_api = helper.DatabaseAPI(**helper.db_api_args())
+    linker = Linker(df, {"link_type": "dedupe_only"}, db_api)
+    with pytest.raises(ValueError, match="sqlite is not supported"):
+        linker.table_management.use_term_frequency_store(str(tmp_path))
+
+
+@mark_with_dialects_including("duckdb")
+def test_term_frequency_store(tmp_path):
+    df = pd.read_csv("./tests/datasets/fake_1000_from_splink_demos.csv")
+    tf_cols = ["first_name", "surname"]
+    settings = {
+        "link_type": "dedupe_only",
+        "comparisons": [
+            cl.ExactMatch(c).configure(term_frequency_adjustments=True) for c in tf_cols
+        ],
+    }
+
+    def tf_lookup(df_concat_with_tf, col):
+        records = df_concat_with_tf.as_pandas_dataframe().dropna(subset=[col])
+        return dict(zip(records[col], records[f"tf_{col}"]))
+
+    def compute_with_store(df):
+        linker = Linker(df, settings, DuckDBAPI())
+        linker.table_management.use_term_frequency_store(str(tmp_path))
+        return compute_df_concat_with_tf(linker, CTEPipeline())
+
+    computed = compute_with_store(df)
+    parquet_path = tmp_path / "__splink__df_tf_first_name.parquet"
+    assert parquet_path.exists()
+
+    # Overwrite the stored table, so we can tell whether it is used
+    stored = pd.read_parquet(parquet_path)
+    stored["tf_first_name"] = 0.5
+    stored.to_parquet(parquet_path)
+
+    loaded = compute_with_store(df)
+    assert set(tf_lookup(loaded, "first_name").values()) == {0.5}
+    assert tf_lookup(loaded, "surname") == tf_lookup(computed, "surname")
+
+    # Changing the input data means the stored table is out of date
+    df_changed = df.copy()
+    df_changed.loc[0, "first_name"] = "a_new_name"
+    recomputed = compute_with_store(df_changed)
+    tfs = tf_lookup(recomputed, "first_name")
+    assert tfs["a_new_name"] == pytest.approx(1 / df_changed["first_name"].count())
+    assert 0.5 not in tfs.values()
+    assert tf_lookup(recomputed, "surname") == tf_lookup(computed, "surname")
+
+
+@mark_with_dialects_excluding()
+def test_heavy_hitter_term_frequencies(test_helpers, dialect):
+    helper = test_helpers[dialect]
+
+    df = pd.read_csv("./tests/datasets/fake_1000_from_splink_demos.csv")
+    settings = {
+        "link_type": "dedupe_only",
+        "comparisons": [
+            cl.ExactMatch("first_name").configure(term_frequency_adjustments=True),
+            cl.ExactMatch("surname"),
+        ],
+        "blocking_rules_to_generate_predictions": ["l.surname = r.surname"],
+    }
+
+    counts = df["first_name"].value_counts()
+    exact_tfs = counts / counts.sum()
+    top_k = 5
+    heavy_hitters = exact_tfs.sort_values(ascending=False).head(top_k).to_dict()
+    default_tf = exact_tfs[~exact_tfs.index.isin(heavy_hitters)].mean()
+
+    db_api = helper.DatabaseAPI(**helper.db_api_args())
+    linker = Linker(helper.convert_frame(df), settings, db_api)
+    tf_table = linker.table_management.compute_tf_table("first_name", top_k=top_k)
+    tf_df = tf_table.as_pandas_dataframe()
+
+    assert len(tf_df) == top_k + 1
+    stored = tf_df.dropna(subset=["first_name"])
+    assert dict(zip(stored["first_name"], stored["tf_first_name"])) == (
+        pytest.approx(heavy_hitters)
+    )
+    assert tf_df[tf_df["first_name"].isnull()]["tf_first_name"].iloc[0] == (
+        pytest.approx(default_tf)
+    )
+
+    records = compute_df_concat_with_tf(linker, CTEPipeline()).as_pandas_dataframe()
+    for name, tf in zip(records["first_name"], records["tf_first_name"]):
+        if pd.isnull(name):
+            assert pd.isnull(tf)
+        else:
+            assert tf == pytest.approx(heavy_hitters.get(name, default_tf))
+
+    linker.inference.predict()
+
+    # Tables are cached by their approximation, so an exact table is recomputed
+    # and replaces the approximate one
+    exact_tf_df = linker.table_management.compute_tf_table(
+        "first_name"
+    ).as_pandas_dataframe()
+    assert len(exact_tf_df) == len(exact_tfs)
+    assert "__splink__df_concat_with_tf" not in linker._intermediate_table_cache
+    assert (
+        linker.table_management.compute_tf_table("first_name", top_k=top_k)
+        .as_pandas_dataframe()
+        .equals(tf_df)
+    )
+
+    # Values with the same count are ranked by value, including across the top_k
+    # boundary
+    ranked = sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+    top_k = next(k for k in range(1, len(ranked)) if ranked[k - 1][1] == ranked[k][1])
+    tf_df = linker.table_management.compute_tf_table(
+        "first_name", top_k=top_k
+    ).as_pandas_dataframe()
+    assert set(tf_df["first_name"].dropna()) == {name for name, _ in ranked[:top_k]}
+
+    # A frequency floor keeps values at least that frequent
+    db_api = helper.DatabaseAPI(**helper.db_api_args())
+    linker = Linker(helper.convert_frame(df), settings, db_api)
+    min_frequency = exact_tfs.sort_values(ascending=False).iloc[9]
+    tf_df = linker.table_management.compute_tf_table(
+        "first_name", min_frequency=min_frequency
+    ).as_pandas_dataframe()
+    assert set(tf_df["first_name"].dropna()) == set(
+        exact_tfs[exact_tfs >= min_frequency].index
+    )
+
+
+@mark_with_dialects_excluding()
+def test_registered_tf_lookup_with_null_rows(test_helpers, dialect):
+    helper = test_helpers[dialect]
+
+    df = pd.read_csv("./tests/datasets/fake_1000_from_splink_demos.csv")
+    settings = {
+        "link_type": "dedupe_only",
+        "comparisons": [
+            cl.ExactMatch("first_name").configure(term_frequency_adjustments=True),
+            cl.ExactMatch("surname"),
+        ],
+        "blocking_rules_to_generate_predictions": ["l.surname = r.surname"],
+    }
+
+    # A lookup with null values, e.g. from value_counts(dropna=False), which are
+    # not a default frequency
+    counts = df["first_name"].value_counts(dropna=False)
+    tf_lookup = (counts / counts.sum()).rename("tf_first_name").reset_index()
+    tf_lookup = pd.concat([tf_lookup, tf_lookup[tf_lookup["first_name"].isnull()]])
+    missing_name = df["first_name"].dropna().iloc[0]
+    tf_lookup = tf_lookup[tf_lookup["first_name"] != missing_name]
+    assert tf_lookup["first_name"].isnull().sum() == 2
+
+    db_api = helper.DatabaseAPI(**helper.db_api_args())
+    linker = Linker(helper.convert_frame(df), settings, db_api)
+    linker.table_management.register_term_frequency_lookup(tf_lookup, "first_name")
+
+    records = compute_df_concat_with_tf(linker, CTEPipeline()).as_pandas_dataframe()
+    missing = records[records["first_name"] == missing_name]
+    assert len(missing) > 0
+    assert missing["tf_first_name"].isnull().all()
+    assert records[records["first_name"].isnull()]["tf_first_name"].isnull().all()
+    lookup = dict(zip(tf_lookup["first_name"], tf_lookup["tf_first_name"]))
+    named = records[
+        records["first_name"].notnull() & (records["first_name"] != missing_name)
+    ]
+    for name, tf in zip(named["first_name"], named["tf_first_name"]):
+        assert tf == pytest.approx(lookup[name])
+
+
+@mark_with_dialects_excluding()
+def test_update_tf_table(test_helpers, dialect):
+    helper = test_helpers[dialect]
+
+    df = pd.read_csv("./tests/datasets/fake_1000_from_splink_demos.csv")
+    df_initial = df.iloc[:900]
+    df_added = df.iloc[900:]
+    df_removed = df.iloc[:50]
+    df_final = df.iloc[50:]
+
+    settings = {
+        "link_type": "dedupe_only",
+        "comparisons": [
+            cl.ExactMatch("first_name").configure(term_frequency_adjustments=True)
+        ],
+    }
+
+    db_api = helper.DatabaseAPI(**helper.db_api_args())
+    linker = Linker(helper.convert_frame(df_initial), settings, db_api)
+    linker.table_management.compute_tf_table("first_name")
+    compute_df_concat_with_tf(linker, CTEPipeline())
+
+    tf_df = linker.table_management.update_tf_table(
+        "first_name",
+        records_added=helper.convert_frame(df_added),
+        records_removed=helper.convert_frame(df_removed),
+    ).as_pandas_dataframe()
+
+    counts = df_final["first_name"].value_counts()
+    assert dict(zip(tf_df["first_name"], tf_df["tf_count"])) == counts.to_dict()
+    assert dict(zip(tf_df["first_name"], tf_df["tf_first_name"])) == pytest.approx(
+        (counts / counts.sum()).to_dict()
+    )
+
+    # The updated table replaces the old one wherever term frequencies are used
+    assert "__splink__df_concat_with_tf" not in linker._intermediate_table_cache
+    assert (
+        linker.table_management.compute_tf_table("first_name").as_pandas_dataframe()
+    ).equals(tf_df)
+
+    linker.table_management.compute_tf_table("surname", top_k=10)
+    with pytest.raises(ValueError, match="approximate"):
+        linker.table_management.update_tf_table(
+            "surname", records_added=helper.convert_frame(df_added)
+        )